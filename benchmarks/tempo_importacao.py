@@ -0,0 +1,94 @@
+"""
+Benchmark do Tempo de Importação - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Mede o tempo de importação do pacote em interpretadores novos e falha
+(código de saída 1) quando algum cenário excede o orçamento, escreve algo na
+saída padrão ou importa dependências pesadas antes do uso.
+
+Uso:
+    python benchmarks/tempo_importacao.py
+    python benchmarks/tempo_importacao.py --repeticoes 20 --fator-orcamento 1.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Raiz do repositório, para medir o código local mesmo sem instalação
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que não podem ser carregados por nenhum dos cenários
+MODULOS_PESADOS = ['openai', 'tiktoken', 'dotenv', 'numpy', 'sqlite3']
+
+# (descrição, código de importação, orçamento em milissegundos)
+CENARIOS = [
+    ('import bianca', 'import bianca', 25.0),
+    ('from bianca import CalculadoraTokens',
+     'from bianca import CalculadoraTokens', 60.0),
+    ('from bianca import obter_parametros',
+     'from bianca import obter_parametros', 40.0),
+]
+
+_CODIGO_MEDICAO = """
+import contextlib, io, json, sys, time
+saida = io.StringIO()
+inicio = time.perf_counter()
+with contextlib.redirect_stdout(saida):
+    {importacao}
+duracao = (time.perf_counter() - inicio) * 1000
+carregados = [m for m in {pesados!r} if m in sys.modules]
+sys.stderr.write(json.dumps({{'ms': duracao, 'saida': saida.getvalue(),
+                              'carregados': carregados}}))
+"""
+
+
+def medir(importacao: str) -> dict:
+    """Executa uma importação em um interpretador novo e retorna a medição"""
+    codigo = _CODIGO_MEDICAO.format(importacao=importacao, pesados=MODULOS_PESADOS)
+    ambiente = dict(os.environ)
+    ambiente['PYTHONPATH'] = RAIZ + os.pathsep + ambiente.get('PYTHONPATH', '')
+    processo = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=ambiente,
+                              capture_output=True, text=True, check=True)
+    return json.loads(processo.stderr.strip().splitlines()[-1])
+
+
+def main() -> int:
+    """Executa os cenários e retorna o código de saída"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeticoes', type=int, default=10,
+                        help='Número de interpretadores por cenário (padrão: 10)')
+    parser.add_argument('--fator-orcamento', type=float, default=1.0,
+                        help='Multiplicador dos orçamentos (ex.: 2.0 em máquinas lentas)')
+    argumentos = parser.parse_args()
+
+    falhou = False
+    print(f"{'Cenário':<40} {'Mediana':>10} {'Orçamento':>10}  Resultado")
+    print("-" * 75)
+
+    for descricao, importacao, orcamento in CENARIOS:
+        orcamento *= argumentos.fator_orcamento
+        medicoes = [medir(importacao) for _ in range(argumentos.repeticoes)]
+        mediana = statistics.median(m['ms'] for m in medicoes)
+
+        problemas = []
+        if mediana > orcamento:
+            problemas.append('acima do orçamento')
+        if any(m['saida'] for m in medicoes):
+            problemas.append('escreveu na saída padrão')
+        carregados = sorted({modulo for m in medicoes for modulo in m['carregados']})
+        if carregados:
+            problemas.append(f"importou {', '.join(carregados)}")
+
+        falhou = falhou or bool(problemas)
+        resultado = 'OK' if not problemas else 'FALHA: ' + '; '.join(problemas)
+        print(f"{descricao:<40} {mediana:>8.1f}ms {orcamento:>8.1f}ms  {resultado}")
+
+    return 1 if falhou else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
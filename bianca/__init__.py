@@ -7,8 +7,23 @@ incluindo cálculo de tokens, comparação de custos e configurações centraliz
 Módulos principais:
 - parametros: Configurações de modelos e API
 - calcular_tokens: Cálculo de tokens e custos
+- codificadores: Registro de codificadores do tiktoken
+- cache_codificacoes: Cache local dos arquivos BPE do tiktoken (sem rede)
+- cache_tokens: Cache persistente de contagens de tokens
+- custos_vetorizados: Cálculo vetorizado de custos (NumPy opcional)
+- contagem_corpus: Contagem de tokens e custos de corpora com múltiplos processos
 - modelo: Classes para modelos de IA
-- converter_audio_texto: Conversão de áudio para texto
+- modelo_assincrono: Modelo de IA assíncrono (AsyncOpenAI) com concorrência limitada
+- agendador: Agendador de requisições pelos limites de RPM e TPM
+- fluxo_resposta: Respostas em fluxo com contabilidade de tokens, custo e TTFT
+- politica_tentativas: Novas tentativas com prazo, espera exponencial e hedge
+- distribuicao_modelos: Mesmo pedido a vários modelos (primeira resposta ou todas)
+- pool_clientes: Clientes da OpenAI compartilhados entre instâncias de ModeloIA
+- converter_audio_texto: Transcrição de áudio em trechos paralelos
+- duracao_audio: Duração de áudios pelos cabeçalhos e custo de transcrição
+- historico_uso: Histórico de uso em arquivo binário com agregações por coluna
+- resumos_uso: Resumos de uso por hora, dia e mês, atualizados incrementalmente
+- analise_uso_jsonl: Uso, custos e desvios de estimativa de arquivos JSONL da API
 
 Exemplo de uso:
     from bianca import CalculadoraTokens, obter_parametros
@@ -27,20 +42,84 @@ __author__ = "Elber Galiza"
 __email__ = "elbergaliza@duck.com"
 __description__ = "Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações"
 
-# Importações principais para facilitar o uso
-from .parametros import ParametrosIA, obter_parametros, ModeloConfig
-from .calcular_tokens import CalculadoraTokens
+import importlib
+
+# Importações principais, carregadas apenas no primeiro acesso (PEP 562).
+# Assim "import bianca" não importa openai, tiktoken, dotenv ou numpy e não
+# constrói os parâmetros globais.
+_IMPORTACOES_PREGUICOSAS = {
+    'ParametrosIA': '.parametros',
+    'ModeloConfig': '.parametros',
+    'RegistroModelos': '.parametros',
+    'obter_parametros': '.parametros',
+    'obter_parametros_globais': '.parametros',
+    'contexto_parametros': '.parametros',
+    'ParametrosContexto': '.parametros',
+    'CalculadoraTokens': '.calcular_tokens',
+    'ComparacaoCustos': '.calcular_tokens',
+    'RegistroCodificadores': '.codificadores',
+    'obter_registro_codificadores': '.codificadores',
+    'ContadorCorpus': '.contagem_corpus',
+    'ResultadoCorpus': '.contagem_corpus',
+    'CacheTokens': '.cache_tokens',
+    'TabelaPrecos': '.custos_vetorizados',
+    'aquecer_em_segundo_plano': '.cache_codificacoes',
+    'InfoAudio': '.duracao_audio',
+    'sondar_audio': '.duracao_audio',
+    'sondar_diretorio_audio': '.duracao_audio',
+    'HistoricoUso': '.historico_uso',
+    'TotaisUso': '.historico_uso',
+    'contexto_uso': '.historico_uso',
+    'obter_historico_uso': '.historico_uso',
+    'ResumosUso': '.resumos_uso',
+    'obter_resumos_uso': '.resumos_uso',
+    'AnalisadorUsoJsonl': '.analise_uso_jsonl',
+    'ResultadoAnaliseUso': '.analise_uso_jsonl',
+    'analisar_uso_jsonl': '.analise_uso_jsonl',
+}
 
 # Importações opcionais (podem não estar disponíveis em todos os ambientes)
-try:
-    from .modelo import ModeloIA
-except ImportError:
-    ModeloIA = None
+_IMPORTACOES_OPCIONAIS = {
+    'ModeloIA': '.modelo',
+    'ModeloIAAssincrono': '.modelo_assincrono',
+    'ResultadoItem': '.modelo_assincrono',
+    'AgendadorRequisicoes': '.agendador',
+    'LimitesModelo': '.agendador',
+    'FluxoResposta': '.fluxo_resposta',
+    'EstatisticasFluxo': '.fluxo_resposta',
+    'PoliticaTentativas': '.politica_tentativas',
+    'DistribuidorModelos': '.distribuicao_modelos',
+    'RespostaModelo': '.distribuicao_modelos',
+    'PoolClientes': '.pool_clientes',
+    'obter_pool_clientes': '.pool_clientes',
+    'ConversorAudioTexto': '.converter_audio_texto',
+    'ResultadoTranscricao': '.converter_audio_texto',
+}
+
+
+def __getattr__(nome):
+    """Importa os nomes públicos do pacote sob demanda"""
+    if nome in _IMPORTACOES_PREGUICOSAS:
+        modulo = importlib.import_module(_IMPORTACOES_PREGUICOSAS[nome], __name__)
+        valor = getattr(modulo, nome)
+    elif nome in _IMPORTACOES_OPCIONAIS:
+        try:
+            modulo = importlib.import_module(_IMPORTACOES_OPCIONAIS[nome], __name__)
+            valor = getattr(modulo, nome)
+        except ImportError:
+            valor = None
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+    # Guarda no módulo para que os próximos acessos não passem por aqui
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    """Inclui os nomes carregados sob demanda na listagem do módulo"""
+    return sorted(set(globals()) | set(__all__))
 
-# try:
-#     from .converter_audio_texto import ConversorAudioTexto
-# except ImportError:
-#     ConversorAudioTexto = None
 
 # Lista de todas as classes e funções exportadas
 __all__ = [
@@ -53,14 +132,50 @@ __all__ = [
     # Classes principais
     'ParametrosIA',
     'ModeloConfig',
+    'RegistroModelos',
+    'ParametrosContexto',
     'CalculadoraTokens',
+    'ComparacaoCustos',
+    'RegistroCodificadores',
+    'ContadorCorpus',
+    'ResultadoCorpus',
+    'CacheTokens',
+    'TabelaPrecos',
+    'InfoAudio',
+    'HistoricoUso',
+    'TotaisUso',
+    'ResumosUso',
+    'AnalisadorUsoJsonl',
+    'ResultadoAnaliseUso',
 
     # Funções de conveniência
     'obter_parametros',
+    'obter_parametros_globais',
+    'contexto_parametros',
+    'obter_registro_codificadores',
+    'aquecer_em_segundo_plano',
+    'sondar_audio',
+    'sondar_diretorio_audio',
+    'contexto_uso',
+    'obter_historico_uso',
+    'obter_resumos_uso',
+    'analisar_uso_jsonl',
 
     # Classes opcionais
     'ModeloIA',
-    # 'ConversorAudioTexto',
+    'ModeloIAAssincrono',
+    'ResultadoItem',
+    'AgendadorRequisicoes',
+    'LimitesModelo',
+    'FluxoResposta',
+    'EstatisticasFluxo',
+    'PoliticaTentativas',
+    'DistribuidorModelos',
+    'RespostaModelo',
+    'PoolClientes',
+    'obter_pool_clientes',
+    'ConversorAudioTexto',
+    'ResultadoTranscricao',
 ]
 
 # Função de conveniência para obter informações do módulo
@@ -68,6 +183,7 @@ __all__ = [
 
 def obter_info():
     """Retorna informações sobre o módulo BIANCA"""
+    ModeloIA = __getattr__('ModeloIA')
     return {
         'nome': 'BIANCA',
         'versao': __version__,
@@ -77,14 +193,27 @@ def obter_info():
         'modulos_disponiveis': [
             'parametros',
             'calcular_tokens',
+            'codificadores',
+            'contagem_corpus',
+            'cache_tokens',
+            'custos_vetorizados',
+            'duracao_audio',
+            'historico_uso',
+            'resumos_uso',
+            'analise_uso_jsonl',
             'modelo' if ModeloIA else None,
-            # 'converter_audio_texto' if ConversorAudioTexto else None,
+            'pool_clientes' if ModeloIA else None,
+            'modelo_assincrono' if ModeloIA else None,
+            'agendador' if ModeloIA else None,
+            'politica_tentativas' if ModeloIA else None,
+            'distribuicao_modelos' if ModeloIA else None,
+            'converter_audio_texto' if ModeloIA else None,
         ],
         'classes_principais': [
             'ParametrosIA',
             'CalculadoraTokens',
             'ModeloIA' if ModeloIA else None,
-            # 'ConversorAudioTexto' if ConversorAudioTexto else None,
+            'ConversorAudioTexto' if ModeloIA else None,
         ]
     }
 
@@ -115,20 +244,6 @@ def verificar_dependencias():
 
     return dependencias
 
-# Mensagem de boas-vindas quando o módulo é importado
-
-
-def _mensagem_boas_vindas():
-    """Exibe uma mensagem de boas-vindas (apenas na primeira importação)"""
-    if not hasattr(_mensagem_boas_vindas, '_exibida'):
-        print(
-            f"BIANCA v{__version__} - Biblioteca de IA carregada com sucesso!")
-        _mensagem_boas_vindas._exibida = True
-
-
-# Executar mensagem de boas-vindas
-_mensagem_boas_vindas()
-
 # Função main para console script
 
 
@@ -0,0 +1,452 @@
+"""
+Agendador de Requisições por Limites de Taxa - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo controla o envio de requisições para respeitar os limites de
+requisições por minuto (RPM) e de tokens por minuto (TPM) de cada modelo:
+- Baldes de tokens (token bucket) reabastecidos continuamente
+- Reserva antecipada: tokens de entrada (CalculadoraTokens) + máximo da resposta
+- Conciliação da reserva com o uso informado pela API
+- Devolução integral apenas de requisições que não chegaram a ser enviadas
+- Fila por modelo, liberada em ordem de chegada (threads e asyncio)
+
+Assim as requisições esperam na fila o tempo necessário, em vez de receber
+erros 429 e repetir com espera exponencial.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+import openai
+
+from .calcular_tokens import CalculadoraTokens
+from .parametros import obter_parametros
+
+# Segundos de reabastecimento que o balde acumula (tamanho máximo da rajada)
+SEGUNDOS_RAJADA_PADRAO = 10.0
+
+# Espera máxima de quem não é o primeiro da fila: a vez é avisada quando a
+# fila anda, então este prazo é apenas uma salvaguarda
+INTERVALO_MAXIMO_ESPERA = 0.25
+
+
+@dataclass(frozen=True)
+class LimitesModelo:
+    """Limites de taxa de um modelo"""
+    requisicoes_por_minuto: Optional[int] = None  # RPM (None = sem limite)
+    tokens_por_minuto: Optional[int] = None       # TPM (None = sem limite)
+
+
+@dataclass
+class Reserva:
+    """Reserva de capacidade para uma requisição"""
+    modelo: str
+    tokens_reservados: int
+    tokens_usados: Optional[int] = None  # Preenchido na conciliação
+    instante: float = 0.0                # time.monotonic() da liberação
+    espera: float = 0.0                  # Segundos de espera na fila
+
+
+class BaldeTokens:
+    """Balde de tokens reabastecido continuamente (não é seguro para threads)"""
+
+    def __init__(self, limite_por_minuto: int, segundos_rajada: float = SEGUNDOS_RAJADA_PADRAO):
+        """
+        Args:
+            limite_por_minuto: Quantidade liberada por minuto
+            segundos_rajada: Segundos de reabastecimento que o balde comporta
+        """
+        self.taxa = limite_por_minuto / 60.0
+        self.capacidade = max(1.0, self.taxa * segundos_rajada)
+        self.nivel = self.capacidade
+        self._ultimo = time.monotonic()
+
+    def _reabastecer(self, agora: float) -> None:
+        """Adiciona ao balde o que foi liberado desde a última atualização"""
+        self.nivel = min(self.capacidade, self.nivel + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def tempo_ate(self, quantidade: float, agora: float) -> float:
+        """
+        Segundos até a quantidade poder ser consumida (0 se já pode)
+
+        Pedidos maiores que a capacidade esperam apenas o balde encher e
+        deixam o nível negativo, pago pelos pedidos seguintes.
+        """
+        self._reabastecer(agora)
+        necessario = min(quantidade, self.capacidade)
+        if self.nivel >= necessario:
+            return 0.0
+        return (necessario - self.nivel) / self.taxa
+
+    def consumir(self, quantidade: float) -> None:
+        """Retira a quantidade do balde (o nível pode ficar negativo)"""
+        self.nivel -= quantidade
+
+    def devolver(self, quantidade: float) -> None:
+        """Devolve (ou, se negativa, cobra) uma quantidade ao balde"""
+        self._reabastecer(time.monotonic())
+        self.nivel = min(self.capacidade, self.nivel + quantidade)
+
+
+class _FilaModelo:
+    """Estado de limite de taxa de um modelo: baldes e fila de espera"""
+
+    def __init__(self, limites: LimitesModelo, segundos_rajada: float):
+        self.requisicoes = (BaldeTokens(limites.requisicoes_por_minuto, segundos_rajada)
+                            if limites.requisicoes_por_minuto else None)
+        self.tokens = (BaldeTokens(limites.tokens_por_minuto, segundos_rajada)
+                       if limites.tokens_por_minuto else None)
+        self.fila: Deque[int] = deque()
+
+
+class AgendadorRequisicoes:
+    """Agendador que libera requisições dentro dos limites de RPM e TPM de cada modelo"""
+
+    def __init__(self, limites: Dict[str, LimitesModelo],
+                 limites_padrao: Optional[LimitesModelo] = None,
+                 segundos_rajada: float = SEGUNDOS_RAJADA_PADRAO,
+                 calculadora: Optional[CalculadoraTokens] = None):
+        """
+        Args:
+            limites: Limites por modelo
+            limites_padrao: Limites dos modelos sem entrada em limites
+                (se None, esses modelos não são limitados)
+            segundos_rajada: Segundos de reabastecimento acumulados nos baldes;
+                valores menores liberam as requisições de forma mais espaçada
+            calculadora: Calculadora usada na contagem prévia de tokens
+        """
+        self.limites = dict(limites)
+        self.limites_padrao = limites_padrao
+        self.segundos_rajada = segundos_rajada
+        self.calculadora = calculadora or CalculadoraTokens()
+
+        self._filas: Dict[str, _FilaModelo] = {}
+        self._trava = threading.Lock()
+        self._condicao = threading.Condition(self._trava)
+        self._senhas = itertools.count()
+        # Eventos de quem espera em laços de eventos, avisados a cada mudança
+        self._esperas_assincronas: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+
+    def _fila(self, modelo: str) -> Optional[_FilaModelo]:
+        """Retorna o estado do modelo (None se o modelo não tiver limites)"""
+        fila = self._filas.get(modelo)
+        if fila is None:
+            limites = self.limites.get(modelo, self.limites_padrao)
+            if limites is None:
+                return None
+            fila = self._filas.setdefault(modelo, _FilaModelo(limites, self.segundos_rajada))
+        return fila
+
+    def contar_entrada(self, modelo: str,
+                       entrada: Union[str, List[str], List[Dict[str, Any]]]) -> int:
+        """
+        Conta os tokens de entrada de uma requisição
+
+        Args:
+            modelo: Nome do modelo
+            entrada: Texto, lista de textos (embeddings, moderação) ou lista de
+                mensagens do chat
+
+        Returns:
+            Número de tokens de entrada
+        """
+        if isinstance(entrada, str):
+            tokens_entrada = self.calculadora.contar_tokens(entrada, modelo)
+        elif all(isinstance(item, str) for item in entrada):
+            tokens_entrada = sum(self.calculadora.contar_tokens(item, modelo)
+                                 for item in entrada)
+        else:
+            tokens_entrada = self.calculadora.contar_tokens_mensagens(entrada, modelo)
+        return tokens_entrada
+
+    def estimar_tokens(self, modelo: str, entrada: Union[str, List[str], List[Dict[str, Any]]],
+                       max_tokens_resposta: Optional[int] = None) -> int:
+        """
+        Estima os tokens de uma requisição: entrada + máximo da resposta
+
+        Args:
+            modelo: Nome do modelo
+            entrada: Texto, lista de textos (embeddings, moderação) ou lista de
+                mensagens do chat
+            max_tokens_resposta: Máximo de tokens da resposta (se None, usa
+                o max_tokens_resposta do ModeloConfig)
+
+        Returns:
+            Número de tokens a reservar
+        """
+        return self.contar_entrada(modelo, entrada) + self._maximo_resposta(
+            modelo, max_tokens_resposta)
+
+    @staticmethod
+    def _maximo_resposta(modelo: str, max_tokens_resposta: Optional[int]) -> int:
+        """Máximo de tokens da resposta (se None, o max_tokens_resposta do ModeloConfig)"""
+        if max_tokens_resposta is None:
+            config = obter_parametros().obter_modelo(modelo)
+            max_tokens_resposta = config.max_tokens_resposta if config else 0
+        return max_tokens_resposta
+
+    def _tentar(self, fila: _FilaModelo, senha: int, tokens: int) -> float:
+        """Libera a senha se ela for a primeira da fila e houver capacidade (com trava)"""
+        agora = time.monotonic()
+        espera = 0.0
+        if fila.requisicoes is not None:
+            espera = fila.requisicoes.tempo_ate(1, agora)
+        if fila.tokens is not None:
+            espera = max(espera, fila.tokens.tempo_ate(tokens, agora))
+
+        if fila.fila[0] != senha:
+            # Ainda há outras requisições na frente: a saída delas é avisada
+            return max(espera, INTERVALO_MAXIMO_ESPERA)
+        if espera > 0:
+            return espera
+
+        if fila.requisicoes is not None:
+            fila.requisicoes.consumir(1)
+        if fila.tokens is not None:
+            fila.tokens.consumir(tokens)
+        fila.fila.popleft()
+        return 0.0
+
+    def _avisar(self) -> None:
+        """Acorda quem espera na fila, em threads e em laços de eventos (com trava)"""
+        self._condicao.notify_all()
+        for laco, evento in self._esperas_assincronas.values():
+            try:
+                laco.call_soon_threadsafe(evento.set)
+            except RuntimeError:
+                # Laço de eventos já encerrado
+                pass
+
+    def _desistir(self, fila: _FilaModelo, senha: int) -> None:
+        """Remove uma senha da fila (tempo esgotado ou cancelamento)"""
+        with self._condicao:
+            self._esperas_assincronas.pop(senha, None)
+            try:
+                fila.fila.remove(senha)
+            except ValueError:
+                pass
+            self._avisar()
+
+    def reservar(self, modelo: str, tokens: int,
+                 tempo_maximo: Optional[float] = None) -> Reserva:
+        """
+        Aguarda (bloqueando a thread) até haver capacidade e reserva os tokens
+
+        Args:
+            modelo: Nome do modelo
+            tokens: Tokens a reservar (ver estimar_tokens)
+            tempo_maximo: Segundos máximos de espera (se None, espera indefinidamente)
+
+        Returns:
+            Reserva a ser conciliada com conciliar
+
+        Raises:
+            TimeoutError: Se a capacidade não for liberada a tempo
+        """
+        inicio = time.monotonic()
+        with self._condicao:
+            fila = self._fila(modelo)
+            if fila is None:
+                return Reserva(modelo, tokens, instante=inicio)
+            senha = next(self._senhas)
+            fila.fila.append(senha)
+
+            try:
+                while True:
+                    espera = self._tentar(fila, senha, tokens)
+                    if espera == 0.0:
+                        self._avisar()
+                        agora = time.monotonic()
+                        return Reserva(modelo, tokens, instante=agora, espera=agora - inicio)
+                    if tempo_maximo is not None:
+                        restante = inicio + tempo_maximo - time.monotonic()
+                        if restante <= 0:
+                            raise TimeoutError(
+                                f"Limite de taxa do modelo '{modelo}' não liberou "
+                                f"a requisição em {tempo_maximo}s")
+                        espera = min(espera, restante)
+                    self._condicao.wait(espera)
+            except BaseException:
+                if senha in fila.fila:
+                    fila.fila.remove(senha)
+                    self._avisar()
+                raise
+
+    async def reservar_assincrono(self, modelo: str, tokens: int,
+                                  tempo_maximo: Optional[float] = None) -> Reserva:
+        """
+        Versão assíncrona de reservar: aguarda sem bloquear o laço de eventos
+
+        A espera termina quando o balde tiver capacidade ou quando a fila
+        mudar (liberação, conciliação, cancelamento), o que for antes.
+
+        Raises:
+            TimeoutError: Se a capacidade não for liberada a tempo
+        """
+        inicio = time.monotonic()
+        evento = asyncio.Event()
+        with self._trava:
+            fila = self._fila(modelo)
+            if fila is None:
+                return Reserva(modelo, tokens, instante=inicio)
+            senha = next(self._senhas)
+            fila.fila.append(senha)
+            self._esperas_assincronas[senha] = (asyncio.get_running_loop(), evento)
+
+        try:
+            while True:
+                # Limpo antes de consultar a fila: avisos posteriores não se perdem
+                evento.clear()
+                with self._condicao:
+                    espera = self._tentar(fila, senha, tokens)
+                    if espera == 0.0:
+                        self._esperas_assincronas.pop(senha, None)
+                        self._avisar()
+                if espera == 0.0:
+                    agora = time.monotonic()
+                    return Reserva(modelo, tokens, instante=agora, espera=agora - inicio)
+                if tempo_maximo is not None:
+                    restante = inicio + tempo_maximo - time.monotonic()
+                    if restante <= 0:
+                        raise TimeoutError(
+                            f"Limite de taxa do modelo '{modelo}' não liberou "
+                            f"a requisição em {tempo_maximo}s")
+                    espera = min(espera, restante)
+                try:
+                    await asyncio.wait_for(evento.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._desistir(fila, senha)
+            raise
+
+    def conciliar(self, reserva: Reserva, tokens_usados: int) -> None:
+        """
+        Ajusta o balde de tokens com o uso real informado pela API
+
+        A diferença entre o reservado e o usado é devolvida ao balde (ou
+        cobrada, se o uso tiver sido maior que a reserva).
+
+        Args:
+            reserva: Reserva obtida com reservar
+            tokens_usados: Total de tokens informado pela API
+        """
+        if reserva.tokens_usados is not None:
+            return
+        reserva.tokens_usados = tokens_usados
+        with self._condicao:
+            fila = self._filas.get(reserva.modelo)
+            if fila is not None and fila.tokens is not None:
+                fila.tokens.devolver(reserva.tokens_reservados - tokens_usados)
+                self._avisar()
+
+    def conciliar_resposta(self, reserva: Reserva, resposta: Any) -> None:
+        """Concilia a reserva com o campo usage de uma resposta da API (se houver)"""
+        uso = getattr(resposta, 'usage', None)
+        total = getattr(uso, 'total_tokens', None)
+        if total is not None:
+            self.conciliar(reserva, total)
+
+    def cancelar(self, reserva: Reserva) -> None:
+        """Devolve toda a reserva de uma requisição que não chegou a ser enviada"""
+        if reserva.tokens_usados is not None:
+            return
+        reserva.tokens_usados = 0
+        with self._condicao:
+            fila = self._filas.get(reserva.modelo)
+            if fila is not None:
+                if fila.tokens is not None:
+                    fila.tokens.devolver(reserva.tokens_reservados)
+                if fila.requisicoes is not None:
+                    fila.requisicoes.devolver(1)
+                self._avisar()
+
+    def encerrar_com_erro(self, reserva: Reserva, erro: BaseException,
+                          tokens_entrada: int) -> None:
+        """
+        Encerra a reserva de uma requisição que terminou com exceção
+
+        Só erros de conexão (exceto tempo esgotado) garantem que a requisição
+        não chegou à API: nesse caso a reserva é cancelada. Nos demais (erros
+        de status como 429 e 5xx, tempo esgotado, cancelamento), a requisição
+        pode ter sido contabilizada pela API, então a requisição continua
+        cobrada e os tokens são conciliados com a estimativa da entrada.
+
+        Args:
+            reserva: Reserva obtida com reservar
+            erro: Exceção que encerrou a requisição
+            tokens_entrada: Tokens de entrada estimados (ver contar_entrada)
+        """
+        if (isinstance(erro, openai.APIConnectionError)
+                and not isinstance(erro, openai.APITimeoutError)):
+            self.cancelar(reserva)
+        else:
+            self.conciliar(reserva, tokens_entrada)
+
+    @contextmanager
+    def agendar(self, modelo: str, entrada: Union[str, List[str], List[Dict[str, Any]]],
+                max_tokens_resposta: Optional[int] = None,
+                tempo_maximo: Optional[float] = None) -> Iterator[Reserva]:
+        """
+        Reserva capacidade para o bloco; concilie com conciliar_resposta dentro dele
+
+        Se o bloco terminar sem conciliação, a reserva inteira é mantida; se
+        terminar com exceção antes da conciliação, a reserva é encerrada com
+        encerrar_com_erro (cancelada apenas em erros de conexão).
+
+        Exemplo:
+            with agendador.agendar('gpt-4o', mensagens, 500) as reserva:
+                resposta = cliente.chat.completions.create(...)
+                agendador.conciliar_resposta(reserva, resposta)
+        """
+        tokens_entrada = self.contar_entrada(modelo, entrada)
+        tokens = tokens_entrada + self._maximo_resposta(modelo, max_tokens_resposta)
+        reserva = self.reservar(modelo, tokens, tempo_maximo)
+        try:
+            yield reserva
+        except BaseException as erro:
+            self.encerrar_com_erro(reserva, erro, tokens_entrada)
+            raise
+
+    @asynccontextmanager
+    async def agendar_assincrono(self, modelo: str, entrada: Union[str, List[str], List[Dict[str, Any]]],
+                                 max_tokens_resposta: Optional[int] = None,
+                                 tempo_maximo: Optional[float] = None) -> AsyncIterator[Reserva]:
+        """Versão assíncrona de agendar"""
+        tokens_entrada = self.contar_entrada(modelo, entrada)
+        tokens = tokens_entrada + self._maximo_resposta(modelo, max_tokens_resposta)
+        reserva = await self.reservar_assincrono(modelo, tokens, tempo_maximo)
+        try:
+            yield reserva
+        except BaseException as erro:
+            self.encerrar_com_erro(reserva, erro, tokens_entrada)
+            raise
+
+    def estatisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna o estado atual de cada modelo limitado
+
+        Returns:
+            Dicionário por modelo com requisições na fila e nível dos baldes
+        """
+        with self._trava:
+            agora = time.monotonic()
+            estado = {}
+            for modelo, fila in self._filas.items():
+                for balde in (fila.requisicoes, fila.tokens):
+                    if balde is not None:
+                        balde._reabastecer(agora)
+                estado[modelo] = {
+                    'na_fila': len(fila.fila),
+                    'requisicoes_disponiveis': (fila.requisicoes.nivel
+                                                if fila.requisicoes else None),
+                    'tokens_disponiveis': fila.tokens.nivel if fila.tokens else None,
+                }
+            return estado
@@ -0,0 +1,479 @@
+"""
+Análise de Uso em Arquivos JSONL - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo percorre arquivos JSONL grandes com respostas da API da OpenAI
+e soma o uso informado em cada linha:
+- Respostas da API (chat.completion, responses, embeddings) uma por linha
+- Saídas do Batch ({"custom_id", "response": {"body": ...}, "error"})
+- Entradas do Batch ({"custom_id", "body": {...}}) e logs com
+  {"request": ..., "response": ...}, usadas nas estimativas
+- Custos por CalculadoraTokens.calcular_custo e comparação dos tokens
+  informados pela API com os estimados por CalculadoraTokens
+
+Os arquivos são divididos em blocos de bytes alinhados às quebras de linha e
+analisados em paralelo por um pool de processos; cada processo lê seu bloco
+linha a linha e devolve apenas totais, então a memória não cresce com o
+tamanho dos arquivos. Usa orjson quando instalado (extra "json-rapido").
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from .calcular_tokens import CalculadoraTokens
+
+try:
+    import orjson
+    _carregar_json = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _carregar_json = json.loads
+    ORJSON_AVAILABLE = False
+
+TAMANHO_BLOCO_PADRAO = 64 * 1024 * 1024  # bytes por tarefa do pool
+
+# Leitura só do bloco usage (sem estimativas e sem orjson): evita interpretar
+# o conteúdo inteiro das respostas. Aspas dentro de textos JSON vêm escapadas,
+# então estes padrões não casam com o conteúdo das mensagens.
+_PADRAO_MODELO = re.compile(rb'"model"\s*:\s*"([^"\\]*)"')
+_PADRAO_USO = re.compile(rb'"usage"\s*:\s*\{')
+_PADRAO_ERRO_NULO = re.compile(rb'"error"\s*:\s*null')
+_decodificador_json = json.JSONDecoder()
+
+# Totais por modelo devolvidos pelos blocos (posições na lista de contadores)
+CONTADORES = (
+    'requisicoes', 'tokens_entrada', 'tokens_saida', 'tokens_entrada_cache',
+    'tokens_raciocinio', 'estimativas_entrada', 'tokens_entrada_estimados',
+    'pares_entrada', 'tokens_entrada_estimados_pares', 'tokens_entrada_reais_pares',
+    'pares_saida', 'tokens_saida_estimados', 'tokens_saida_reais_pares')
+
+# Resultado de um bloco: (totais por modelo, contadores de linhas)
+ResultadoBloco = Tuple[Dict[str, List[int]], Dict[str, int]]
+
+# Calculadora de cada processo do pool, criada no primeiro uso
+_calculadora_processo: Optional[CalculadoraTokens] = None
+
+
+@dataclass
+class UsoModeloJsonl:
+    """Uso somado de um modelo"""
+    modelo: str
+    requisicoes: int = 0
+    tokens_entrada: int = 0
+    tokens_saida: int = 0
+    tokens_entrada_cache: int = 0         # Incluídos em tokens_entrada
+    tokens_raciocinio: int = 0            # Incluídos em tokens_saida
+    custo: float = 0.0                    # CalculadoraTokens.calcular_custo
+    estimativas_entrada: int = 0          # Linhas com pedido (mensagens ou input)
+    tokens_entrada_estimados: int = 0
+    # Linhas com pedido e resposta: estimativa e uso real na mesma linha
+    pares_entrada: int = 0
+    tokens_entrada_estimados_pares: int = 0
+    tokens_entrada_reais_pares: int = 0
+    # Saída estimada pelo texto da resposta (sem os tokens de raciocínio)
+    pares_saida: int = 0
+    tokens_saida_estimados: int = 0
+    tokens_saida_reais_pares: int = 0
+
+    @property
+    def desvio_entrada(self) -> Optional[float]:
+        """
+        Diferença relativa entre os tokens de entrada reais e os estimados
+
+        Usa as linhas com pedido e resposta; sem elas (ex.: entrada e saída do
+        Batch em arquivos separados), compara as médias por requisição.
+        None sem estimativas.
+        """
+        if self.tokens_entrada_estimados_pares:
+            return (self.tokens_entrada_reais_pares / self.tokens_entrada_estimados_pares) - 1
+        if self.tokens_entrada_estimados and self.tokens_entrada:
+            media_real = self.tokens_entrada / self.requisicoes
+            media_estimada = self.tokens_entrada_estimados / self.estimativas_entrada
+            return (media_real / media_estimada) - 1
+        return None
+
+    @property
+    def desvio_saida(self) -> Optional[float]:
+        """Diferença relativa entre os tokens de saída reais e os estimados (ou None)"""
+        if self.tokens_saida_estimados:
+            return (self.tokens_saida_reais_pares / self.tokens_saida_estimados) - 1
+        return None
+
+
+@dataclass
+class ResultadoAnaliseUso:
+    """Resultado da análise de arquivos JSONL"""
+    por_modelo: Dict[str, UsoModeloJsonl] = field(default_factory=dict)
+    linhas: int = 0
+    linhas_ignoradas: int = 0             # Sem uso e sem pedido
+    linhas_invalidas: int = 0             # JSON inválido
+    erros: int = 0                        # Saídas do Batch com erro
+    bytes_lidos: int = 0
+    duracao: float = 0.0                  # Segundos
+    modelos_sem_preco: List[str] = field(default_factory=list)
+
+    @property
+    def custo_total(self) -> float:
+        """Custo somado de todos os modelos"""
+        return sum(uso.custo for uso in self.por_modelo.values())
+
+
+def _texto_resposta(corpo: Dict[str, Any]) -> Optional[str]:
+    """Texto gerado de uma resposta de chat ou da Responses API (ou None)"""
+    partes = []
+    for escolha in corpo.get('choices') or ():
+        mensagem = escolha.get('message') or {}
+        if isinstance(mensagem.get('content'), str):
+            partes.append(mensagem['content'])
+    for item in corpo.get('output') or ():
+        if isinstance(item, dict):
+            for conteudo in item.get('content') or ():
+                if isinstance(conteudo, dict) and isinstance(conteudo.get('text'), str):
+                    partes.append(conteudo['text'])
+    return ''.join(partes) if partes else None
+
+
+def _separar_linha(objeto: Any) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], bool]:
+    """Separa o pedido e a resposta de uma linha: (pedido, resposta, com erro)"""
+    if not isinstance(objeto, dict):
+        return None, None, False
+    resposta = objeto.get('response')
+    if 'custom_id' in objeto and 'response' in objeto:
+        # Saída do Batch (response é null quando a requisição falhou)
+        if not isinstance(resposta, dict):
+            return None, None, True
+        erro = bool(objeto.get('error')) or (resposta.get('status_code') or 200) >= 400
+        corpo = resposta.get('body')
+        return None, corpo if isinstance(corpo, dict) else None, erro
+    if 'custom_id' in objeto and isinstance(objeto.get('body'), dict):
+        # Entrada do Batch
+        return objeto['body'], None, False
+    if 'request' in objeto or 'response' in objeto:
+        pedido = objeto.get('request')
+        return (pedido if isinstance(pedido, dict) else None,
+                resposta if isinstance(resposta, dict) else None, False)
+    if 'messages' in objeto and 'usage' not in objeto:
+        return objeto, None, False
+    return None, objeto, False
+
+
+def _ler_uso_direto(linha: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Lê apenas o modelo e o bloco usage de uma linha
+
+    Returns:
+        Resposta reduzida {'model', 'usage'}, ou None se a linha precisar da
+        leitura completa (erros do Batch ou formato inesperado)
+    """
+    if b'"error"' in linha and not _PADRAO_ERRO_NULO.search(linha):
+        return None
+    modelo = _PADRAO_MODELO.search(linha)
+    uso = _PADRAO_USO.match(linha, linha.rfind(b'"usage"'))
+    if modelo is None or uso is None:
+        return None
+    try:
+        uso, _ = _decodificador_json.raw_decode(linha[uso.end() - 1:].decode('utf-8'))
+        return {'model': modelo.group(1).decode('utf-8'), 'usage': uso}
+    except ValueError:
+        return None
+
+
+def _estimar_entrada(calculadora: CalculadoraTokens, pedido: Dict[str, Any],
+                     modelo: str) -> Optional[int]:
+    """Tokens de entrada estimados de um pedido (mensagens do chat ou input)"""
+    mensagens = pedido.get('messages')
+    if isinstance(mensagens, list):
+        return calculadora.contar_tokens_mensagens(mensagens, modelo)
+    entrada = pedido.get('input')
+    if isinstance(entrada, str):
+        return calculadora.contar_tokens(entrada, modelo)
+    if isinstance(entrada, list) and all(isinstance(item, str) for item in entrada):
+        return sum(calculadora.contar_tokens(item, modelo) for item in entrada)
+    return None
+
+
+def _analisar_linhas(linhas: Iterator[bytes], estimar: bool) -> ResultadoBloco:
+    """Soma o uso de uma sequência de linhas JSONL (em bytes)"""
+    global _calculadora_processo
+    if estimar and _calculadora_processo is None:
+        _calculadora_processo = CalculadoraTokens()
+    calculadora = _calculadora_processo
+    resolver = calculadora.parametros.resolver_modelo if calculadora else None
+
+    totais: Dict[str, List[int]] = {}
+    contagem = {'linhas': 0, 'linhas_ignoradas': 0, 'linhas_invalidas': 0, 'erros': 0}
+    for linha in linhas:
+        contagem['linhas'] += 1
+        # Linhas sem uso (e sem pedido ou erro) dispensam a leitura do JSON
+        if b'"usage"' not in linha and b'"error"' not in linha and not (
+                estimar and (b'"messages"' in linha or b'"input"' in linha)):
+            if linha.strip():
+                contagem['linhas_ignoradas'] += 1
+            else:
+                contagem['linhas'] -= 1
+            continue
+
+        resposta = None
+        if not estimar and not ORJSON_AVAILABLE and b'"usage"' in linha:
+            resposta = _ler_uso_direto(linha)
+        if resposta is not None:
+            pedido, erro = None, False
+        else:
+            try:
+                objeto = _carregar_json(linha)
+            except ValueError:
+                contagem['linhas_invalidas'] += 1
+                continue
+            pedido, resposta, erro = _separar_linha(objeto)
+            if erro:
+                contagem['erros'] += 1
+        uso = resposta.get('usage') if resposta else None
+        if not isinstance(uso, dict):
+            uso = None
+        if uso is None and pedido is None:
+            if not erro:
+                contagem['linhas_ignoradas'] += 1
+            continue
+        modelo = (resposta or {}).get('model') or (pedido or {}).get('model')
+        if not isinstance(modelo, str):
+            contagem['linhas_ignoradas'] += 1
+            continue
+
+        valores = totais.get(modelo)
+        if valores is None:
+            valores = totais[modelo] = [0] * len(CONTADORES)
+
+        tokens_entrada = tokens_saida = tokens_raciocinio = 0
+        if uso is not None:
+            # Chat Completions usa prompt/completion; a Responses API, input/output
+            tokens_entrada = uso.get('prompt_tokens', uso.get('input_tokens')) or 0
+            tokens_saida = uso.get('completion_tokens', uso.get('output_tokens')) or 0
+            detalhes_entrada = (uso.get('prompt_tokens_details')
+                                or uso.get('input_tokens_details') or {})
+            detalhes_saida = (uso.get('completion_tokens_details')
+                              or uso.get('output_tokens_details') or {})
+            tokens_raciocinio = detalhes_saida.get('reasoning_tokens') or 0
+            valores[0] += 1
+            valores[1] += tokens_entrada
+            valores[2] += tokens_saida
+            valores[3] += detalhes_entrada.get('cached_tokens') or 0
+            valores[4] += tokens_raciocinio
+
+        if not estimar:
+            continue
+        # Com estimar, a calculadora do processo (e o resolver dela) já foi criada
+        assert calculadora is not None and resolver is not None
+        modelo_configurado = resolver(modelo) or modelo
+        try:
+            if pedido is not None:
+                estimados = _estimar_entrada(calculadora, pedido, modelo_configurado)
+                if estimados is not None:
+                    valores[5] += 1
+                    valores[6] += estimados
+                    if uso is not None:
+                        valores[7] += 1
+                        valores[8] += estimados
+                        valores[9] += tokens_entrada
+            texto = (_texto_resposta(resposta)
+                     if uso is not None and resposta is not None else None)
+            if texto is not None:
+                valores[10] += 1
+                valores[11] += calculadora.contar_tokens(texto, modelo_configurado)
+                valores[12] += tokens_saida - tokens_raciocinio
+        except Exception:
+            # Modelo sem codificação conhecida: mantém só o uso real
+            pass
+
+    return totais, contagem
+
+
+def _ler_bloco(caminho: str, inicio: int, fim: int) -> Iterator[bytes]:
+    """Linhas que começam no intervalo [inicio, fim) de um arquivo"""
+    with open(caminho, 'rb') as arquivo:
+        posicao = inicio
+        if inicio > 0:
+            # A linha que atravessa o início pertence ao bloco anterior
+            arquivo.seek(inicio - 1)
+            posicao = inicio - 1 + len(arquivo.readline())
+        while posicao < fim:
+            linha = arquivo.readline()
+            if not linha:
+                return
+            posicao += len(linha)
+            yield linha
+
+
+def _analisar_bloco(caminho: str, inicio: int, fim: int, estimar: bool) -> ResultadoBloco:
+    """Analisa um bloco de bytes de um arquivo (executado nos processos do pool)"""
+    return _analisar_linhas(_ler_bloco(caminho, inicio, fim), estimar)
+
+
+class AnalisadorUsoJsonl:
+    """Soma uso, custos e desvios de estimativa de arquivos JSONL da API"""
+
+    def __init__(self, processos: Optional[int] = None,
+                 tamanho_bloco: int = TAMANHO_BLOCO_PADRAO, estimar: bool = True):
+        """
+        Args:
+            processos: Número de processos (se None, usa o número de núcleos)
+            tamanho_bloco: Bytes de arquivo analisados por tarefa do pool
+            estimar: Se True, estima os tokens dos pedidos e das respostas com
+                CalculadoraTokens para comparar com o uso real (mais lento)
+        """
+        self.processos = processos or os.cpu_count() or 1
+        self.tamanho_bloco = tamanho_bloco
+        self.estimar = estimar
+        self.calculadora = CalculadoraTokens()
+
+    def _blocos(self, caminhos: Sequence[str]) -> Iterator[Tuple[str, int, int]]:
+        """Divide os arquivos em intervalos de bytes (alinhados na leitura)"""
+        for caminho in caminhos:
+            tamanho = os.path.getsize(caminho)
+            for inicio in range(0, tamanho, self.tamanho_bloco):
+                yield caminho, inicio, min(inicio + self.tamanho_bloco, tamanho)
+
+    def analisar(self, caminhos: Union[str, Sequence[str]]) -> ResultadoAnaliseUso:
+        """
+        Analisa um ou mais arquivos JSONL
+
+        Args:
+            caminhos: Caminho ou lista de caminhos (ex.: entrada e saída de um Batch)
+
+        Returns:
+            ResultadoAnaliseUso com os totais por modelo configurado
+
+        Raises:
+            FileNotFoundError: Se algum arquivo não existir
+        """
+        if isinstance(caminhos, str):
+            caminhos = [caminhos]
+        inicio = time.perf_counter()
+        totais: Dict[str, List[int]] = {}
+        contagem: Dict[str, int] = {}
+
+        def acumular(resultado: ResultadoBloco) -> None:
+            totais_bloco, contagem_bloco = resultado
+            for modelo, valores in totais_bloco.items():
+                acumulados = totais.setdefault(modelo, [0] * len(CONTADORES))
+                for indice, valor in enumerate(valores):
+                    acumulados[indice] += valor
+            for nome, valor in contagem_bloco.items():
+                contagem[nome] = contagem.get(nome, 0) + valor
+
+        blocos = list(self._blocos(caminhos))
+        if self.processos == 1 or len(blocos) <= 1:
+            for bloco in blocos:
+                acumular(_analisar_bloco(*bloco, self.estimar))
+        else:
+            self._analisar_em_pool(blocos, acumular)
+
+        resultado = self._montar_resultado(totais, contagem)
+        resultado.bytes_lidos = sum(os.path.getsize(caminho) for caminho in caminhos)
+        resultado.duracao = time.perf_counter() - inicio
+        return resultado
+
+    def _analisar_em_pool(self, blocos: List[Tuple[str, int, int]], acumular: Any) -> None:
+        """Distribui os blocos no pool, limitando as tarefas em andamento"""
+        max_pendentes = self.processos * 2
+        pendentes: Set[Future] = set()
+        with ProcessPoolExecutor(max_workers=min(self.processos, len(blocos))) as executor:
+            for bloco in blocos:
+                pendentes.add(executor.submit(_analisar_bloco, *bloco, self.estimar))
+                if len(pendentes) >= max_pendentes:
+                    feitos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in feitos:
+                        acumular(futuro.result())
+            for futuro in wait(pendentes)[0]:
+                acumular(futuro.result())
+
+    def _montar_resultado(self, totais: Dict[str, List[int]],
+                          contagem: Dict[str, int]) -> ResultadoAnaliseUso:
+        """Junta os nomes com data no modelo configurado e calcula os custos"""
+        parametros = self.calculadora.parametros
+        resultado = ResultadoAnaliseUso(
+            linhas=contagem.get('linhas', 0),
+            linhas_ignoradas=contagem.get('linhas_ignoradas', 0),
+            linhas_invalidas=contagem.get('linhas_invalidas', 0),
+            erros=contagem.get('erros', 0))
+        sem_preco = set()
+        for nome, valores in totais.items():
+            modelo = parametros.resolver_modelo(nome)
+            if modelo is None:
+                sem_preco.add(nome)
+                modelo = nome
+            uso = resultado.por_modelo.setdefault(modelo, UsoModeloJsonl(modelo))
+            for contador, valor in zip(CONTADORES, valores):
+                setattr(uso, contador, getattr(uso, contador) + valor)
+
+        # O custo é linear nos tokens: calculado uma vez sobre os totais
+        for modelo, uso in resultado.por_modelo.items():
+            if modelo not in sem_preco:
+                uso.custo = self.calculadora.calcular_custo(
+                    modelo, uso.tokens_entrada, uso.tokens_saida)
+        resultado.modelos_sem_preco = sorted(sem_preco)
+        resultado.por_modelo = dict(sorted(resultado.por_modelo.items()))
+        return resultado
+
+
+def analisar_uso_jsonl(caminhos: Union[str, Sequence[str]], processos: Optional[int] = None,
+                       estimar: bool = True) -> ResultadoAnaliseUso:
+    """
+    Analisa arquivos JSONL de respostas da API ou do Batch
+
+    Args:
+        caminhos: Caminho ou lista de caminhos
+        processos: Número de processos (se None, usa o número de núcleos)
+        estimar: Se True, compara o uso real com as estimativas da CalculadoraTokens
+
+    Returns:
+        ResultadoAnaliseUso com os totais por modelo
+    """
+    return AnalisadorUsoJsonl(processos=processos, estimar=estimar).analisar(caminhos)
+
+
+def _formatar_desvio(desvio: Optional[float]) -> str:
+    return f"{desvio:+.1%}" if desvio is not None else '-'
+
+
+def main() -> None:
+    """Função principal para a linha de comando"""
+    parser = argparse.ArgumentParser(
+        description="Soma o uso e o custo de arquivos JSONL de respostas da API da OpenAI")
+    parser.add_argument('caminhos', nargs='+', help='Arquivos JSONL')
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO // (1024 * 1024),
+                        help='Megabytes por tarefa do pool')
+    parser.add_argument('--sem-estimativa', action='store_true',
+                        help='Não estima tokens para comparar com o uso real')
+    argumentos = parser.parse_args()
+
+    analisador = AnalisadorUsoJsonl(processos=argumentos.processos,
+                                    tamanho_bloco=argumentos.tamanho_bloco * 1024 * 1024,
+                                    estimar=not argumentos.sem_estimativa)
+    resultado = analisador.analisar(argumentos.caminhos)
+
+    print(f"{'Modelo':28} {'Requisições':>11} {'Entrada':>12} {'Saída':>12} "
+          f"{'Custo':>11} {'Desvio ent.':>11} {'Desvio saída':>12}")
+    for modelo, uso in resultado.por_modelo.items():
+        print(f"{modelo:28} {uso.requisicoes:>11} {uso.tokens_entrada:>12} "
+              f"{uso.tokens_saida:>12} {'$' + format(uso.custo, '.4f'):>11} "
+              f"{_formatar_desvio(uso.desvio_entrada):>11} "
+              f"{_formatar_desvio(uso.desvio_saida):>12}")
+
+    velocidade = resultado.bytes_lidos / max(resultado.duracao, 1e-9) / (1024 * 1024)
+    print(f"Total: ${resultado.custo_total:.2f} | {resultado.linhas} linhas, "
+          f"{resultado.linhas_ignoradas} ignoradas, {resultado.linhas_invalidas} inválidas, "
+          f"{resultado.erros} com erro | {resultado.duracao:.1f}s ({velocidade:.0f} MB/s, "
+          f"{'orjson' if ORJSON_AVAILABLE else 'json'})")
+    if resultado.modelos_sem_preco:
+        print(f"AVISO: Modelos sem preço configurado: {', '.join(resultado.modelos_sem_preco)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Cache Local das Codificações do tiktoken - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Na primeira utilização, o tiktoken baixa os arquivos BPE de cada codificação.
+Este módulo permite usar um cache local desses arquivos, sem acesso à rede:
+- Diretório de cache do BIANCA configurado como TIKTOKEN_CACHE_DIR
+- Preparação do cache (ex.: na construção da imagem ou do pacote)
+- Instalação manual de arquivos .tiktoken em ambientes sem rede
+- Aquecimento dos codificadores em segundo plano na inicialização
+
+Diretório usado (o primeiro disponível):
+1. TIKTOKEN_CACHE_DIR, se já definido pelo usuário
+2. BIANCA_TIKTOKEN_CACHE_DIR
+3. bianca/dados_tiktoken (distribuído com o pacote, se preparado no build)
+
+Uso pela linha de comando:
+    python -m bianca.cache_codificacoes preparar --diretorio ./dados_tiktoken
+    python -m bianca.cache_codificacoes verificar
+    python -m bianca.cache_codificacoes instalar cl100k_base ./cl100k_base.tiktoken
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+# Arquivos BPE publicados pela OpenAI (os mesmos usados pelo tiktoken)
+URLS_CODIFICACOES = {
+    'cl100k_base': 'https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken',
+    'o200k_base': 'https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken',
+}
+
+# Codificações usadas pelos modelos configurados em ParametrosIA
+CODIFICACOES_PADRAO = ['cl100k_base', 'o200k_base']
+
+VARIAVEL_TIKTOKEN = 'TIKTOKEN_CACHE_DIR'
+VARIAVEL_BIANCA = 'BIANCA_TIKTOKEN_CACHE_DIR'
+
+# Diretório distribuído junto com o pacote
+DIRETORIO_PACOTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados_tiktoken')
+
+_trava = threading.Lock()
+_configurado = False
+
+
+def nome_arquivo_cache(codificacao: str) -> str:
+    """
+    Retorna o nome do arquivo que o tiktoken procura no cache
+
+    Args:
+        codificacao: Nome da codificação (ex.: 'cl100k_base')
+
+    Returns:
+        Nome do arquivo (SHA-1 da URL de origem, como no tiktoken)
+
+    Raises:
+        ValueError: Se a codificação não for conhecida
+    """
+    url = URLS_CODIFICACOES.get(codificacao)
+    if url is None:
+        raise ValueError(f"Codificação '{codificacao}' não suportada pelo cache local")
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def diretorio_cache_padrao() -> Optional[str]:
+    """Retorna o diretório de cache do BIANCA, ou None se nenhum estiver disponível"""
+    diretorio = os.getenv(VARIAVEL_BIANCA)
+    if diretorio:
+        return diretorio
+    if os.path.isdir(DIRETORIO_PACOTE):
+        return DIRETORIO_PACOTE
+    return None
+
+
+def configurar_cache_tiktoken(diretorio: Optional[str] = None) -> Optional[str]:
+    """
+    Aponta o tiktoken para o cache local (uma única vez por processo)
+
+    Um TIKTOKEN_CACHE_DIR já definido pelo usuário é sempre respeitado.
+    Deve ser chamada antes do primeiro carregamento de um codificador; o
+    registro de codificadores faz isso automaticamente.
+
+    Args:
+        diretorio: Diretório do cache (se None, usa diretorio_cache_padrao)
+
+    Returns:
+        Diretório efetivamente usado pelo tiktoken (None para o padrão dele)
+    """
+    global _configurado
+    with _trava:
+        if diretorio is None and _configurado:
+            return os.environ.get(VARIAVEL_TIKTOKEN)
+        _configurado = True
+
+        if VARIAVEL_TIKTOKEN in os.environ and diretorio is None:
+            return os.environ[VARIAVEL_TIKTOKEN]
+
+        diretorio = diretorio or diretorio_cache_padrao()
+        if diretorio:
+            os.environ[VARIAVEL_TIKTOKEN] = diretorio
+        return diretorio
+
+
+def verificar_cache(diretorio: Optional[str] = None,
+                    codificacoes: Optional[List[str]] = None) -> Dict[str, bool]:
+    """
+    Verifica quais codificações já estão no cache local
+
+    Args:
+        diretorio: Diretório do cache (se None, usa o configurado)
+        codificacoes: Codificações verificadas (padrão: CODIFICACOES_PADRAO)
+
+    Returns:
+        Dicionário codificação -> presente no cache
+    """
+    diretorio = diretorio or os.environ.get(VARIAVEL_TIKTOKEN) or diretorio_cache_padrao()
+    codificacoes = codificacoes or CODIFICACOES_PADRAO
+    if not diretorio:
+        return {codificacao: False for codificacao in codificacoes}
+
+    return {codificacao: os.path.isfile(
+                os.path.join(diretorio, nome_arquivo_cache(codificacao)))
+            for codificacao in codificacoes}
+
+
+def preparar_cache(diretorio: str,
+                   codificacoes: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Baixa os arquivos BPE para o diretório de cache (requer rede)
+
+    Feito uma única vez na construção do pacote ou da imagem; depois disso
+    os codificadores são carregados sem acesso à rede. O tiktoken valida o
+    hash de cada arquivo baixado.
+
+    Args:
+        diretorio: Diretório onde o cache será criado
+        codificacoes: Codificações a preparar (padrão: CODIFICACOES_PADRAO)
+
+    Returns:
+        Dicionário codificação -> caminho do arquivo no cache
+    """
+    import tiktoken
+
+    codificacoes = codificacoes or CODIFICACOES_PADRAO
+    os.makedirs(diretorio, exist_ok=True)
+    configurar_cache_tiktoken(diretorio)
+
+    caminhos = {}
+    for codificacao in codificacoes:
+        tiktoken.get_encoding(codificacao)
+        caminhos[codificacao] = os.path.join(diretorio, nome_arquivo_cache(codificacao))
+    return caminhos
+
+
+def instalar_arquivo_bpe(codificacao: str, caminho_arquivo: str,
+                         diretorio: Optional[str] = None) -> str:
+    """
+    Copia um arquivo .tiktoken obtido manualmente para o cache local
+
+    Útil em máquinas sem rede: o arquivo é baixado em outro lugar e copiado.
+
+    Args:
+        codificacao: Nome da codificação do arquivo
+        caminho_arquivo: Caminho do arquivo .tiktoken
+        diretorio: Diretório do cache (se None, usa o padrão do BIANCA)
+
+    Returns:
+        Caminho do arquivo no cache
+
+    Raises:
+        ValueError: Se nenhum diretório de cache estiver definido
+    """
+    diretorio = diretorio or diretorio_cache_padrao()
+    if not diretorio:
+        raise ValueError(
+            f"Nenhum diretório de cache definido; informe um ou defina {VARIAVEL_BIANCA}")
+
+    os.makedirs(diretorio, exist_ok=True)
+    destino = os.path.join(diretorio, nome_arquivo_cache(codificacao))
+    shutil.copyfile(caminho_arquivo, destino)
+    return destino
+
+
+def aquecer_em_segundo_plano(modelos: Optional[List[str]] = None) -> Future:
+    """
+    Carrega os codificadores em uma thread de fundo
+
+    Chamada na inicialização da aplicação, deixa a primeira contagem de
+    tokens sem espera. O resultado (ou o erro) fica disponível no Future.
+
+    Args:
+        modelos: Lista de modelos (se None, usa todos os de ParametrosIA)
+
+    Returns:
+        Future com o dicionário modelo -> codificação retornado pelo aquecimento
+    """
+    from .codificadores import obter_registro_codificadores
+
+    futuro: Future = Future()
+
+    def aquecer() -> None:
+        if not futuro.set_running_or_notify_cancel():
+            return
+        try:
+            configurar_cache_tiktoken()
+            futuro.set_result(obter_registro_codificadores().aquecer(modelos))
+        except BaseException as e:
+            futuro.set_exception(e)
+
+    threading.Thread(target=aquecer, name='bianca-aquecimento', daemon=True).start()
+    return futuro
+
+
+def main():
+    """Função principal para a linha de comando"""
+    parser = argparse.ArgumentParser(
+        description="Gerencia o cache local das codificações do tiktoken")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    preparar = subparsers.add_parser('preparar', help='Baixa os arquivos BPE para o cache')
+    preparar.add_argument('--diretorio', default=DIRETORIO_PACOTE)
+    preparar.add_argument('--codificacoes', nargs='+', default=CODIFICACOES_PADRAO)
+
+    verificar = subparsers.add_parser('verificar', help='Mostra as codificações no cache')
+    verificar.add_argument('--diretorio')
+
+    instalar = subparsers.add_parser('instalar', help='Copia um arquivo .tiktoken para o cache')
+    instalar.add_argument('codificacao')
+    instalar.add_argument('arquivo')
+    instalar.add_argument('--diretorio')
+
+    argumentos = parser.parse_args()
+
+    if argumentos.comando == 'preparar':
+        for codificacao, caminho in preparar_cache(
+                argumentos.diretorio, argumentos.codificacoes).items():
+            print(f"{codificacao}: {caminho}")
+    elif argumentos.comando == 'verificar':
+        for codificacao, presente in verificar_cache(argumentos.diretorio).items():
+            print(f"  {'✓' if presente else '✗'} {codificacao}")
+    elif argumentos.comando == 'instalar':
+        destino = instalar_arquivo_bpe(argumentos.codificacao, argumentos.arquivo,
+                                       argumentos.diretorio)
+        print(f"{argumentos.codificacao}: {destino}")
+
+
+if __name__ == "__main__":
+    main()
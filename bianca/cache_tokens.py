@@ -0,0 +1,235 @@
+"""
+Cache Persistente de Contagens de Tokens - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo guarda em disco as contagens de tokens já calculadas, endereçadas
+pelo conteúdo do texto:
+- Chave: (hash SHA-256 do texto, nome da codificação)
+- Armazenamento em SQLite no modo WAL, seguro para vários processos
+- Remoção das entradas menos usadas recentemente (LRU) ao atingir o limite
+- Estatísticas de acertos e falhas
+
+Usado opcionalmente por CalculadoraTokens (parâmetro cache).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Máximo de parâmetros por consulta (limite conservador do SQLite)
+_TAMANHO_LOTE_CONSULTA = 500
+
+
+def calcular_hash_texto(texto: str) -> bytes:
+    """Retorna o hash SHA-256 do texto (usado como chave do cache)"""
+    return hashlib.sha256(texto.encode("utf-8", "surrogatepass")).digest()
+
+
+class CacheTokens:
+    """Cache de contagens de tokens em SQLite, compartilhável entre processos"""
+
+    def __init__(self, caminho_arquivo: str, max_entradas: int = 1_000_000,
+                 fracao_remocao: float = 0.1, verificar_limite_a_cada: int = 1000,
+                 resolucao_acesso: float = 60.0, tempo_espera: float = 30.0):
+        """
+        Args:
+            caminho_arquivo: Caminho do arquivo SQLite (criado se não existir)
+            max_entradas: Número máximo de entradas mantidas no cache
+            fracao_remocao: Fração extra de entradas removida ao atingir o limite
+            verificar_limite_a_cada: Quantidade de inserções entre verificações do limite
+            resolucao_acesso: Intervalo mínimo (segundos) entre atualizações do
+                último acesso de uma entrada, para evitar uma escrita por acerto
+            tempo_espera: Tempo máximo (segundos) de espera por bloqueios de
+                outros processos
+        """
+        self.caminho_arquivo = caminho_arquivo
+        self.max_entradas = max_entradas
+        self.fracao_remocao = fracao_remocao
+        self.verificar_limite_a_cada = verificar_limite_a_cada
+        self.resolucao_acesso = resolucao_acesso
+        self.tempo_espera = tempo_espera
+
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._acertos = 0
+        self._falhas = 0
+        self._insercoes_desde_verificacao = 0
+
+        self._criar_tabela()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual (reabrindo após um fork)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho_arquivo, timeout=self.tempo_espera,
+                                      isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _criar_tabela(self) -> None:
+        """Cria a tabela e o índice do cache, se necessário"""
+        conexao = self._conexao()
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS contagens ("
+            " hash BLOB NOT NULL,"
+            " codificacao TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL,"
+            " ultimo_acesso REAL NOT NULL,"
+            " PRIMARY KEY (hash, codificacao)"
+            ") WITHOUT ROWID")
+        conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_contagens_acesso"
+            " ON contagens (ultimo_acesso)")
+
+    def obter(self, texto: str, codificacao: str) -> Optional[int]:
+        """
+        Retorna a contagem de tokens guardada para um texto
+
+        Args:
+            texto: Texto consultado
+            codificacao: Nome da codificação (ex.: 'cl100k_base')
+
+        Returns:
+            Número de tokens, ou None se o texto não estiver no cache
+        """
+        return self.obter_varios([texto], codificacao)[0]
+
+    def obter_varios(self, textos: List[str], codificacao: str) -> List[Optional[int]]:
+        """
+        Retorna as contagens guardadas para vários textos de uma vez
+
+        Args:
+            textos: Textos consultados
+            codificacao: Nome da codificação
+
+        Returns:
+            Lista com o número de tokens de cada texto (None quando ausente)
+        """
+        hashes = [calcular_hash_texto(texto) for texto in textos]
+        encontrados: Dict[bytes, int] = {}
+        desatualizados: List[bytes] = []
+        agora = time.time()
+        conexao = self._conexao()
+
+        for inicio in range(0, len(hashes), _TAMANHO_LOTE_CONSULTA):
+            lote = hashes[inicio:inicio + _TAMANHO_LOTE_CONSULTA]
+            marcadores = ",".join("?" * len(lote))
+            cursor = conexao.execute(
+                "SELECT hash, tokens, ultimo_acesso FROM contagens"
+                f" WHERE codificacao = ? AND hash IN ({marcadores})",
+                [codificacao, *lote])
+            for chave, tokens, ultimo_acesso in cursor:
+                encontrados[chave] = tokens
+                if agora - ultimo_acesso > self.resolucao_acesso:
+                    desatualizados.append(chave)
+
+        if desatualizados:
+            conexao.executemany(
+                "UPDATE contagens SET ultimo_acesso = ?"
+                " WHERE hash = ? AND codificacao = ?",
+                [(agora, chave, codificacao) for chave in desatualizados])
+
+        resultado = [encontrados.get(chave) for chave in hashes]
+        acertos = sum(1 for tokens in resultado if tokens is not None)
+        with self._trava:
+            self._acertos += acertos
+            self._falhas += len(resultado) - acertos
+        return resultado
+
+    def guardar(self, texto: str, codificacao: str, tokens: int) -> None:
+        """
+        Guarda a contagem de tokens de um texto
+
+        Args:
+            texto: Texto contado
+            codificacao: Nome da codificação
+            tokens: Número de tokens
+        """
+        self.guardar_varios({texto: tokens}, codificacao)
+
+    def guardar_varios(self, contagens: Dict[str, int], codificacao: str) -> None:
+        """
+        Guarda as contagens de vários textos em uma única transação
+
+        Args:
+            contagens: Dicionário texto -> número de tokens
+            codificacao: Nome da codificação
+        """
+        if not contagens:
+            return
+
+        agora = time.time()
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute("BEGIN")
+            conexao.executemany(
+                "INSERT OR REPLACE INTO contagens (hash, codificacao, tokens, ultimo_acesso)"
+                " VALUES (?, ?, ?, ?)",
+                [(calcular_hash_texto(texto), codificacao, tokens, agora)
+                 for texto, tokens in contagens.items()])
+
+        with self._trava:
+            self._insercoes_desde_verificacao += len(contagens)
+            verificar = self._insercoes_desde_verificacao >= self.verificar_limite_a_cada
+            if verificar:
+                self._insercoes_desde_verificacao = 0
+        if verificar:
+            self.aplicar_limite()
+
+    def aplicar_limite(self) -> int:
+        """
+        Remove as entradas acessadas há mais tempo quando o limite é excedido
+
+        Returns:
+            Número de entradas removidas
+        """
+        conexao = self._conexao()
+        total = conexao.execute("SELECT COUNT(*) FROM contagens").fetchone()[0]
+        if total <= self.max_entradas:
+            return 0
+
+        remover = total - self.max_entradas + int(self.max_entradas * self.fracao_remocao)
+        cursor = conexao.execute(
+            "DELETE FROM contagens WHERE (hash, codificacao) IN ("
+            " SELECT hash, codificacao FROM contagens"
+            " ORDER BY ultimo_acesso LIMIT ?)", (remover,))
+        return cursor.rowcount
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas de uso do cache nesta instância
+
+        Returns:
+            Dicionário com acertos, falhas, taxa de acerto e total de entradas
+        """
+        total = self._acertos + self._falhas
+        entradas = self._conexao().execute(
+            "SELECT COUNT(*) FROM contagens").fetchone()[0]
+        return {
+            'acertos': self._acertos,
+            'falhas': self._falhas,
+            'taxa_acerto': self._acertos / total if total else 0.0,
+            'entradas': entradas,
+            'max_entradas': self.max_entradas,
+        }
+
+    def limpar(self) -> None:
+        """Remove todas as entradas do cache e zera as estatísticas"""
+        self._conexao().execute("DELETE FROM contagens")
+        with self._trava:
+            self._acertos = 0
+            self._falhas = 0
+            self._insercoes_desde_verificacao = 0
+
+    def fechar(self) -> None:
+        """Fecha a conexão da thread atual"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
@@ -5,23 +5,37 @@ e comparações entre diferentes modelos de IA.
 
 FUNCIONALIDADES INCLUÍDAS:
 - Contagem de tokens para diferentes modelos
+- Estimativa de tokens de entrada de mensagens do chat
+- Pré-aquecimento dos codificadores (registro em codificadores.py)
+- Contagem em lote com deduplicação e pool de threads
+- Contagem em fluxo de arquivos grandes com memória constante
+- Cache persistente opcional de contagens (cache_tokens.py)
 - Cálculo de custos (entrada, saída, total)
 - Verificação de limites de tokens
 - Comparação de modelos (custos e configurações)
-- Análise detalhada de custos
+- Análise detalhada de custos (resultado reutilizável e exportável em JSON)
 - Identificação do modelo mais econômico
+- Varredura de custos por tamanho de resposta (matriz e mais econômicos)
 
 Integrado com parametros.py para configurações dos modelos.
 """
 
-from typing import Dict, List, Optional, Tuple, Any
+import json
+from dataclasses import dataclass, field
+from typing import IO, TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Any, Union
 from .parametros import obter_parametros
+from .codificadores import TIKTOKEN_AVAILABLE, obter_registro_codificadores
+from .contagem_fluxo import TAMANHO_BLOCO_PADRAO, abrir_blocos, ler_blocos_arquivo
 
-try:
-    import tiktoken
-    TIKTOKEN_AVAILABLE = True
-except ImportError:
-    TIKTOKEN_AVAILABLE = False
+if TYPE_CHECKING:
+    from .cache_tokens import CacheTokens
+    from .historico_uso import HistoricoUso
+
+# Formatação das mensagens do chat (cl100k_base e o200k_base)
+TOKENS_POR_MENSAGEM = 3
+TOKENS_INICIO_RESPOSTA = 3
+
+if not TIKTOKEN_AVAILABLE:
     # Fallback para quando tiktoken não estiver disponível
 
     def _fallback_encode(text: str) -> int:
@@ -29,11 +43,107 @@ except ImportError:
         return len(text.split()) * 2  # Estimativa aproximada
 
 
+@dataclass
+class ComparacaoCustos:
+    """Resultado de uma comparação de custos, calculado uma única vez"""
+    tokens_resposta: int
+    # Custos detalhados por modelo (mesmo formato de comparar_custo_modelos)
+    resultados: Dict[str, Dict[str, float]]
+    modelo_mais_economico: Optional[str] = None
+    custo_mais_economico: float = 0.0
+    # Quanto (%) cada modelo é mais caro que o mais econômico
+    diferencas_percentuais: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def a_partir_de_resultados(cls, resultados: Dict[str, Dict[str, float]],
+                               tokens_resposta: int) -> 'ComparacaoCustos':
+        """
+        Monta a comparação a partir dos custos detalhados por modelo
+
+        Args:
+            resultados: Custos por modelo, como retornado por comparar_custo_modelos
+            tokens_resposta: Número estimado de tokens na resposta
+
+        Returns:
+            ComparacaoCustos com o modelo mais econômico e as diferenças
+        """
+        comparacao = cls(tokens_resposta=tokens_resposta, resultados=resultados)
+        if not resultados:
+            return comparacao
+
+        modelo_barato = min(resultados.keys(),
+                            key=lambda x: resultados[x]['custo_total'])
+        custo_barato = resultados[modelo_barato]['custo_total']
+        comparacao.modelo_mais_economico = modelo_barato
+        comparacao.custo_mais_economico = custo_barato
+
+        if custo_barato > 0:
+            for modelo, dados in resultados.items():
+                if modelo != modelo_barato:
+                    comparacao.diferencas_percentuais[modelo] = (
+                        (dados['custo_total'] - custo_barato) / custo_barato) * 100
+
+        return comparacao
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Retorna a comparação como dicionário"""
+        return {
+            'tokens_resposta': self.tokens_resposta,
+            'resultados': self.resultados,
+            'modelo_mais_economico': self.modelo_mais_economico,
+            'custo_mais_economico': self.custo_mais_economico,
+            'diferencas_percentuais': self.diferencas_percentuais
+        }
+
+    def para_json(self, **kwargs: Any) -> str:
+        """Retorna a comparação serializada em JSON (kwargs vão para json.dumps)"""
+        return json.dumps(self.para_dict(), ensure_ascii=False, **kwargs)
+
+
+@dataclass
+class VarreduraCustos:
+    """Matriz de custos modelos × tamanhos de resposta × textos"""
+    modelos: List[str]
+    tamanhos_resposta: List[int]
+    # Tokens de entrada de cada texto, por modelo
+    tokens_entrada: Dict[str, List[int]]
+    # custos[modelo][tamanho][texto], na ordem de modelos e tamanhos_resposta
+    custos: List[List[List[float]]]
+    # mais_economicos[tamanho][texto]: índice do modelo mais barato da coluna
+    mais_economicos: List[List[int]]
+
+    def modelo_mais_economico(self, indice_tamanho: int,
+                              indice_texto: int = 0) -> Tuple[str, float]:
+        """
+        Retorna o modelo mais econômico de uma coluna da matriz
+
+        Args:
+            indice_tamanho: Posição do tamanho de resposta em tamanhos_resposta
+            indice_texto: Posição do texto
+
+        Returns:
+            Tupla com (nome_do_modelo, custo_total)
+        """
+        indice_modelo = self.mais_economicos[indice_tamanho][indice_texto]
+        return (self.modelos[indice_modelo],
+                self.custos[indice_modelo][indice_tamanho][indice_texto])
+
+
 class CalculadoraTokens:
     """Classe para calcular tokens e custos de modelos de IA"""
 
-    def __init__(self):
+    def __init__(self, cache: Optional['CacheTokens'] = None,
+                 historico: Optional['HistoricoUso'] = None):
+        """
+        Args:
+            cache: Cache persistente de contagens (opcional)
+            historico: Histórico onde as estimativas de calcular_custo_completo
+                são registradas (opcional)
+        """
         self.parametros = obter_parametros()
+        self.registro_codificadores = obter_registro_codificadores()
+        self.cache = cache
+        self.historico = historico
 
     def contar_tokens(self, texto: str, modelo: str) -> int:
         """
@@ -50,13 +160,191 @@ class CalculadoraTokens:
             # Usar fallback quando tiktoken não estiver disponível
             return _fallback_encode(texto)
 
-        try:
-            codificador = tiktoken.encoding_for_model(modelo)
-            return len(codificador.encode(texto))
-        except KeyError:
-            # Fallback para GPT-4 se o modelo não for reconhecido
-            codificador = tiktoken.get_encoding("cl100k_base")
-            return len(codificador.encode(texto))
+        if self.cache is None:
+            return self._codificar_contagem(texto, modelo)
+
+        codificacao = self.registro_codificadores.obter_nome_codificacao(modelo)
+        tokens = self.cache.obter(texto, codificacao)
+        if tokens is None:
+            tokens = self._codificar_contagem(texto, modelo)
+            self.cache.guardar(texto, codificacao, tokens)
+        return tokens
+
+    def contar_tokens_mensagens(self, mensagens: List[Dict[str, Any]], modelo: str) -> int:
+        """
+        Estima os tokens de entrada de uma lista de mensagens do chat
+
+        Soma os tokens do conteúdo de cada mensagem e a formatação do chat
+        (TOKENS_POR_MENSAGEM por mensagem e TOKENS_INICIO_RESPOSTA no final).
+        Em conteúdos com várias partes, apenas as partes de texto são contadas.
+
+        Args:
+            mensagens: Mensagens no formato da API de chat
+            modelo: Nome do modelo de IA
+
+        Returns:
+            Número estimado de tokens de entrada
+        """
+        total = TOKENS_INICIO_RESPOSTA
+        for mensagem in mensagens:
+            total += TOKENS_POR_MENSAGEM
+            for chave, valor in mensagem.items():
+                if isinstance(valor, str):
+                    total += self.contar_tokens(valor, modelo)
+                elif chave == 'content' and isinstance(valor, list):
+                    total += sum(self.contar_tokens(parte.get('text', ''), modelo)
+                                 for parte in valor if parte.get('type') == 'text')
+        return total
+
+    def _codificar_contagem(self, texto: str, modelo: str) -> int:
+        """Conta os tokens com o tiktoken, sem consultar o cache"""
+        # Modelos não reconhecidos usam cl100k_base (resolvido pelo registro)
+        codificador = self.registro_codificadores.obter_codificador(modelo)
+        return len(codificador.encode(texto))
+
+    def contar_tokens_fluxo(self, origem: Union[IO, Iterable[str]], modelo: str,
+                            encoding: str = "utf-8",
+                            tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> int:
+        """
+        Conta os tokens de um fluxo de texto sem carregá-lo inteiro na memória
+
+        O texto é lido em blocos e cortado em limites seguros, então o total
+        é igual ao de contar_tokens sobre o texto completo.
+
+        Args:
+            origem: Fluxo com método read (texto ou binário) ou iterável de blocos
+            modelo: Nome do modelo de IA
+            encoding: Codificação usada quando o fluxo é binário
+            tamanho_bloco: Tamanho de cada leitura
+
+        Returns:
+            Número de tokens
+        """
+        if not TIKTOKEN_AVAILABLE:
+            return sum(_fallback_encode(trecho)
+                       for trecho in abrir_blocos(origem, encoding, tamanho_bloco))
+
+        # Os trechos não passam pelo cache para não enchê-lo com pedaços de arquivo
+        return sum(self._codificar_contagem(trecho, modelo)
+                   for trecho in abrir_blocos(origem, encoding, tamanho_bloco))
+
+    def contar_tokens_arquivo(self, caminho_arquivo: str, modelo: str,
+                              encoding: str = "utf-8",
+                              tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> int:
+        """
+        Conta os tokens de um arquivo de texto com uso de memória constante
+
+        O arquivo é mapeado em memória (quando possível) e lido em blocos.
+
+        Args:
+            caminho_arquivo: Caminho do arquivo
+            modelo: Nome do modelo de IA
+            encoding: Codificação do arquivo (padrão: "utf-8")
+            tamanho_bloco: Tamanho de cada bloco em bytes
+
+        Returns:
+            Número de tokens
+        """
+        return self.contar_tokens_fluxo(
+            ler_blocos_arquivo(caminho_arquivo, encoding, tamanho_bloco), modelo)
+
+    def aquecer_codificadores(self, modelos: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Carrega antecipadamente os codificadores dos modelos
+
+        Args:
+            modelos: Lista de modelos (se None, usa todos os modelos de texto)
+
+        Returns:
+            Dicionário com o nome da codificação de cada modelo
+        """
+        if modelos is None:
+            modelos = self.parametros.listar_modelos_texto()
+
+        return self.registro_codificadores.aquecer(modelos)
+
+    def contar_tokens_lote(self, textos: Iterable[str], modelos: Union[str, Iterable[str]],
+                           num_threads: int = 8, tamanho_bloco: int = 10000) -> List[int]:
+        """
+        Conta os tokens de vários textos de uma só vez
+
+        Os textos são agrupados por codificação e os repetidos são contados
+        uma única vez. Cada grupo é tokenizado em blocos com o codificador em
+        lote do tiktoken, que distribui o trabalho em um pool de threads.
+
+        Args:
+            textos: Textos para contar tokens
+            modelos: Nome do modelo para todos os textos, ou um modelo por texto
+            num_threads: Número de threads usadas pelo tiktoken em cada bloco
+            tamanho_bloco: Quantidade de textos distintos tokenizados por bloco
+
+        Returns:
+            Lista com o número de tokens de cada texto, na ordem de entrada
+
+        Raises:
+            ValueError: Se a quantidade de modelos for diferente da de textos
+        """
+        textos = list(textos)
+        if isinstance(modelos, str):
+            modelos = [modelos] * len(textos)
+        else:
+            modelos = list(modelos)
+            if len(modelos) != len(textos):
+                raise ValueError(
+                    "A quantidade de modelos deve ser igual à quantidade de textos")
+
+        # Para cada codificação: textos distintos e a posição de cada um
+        textos_unicos: Dict[str, Dict[str, int]] = {}
+        modelo_por_codificacao: Dict[str, str] = {}
+        referencias: List[Tuple[str, int]] = []
+
+        for texto, modelo in zip(textos, modelos):
+            codificacao = self.registro_codificadores.obter_nome_codificacao(
+                modelo)
+            unicos = textos_unicos.get(codificacao)
+            if unicos is None:
+                unicos = textos_unicos[codificacao] = {}
+                modelo_por_codificacao[codificacao] = modelo
+            posicao = unicos.setdefault(texto, len(unicos))
+            referencias.append((codificacao, posicao))
+
+        contagens: Dict[str, List[int]] = {}
+        for codificacao, unicos in textos_unicos.items():
+            lista_unicos = list(unicos)
+            if not TIKTOKEN_AVAILABLE:
+                contagens[codificacao] = [
+                    _fallback_encode(texto) for texto in lista_unicos]
+                continue
+
+            codificador = self.registro_codificadores.obter_codificador(
+                modelo_por_codificacao[codificacao])
+            resultado: List[int] = []
+            for inicio in range(0, len(lista_unicos), tamanho_bloco):
+                bloco = lista_unicos[inicio:inicio + tamanho_bloco]
+                resultado.extend(self._contar_bloco(
+                    codificador, codificacao, bloco, num_threads))
+            contagens[codificacao] = resultado
+
+        return [contagens[codificacao][posicao]
+                for codificacao, posicao in referencias]
+
+    def _contar_bloco(self, codificador: Any, codificacao: str, bloco: List[str],
+                      num_threads: int) -> List[int]:
+        """Conta um bloco de textos distintos, consultando o cache se houver"""
+        if self.cache is None:
+            return [len(tokens) for tokens in
+                    codificador.encode_batch(bloco, num_threads=num_threads)]
+
+        resultado = self.cache.obter_varios(bloco, codificacao)
+        faltantes = [texto for texto, tokens in zip(bloco, resultado) if tokens is None]
+        novas: Dict[str, int] = {}
+        if faltantes:
+            novas = dict(zip(faltantes, (
+                len(tokens) for tokens in
+                codificador.encode_batch(faltantes, num_threads=num_threads))))
+            self.cache.guardar_varios(novas, codificacao)
+        return [novas[texto] if tokens is None else tokens
+                for texto, tokens in zip(bloco, resultado)]
 
     def calcular_custo_completo(self, texto_entrada: str, modelo: str,
                                 tokens_resposta: int = 100) -> Dict[str, float]:
@@ -72,7 +360,15 @@ class CalculadoraTokens:
             Dicionário com custos detalhados
         """
         tokens_entrada = self.contar_tokens(texto_entrada, modelo)
-
+        custos = self._montar_custo_completo(modelo, tokens_entrada, tokens_resposta)
+        if self.historico is not None:
+            self.historico.registrar_estimativa(modelo, tokens_entrada, tokens_resposta,
+                                                custos['custo_total'])
+        return custos
+
+    def _montar_custo_completo(self, modelo: str, tokens_entrada: int,
+                               tokens_resposta: int) -> Dict[str, float]:
+        """Monta o dicionário de custos a partir de uma contagem já feita"""
         custo_entrada = self.calcular_custo(modelo, tokens_entrada, 0)
         custo_saida = self.calcular_custo(modelo, 0, tokens_resposta)
         custo_total = custo_entrada + custo_saida
@@ -99,12 +395,26 @@ class CalculadoraTokens:
             Dicionário com comparação detalhada
         """
         resultados = {}
+        registro = self.parametros.registro
+
+        # Modelos com a mesma codificação têm a mesma contagem de tokens,
+        # então o texto é tokenizado uma única vez por codificação
+        tokens_por_codificacao: Dict[str, int] = {}
 
         for modelo in modelos:
-            if modelo in self.parametros.listar_modelos_disponiveis():
-                custo_info = self.calcular_custo_completo(
-                    texto, modelo, tokens_resposta)
-                resultados[modelo] = custo_info
+            config = registro.obter(modelo)
+            if config is not None and config.preco_por_minuto > 0:
+                # Modelos de transcrição são cobrados por minuto, não por token
+                print(f"AVISO: Modelo '{modelo}' e cobrado por minuto de audio; "
+                      f"use calcular_custo_audio")
+            elif config is not None:
+                codificacao = self.registro_codificadores.obter_nome_codificacao(
+                    modelo)
+                if codificacao not in tokens_por_codificacao:
+                    tokens_por_codificacao[codificacao] = self.contar_tokens(
+                        texto, modelo)
+                resultados[modelo] = self._montar_custo_completo(
+                    modelo, tokens_por_codificacao[codificacao], tokens_resposta)
             else:
                 print(
                     f"AVISO: Modelo '{modelo}' nao encontrado nos parametros configurados")
@@ -124,16 +434,106 @@ class CalculadoraTokens:
         Returns:
             Tupla com (nome_do_modelo, custo_total)
         """
-        comparacao = self.comparar_custo_modelos(
-            texto, modelos, tokens_resposta)
+        comparacao = self.comparar(texto, modelos, tokens_resposta)
 
-        if not comparacao:
+        if comparacao.modelo_mais_economico is None:
             raise ValueError("Nenhum modelo válido encontrado para comparação")
 
-        modelo_mais_barato = min(comparacao.keys(),
-                                 key=lambda x: comparacao[x]['custo_total'])
+        return comparacao.modelo_mais_economico, comparacao.custo_mais_economico
+
+    def comparar(self, texto: str, modelos: List[str],
+                 tokens_resposta: int = 100) -> ComparacaoCustos:
+        """
+        Compara os modelos e devolve um resultado reutilizável
+
+        O texto é tokenizado uma única vez por codificação; o relatório, a
+        busca do mais econômico e a exportação em JSON usam o mesmo resultado.
+
+        Args:
+            texto: Texto para análise
+            modelos: Lista de modelos para comparar
+            tokens_resposta: Número estimado de tokens na resposta
+
+        Returns:
+            ComparacaoCustos com contagens, custos, mais econômico e diferenças
+        """
+        resultados = self.comparar_custo_modelos(texto, modelos, tokens_resposta)
+        return ComparacaoCustos.a_partir_de_resultados(resultados, tokens_resposta)
+
+    def varrer_custos(self, textos: Union[str, List[str]], modelos: List[str],
+                      tamanhos_resposta: List[int]) -> VarreduraCustos:
+        """
+        Calcula em uma única passada os custos de vários cenários de resposta
+
+        Cada texto é tokenizado uma única vez por codificação, e a matriz
+        modelos × tamanhos de resposta × textos é montada a partir dessas
+        contagens, junto com o modelo mais econômico de cada coluna.
+
+        Args:
+            textos: Texto ou lista de textos de entrada
+            modelos: Lista de modelos para comparar
+            tamanhos_resposta: Números estimados de tokens na resposta
+
+        Returns:
+            VarreduraCustos com a matriz de custos e os mais econômicos
 
-        return modelo_mais_barato, comparacao[modelo_mais_barato]['custo_total']
+        Raises:
+            ValueError: Se nenhum modelo válido for informado
+        """
+        if isinstance(textos, str):
+            textos = [textos]
+
+        registro = self.parametros.registro
+        validos = []
+        for modelo in modelos:
+            config = registro.obter(modelo)
+            if config is not None and config.preco_por_minuto > 0:
+                print(f"AVISO: Modelo '{modelo}' e cobrado por minuto de audio; "
+                      f"use calcular_custo_audio")
+            elif config is not None:
+                validos.append(modelo)
+            else:
+                print(
+                    f"AVISO: Modelo '{modelo}' nao encontrado nos parametros configurados")
+
+        if not validos:
+            raise ValueError("Nenhum modelo válido encontrado para comparação")
+
+        # Uma contagem por texto e por codificação
+        tokens_por_codificacao: Dict[str, List[int]] = {}
+        tokens_entrada: Dict[str, List[int]] = {}
+        for modelo in validos:
+            codificacao = self.registro_codificadores.obter_nome_codificacao(modelo)
+            if codificacao not in tokens_por_codificacao:
+                tokens_por_codificacao[codificacao] = self.contar_tokens_lote(
+                    textos, modelo)
+            tokens_entrada[modelo] = tokens_por_codificacao[codificacao]
+
+        custos: List[List[List[float]]] = []
+        for modelo in validos:
+            config = self.parametros.obter_modelo(modelo)
+            custos_entrada = [(tokens / 1000) * config.preco_entrada_por_1k_tokens
+                              for tokens in tokens_entrada[modelo]]
+            linhas = []
+            for tamanho in tamanhos_resposta:
+                custo_saida = (tamanho / 1000) * config.preco_saida_por_1k_tokens
+                linhas.append([custo + custo_saida for custo in custos_entrada])
+            custos.append(linhas)
+
+        mais_economicos = [
+            [min(range(len(validos)),
+                 key=lambda m: custos[m][indice_tamanho][indice_texto])
+             for indice_texto in range(len(textos))]
+            for indice_tamanho in range(len(tamanhos_resposta))
+        ]
+
+        return VarreduraCustos(
+            modelos=validos,
+            tamanhos_resposta=list(tamanhos_resposta),
+            tokens_entrada=tokens_entrada,
+            custos=custos,
+            mais_economicos=mais_economicos
+        )
 
     def calcular_custo(self, nome_modelo: str, tokens_entrada: int, tokens_saida: int = 0) -> float:
         """
@@ -157,6 +557,23 @@ class CalculadoraTokens:
 
         return custo_entrada + custo_saida
 
+    def calcular_custo_audio(self, nome_modelo: str, duracao_segundos: float) -> float:
+        """
+        Calcula o custo de transcrever um áudio, pelo preço por minuto do modelo
+
+        Args:
+            nome_modelo: Nome do modelo de transcrição
+            duracao_segundos: Duração do áudio em segundos
+
+        Returns:
+            Custo total em dólares
+        """
+        modelo = self.parametros.obter_modelo(nome_modelo)
+        if not modelo:
+            raise ValueError(f"Modelo '{nome_modelo}' não encontrado")
+
+        return (duracao_segundos / 60) * modelo.preco_por_minuto
+
     def verificar_limite_tokens(self, nome_modelo: str, tokens_entrada: int, tokens_saida: int = 0) -> bool:
         """
         Verifica se o número de tokens está dentro do limite do modelo
@@ -176,25 +593,27 @@ class CalculadoraTokens:
         return (tokens_entrada + tokens_saida) <= modelo.limite_tokens
 
     def mostrar_comparacao_detalhada(self, texto: str, modelos: Optional[List[str]] = None,
-                                     tokens_resposta: int = 100):
+                                     tokens_resposta: int = 100,
+                                     comparacao: Optional[ComparacaoCustos] = None):
         """
         Exibe uma comparação detalhada dos modelos
 
         Args:
             texto: Texto para análise
-            modelos: Lista de modelos (se None, usa todos os disponíveis)
+            modelos: Lista de modelos (se None, usa todos os modelos de texto)
             tokens_resposta: Número estimado de tokens na resposta
+            comparacao: Resultado já calculado por comparar (evita recalcular)
         """
         if modelos is None:
-            modelos = self.parametros.listar_modelos_disponiveis()
+            modelos = self.parametros.listar_modelos_texto()
 
         print(f"ANALISE DE CUSTOS PARA O TEXTO:")
         print(f"'{texto[:100]}{'...' if len(texto) > 100 else ''}'\n")
 
-        comparacao = self.comparar_custo_modelos(
-            texto, modelos, tokens_resposta)
+        if comparacao is None:
+            comparacao = self.comparar(texto, modelos, tokens_resposta)
 
-        if not comparacao:
+        if comparacao.modelo_mais_economico is None:
             print("ERRO: Nenhum modelo valido encontrado")
             return
 
@@ -203,26 +622,23 @@ class CalculadoraTokens:
         print("-" * 85)
 
         # Dados dos modelos
-        for modelo, dados in comparacao.items():
+        for modelo, dados in comparacao.resultados.items():
             print(f"{modelo:<20} {dados['tokens_entrada']:<15} "
                   f"${dados['custo_entrada']:.6f}{'':<8} "
                   f"${dados['custo_saida']:.6f}{'':<8} "
                   f"${dados['custo_total']:.6f}")
 
-        # Encontrar e destacar o mais econômico
-        modelo_barato, custo_barato = self.encontrar_modelo_mais_economico(
-            texto, modelos, tokens_resposta)
+        # Destacar o mais econômico
+        modelo_barato = comparacao.modelo_mais_economico
+        custo_barato = comparacao.custo_mais_economico
 
         print("\n" + "="*85)
         print(f"MODELO MAIS ECONOMICO: {modelo_barato} (${custo_barato:.6f})")
 
         # Mostrar diferenças percentuais
         print("\nDIFERENCAS EM RELACAO AO MODELO MAIS BARATO:")
-        for modelo, dados in comparacao.items():
-            if modelo != modelo_barato:
-                diferenca = (
-                    (dados['custo_total'] - custo_barato) / custo_barato) * 100
-                print(f"{modelo}: {diferenca:.1f}% mais caro")
+        for modelo, diferenca in comparacao.diferencas_percentuais.items():
+            print(f"{modelo}: {diferenca:.1f}% mais caro")
 
 
 def main():
@@ -255,11 +671,11 @@ def main():
     print("=" * 60)
 
     tamanhos_resposta = [50, 100, 200, 500]
-    for tamanho in tamanhos_resposta:
+    varredura = calculadora.varrer_custos(
+        texto_exemplo, ['gpt-4', 'gpt-3.5-turbo'], tamanhos_resposta)
+    for indice, tamanho in enumerate(tamanhos_resposta):
         print(f"\nResposta com {tamanho} tokens:")
-        modelo_barato, custo = calculadora.encontrar_modelo_mais_economico(
-            texto_exemplo, ['gpt-4', 'gpt-3.5-turbo'], tamanho
-        )
+        modelo_barato, custo = varredura.modelo_mais_economico(indice)
         print(f"   Modelo mais economico: {modelo_barato} (${custo:.6f})")
 
 
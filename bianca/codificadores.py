@@ -0,0 +1,163 @@
+"""
+Registro de Codificadores de Tokens - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo mantém, em um registro único por processo, os codificadores do
+tiktoken usados na contagem de tokens:
+- Resolução do nome do modelo para a codificação (feita uma única vez)
+- Codificadores mantidos em memória após o primeiro carregamento
+- Pré-aquecimento para todos os modelos configurados em ParametrosIA
+- Estatísticas de acertos e falhas do registro
+
+Usado por calcular_tokens.py para evitar a busca do codificador (e a exceção
+de modelo desconhecido) a cada contagem.
+"""
+
+import importlib.util
+import threading
+from typing import Any, Dict, List, Optional
+
+# Verifica a instalação sem importar o tiktoken: a importação (lenta) só
+# acontece no primeiro carregamento de um codificador
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# Codificação usada quando o tiktoken não reconhece o modelo
+CODIFICACAO_PADRAO = "cl100k_base"
+
+
+class RegistroCodificadores:
+    """Registro de processo com os codificadores do tiktoken já carregados"""
+
+    def __init__(self, codificacao_padrao: str = CODIFICACAO_PADRAO):
+        self.codificacao_padrao = codificacao_padrao
+        self._codificacao_por_modelo: Dict[str, str] = {}
+        self._codificadores: Dict[str, Any] = {}
+        self._trava = threading.Lock()
+        self._acertos = 0
+        self._falhas = 0
+
+    def obter_nome_codificacao(self, modelo: str) -> str:
+        """
+        Retorna o nome da codificação usada por um modelo
+
+        Modelos não reconhecidos pelo tiktoken usam a codificação padrão.
+        O resultado fica registrado, então a resolução acontece uma única vez.
+
+        Args:
+            modelo: Nome do modelo de IA
+
+        Returns:
+            Nome da codificação (ex.: 'cl100k_base', 'o200k_base')
+        """
+        nome = self._codificacao_por_modelo.get(modelo)
+        if nome is not None:
+            return nome
+
+        if not TIKTOKEN_AVAILABLE:
+            nome = self.codificacao_padrao
+        else:
+            import tiktoken
+            try:
+                nome = tiktoken.encoding_name_for_model(modelo)
+            except KeyError:
+                nome = self.codificacao_padrao
+
+        self._codificacao_por_modelo[modelo] = nome
+        return nome
+
+    def obter_codificador(self, modelo: str) -> Any:
+        """
+        Retorna o codificador do tiktoken para um modelo
+
+        Args:
+            modelo: Nome do modelo de IA
+
+        Returns:
+            Instância de tiktoken.Encoding
+
+        Raises:
+            ImportError: Se o tiktoken não estiver instalado
+        """
+        # Caminho rápido: modelo já resolvido e codificador em memória
+        nome = self._codificacao_por_modelo.get(modelo)
+        if nome is not None:
+            codificador = self._codificadores.get(nome)
+            if codificador is not None:
+                self._acertos += 1
+                return codificador
+
+        if not TIKTOKEN_AVAILABLE:
+            raise ImportError("tiktoken não está instalado")
+
+        with self._trava:
+            self._falhas += 1
+            nome = self.obter_nome_codificacao(modelo)
+            codificador = self._codificadores.get(nome)
+            if codificador is None:
+                import tiktoken
+
+                from .cache_codificacoes import configurar_cache_tiktoken
+
+                # Usa os arquivos BPE locais, quando houver, em vez da rede
+                configurar_cache_tiktoken()
+                codificador = tiktoken.get_encoding(nome)
+                self._codificadores[nome] = codificador
+            return codificador
+
+    def aquecer(self, modelos: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Carrega antecipadamente os codificadores de uma lista de modelos
+
+        Args:
+            modelos: Lista de modelos (se None, usa os modelos de texto de ParametrosIA)
+
+        Returns:
+            Dicionário com o nome da codificação de cada modelo
+        """
+        if modelos is None:
+            from .parametros import obter_parametros
+            modelos = obter_parametros().listar_modelos_texto()
+
+        codificacoes = {}
+        for modelo in modelos:
+            codificacoes[modelo] = self.obter_nome_codificacao(modelo)
+            if TIKTOKEN_AVAILABLE:
+                self.obter_codificador(modelo)
+
+        return codificacoes
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas de uso do registro
+
+        Os contadores não são protegidos por trava no caminho rápido, então
+        são aproximados quando há várias threads contando tokens.
+
+        Returns:
+            Dicionário com acertos, falhas, taxa de acerto e itens carregados
+        """
+        total = self._acertos + self._falhas
+        return {
+            'acertos': self._acertos,
+            'falhas': self._falhas,
+            'taxa_acerto': self._acertos / total if total else 0.0,
+            'modelos_resolvidos': len(self._codificacao_por_modelo),
+            'codificacoes_carregadas': sorted(self._codificadores.keys()),
+        }
+
+    def limpar(self) -> None:
+        """Remove os codificadores carregados e zera as estatísticas"""
+        with self._trava:
+            self._codificacao_por_modelo.clear()
+            self._codificadores.clear()
+            self._acertos = 0
+            self._falhas = 0
+
+
+# Instância global para uso em toda a aplicação
+registro_codificadores = RegistroCodificadores()
+
+
+def obter_registro_codificadores() -> RegistroCodificadores:
+    """Função de conveniência para obter o registro global de codificadores"""
+    return registro_codificadores
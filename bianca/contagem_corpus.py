@@ -0,0 +1,237 @@
+"""
+Contagem de Tokens e Custos de Corpus com Múltiplos Processos - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo estima tokens e custos de grandes volumes de textos usando um
+pool de processos:
+- Cada processo aquece seus próprios codificadores uma única vez
+- Os textos são divididos em fragmentos distribuídos entre os núcleos
+- Cada texto é tokenizado uma vez por codificação (não por modelo)
+- Os processos devolvem apenas totais e arrays compactos de contagens
+
+Baseado em CalculadoraTokens.contar_tokens e CalculadoraTokens.calcular_custo.
+"""
+
+import os
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .calcular_tokens import CalculadoraTokens
+
+# Tipo do array de contagens por item (inteiro sem sinal de 32 bits)
+TIPO_CONTAGEM = 'I'
+
+# Totais de tokens e contagens por item devolvidos por um fragmento
+ResultadoFragmento = Tuple[Dict[str, int], Dict[str, array]]
+
+# Calculadora de cada processo do pool, criada pelo inicializador
+_calculadora_processo: Optional[CalculadoraTokens] = None
+
+
+def _inicializar_processo(modelos: List[str]) -> None:
+    """Cria a calculadora do processo e aquece os codificadores"""
+    global _calculadora_processo
+    _calculadora_processo = CalculadoraTokens()
+    _calculadora_processo.aquecer_codificadores(modelos)
+
+
+def _processar_fragmento(textos: List[str], modelos: List[str],
+                         manter_contagens: bool) -> ResultadoFragmento:
+    """
+    Conta os tokens de um fragmento de textos
+
+    Args:
+        textos: Textos do fragmento
+        modelos: Um modelo representante por codificação
+        manter_contagens: Se True, devolve também a contagem de cada texto
+
+    Returns:
+        Tupla com (total de tokens por modelo, contagens por modelo)
+    """
+    if _calculadora_processo is None:
+        _inicializar_processo(modelos)
+    calculadora = _calculadora_processo
+
+    totais: Dict[str, int] = {}
+    contagens: Dict[str, array] = {}
+    for modelo in modelos:
+        valores = array(TIPO_CONTAGEM,
+                        (calculadora.contar_tokens(texto, modelo) for texto in textos))
+        totais[modelo] = sum(valores)
+        if manter_contagens:
+            contagens[modelo] = valores
+
+    return totais, contagens
+
+
+@dataclass
+class ResultadoCorpus:
+    """Resultado da contagem de tokens e custos de um corpus"""
+    total_itens: int
+    tokens_resposta: int
+    totais_por_modelo: Dict[str, Dict[str, float]]
+    # Contagem de entrada de cada item; modelos com a mesma codificação
+    # compartilham o mesmo array
+    contagens_por_modelo: Dict[str, array] = field(default_factory=dict)
+
+    def custo_total(self) -> Dict[str, float]:
+        """Retorna o custo total estimado de cada modelo"""
+        return {modelo: totais['custo_total']
+                for modelo, totais in self.totais_por_modelo.items()}
+
+
+class ContadorCorpus:
+    """Conta tokens e estima custos de grandes corpora com um pool de processos"""
+
+    def __init__(self, modelos: List[str], tokens_resposta: int = 100,
+                 processos: Optional[int] = None, tamanho_fragmento: int = 5000):
+        """
+        Args:
+            modelos: Modelos para os quais os custos serão estimados
+            tokens_resposta: Número estimado de tokens na resposta de cada item
+            processos: Número de processos (se None, usa o número de núcleos)
+            tamanho_fragmento: Quantidade de textos enviada a cada processo por vez
+
+        Raises:
+            ValueError: Se algum modelo não estiver configurado
+        """
+        self.calculadora = CalculadoraTokens()
+        parametros = self.calculadora.parametros
+        for modelo in modelos:
+            if not parametros.contem_modelo(modelo):
+                raise ValueError(f"Modelo '{modelo}' não encontrado")
+
+        self.modelos = list(modelos)
+        self.tokens_resposta = tokens_resposta
+        self.processos = processos or os.cpu_count() or 1
+        self.tamanho_fragmento = tamanho_fragmento
+
+        # Um modelo representante por codificação: cada texto é contado uma
+        # única vez por codificação
+        registro = self.calculadora.registro_codificadores
+        self._representantes: Dict[str, str] = {}
+        self._representante_por_modelo: Dict[str, str] = {}
+        for modelo in self.modelos:
+            codificacao = registro.obter_nome_codificacao(modelo)
+            representante = self._representantes.setdefault(codificacao, modelo)
+            self._representante_por_modelo[modelo] = representante
+
+    def _fragmentos(self, textos: Iterable[str]) -> Iterable[List[str]]:
+        """Divide os textos em fragmentos sem carregar o corpus inteiro"""
+        iterador = iter(textos)
+        while True:
+            fragmento = list(islice(iterador, self.tamanho_fragmento))
+            if not fragmento:
+                return
+            yield fragmento
+
+    def processar(self, textos: Iterable[str],
+                  manter_contagens: bool = False) -> ResultadoCorpus:
+        """
+        Conta os tokens e estima os custos de um corpus
+
+        Args:
+            textos: Textos do corpus (pode ser um gerador)
+            manter_contagens: Se True, guarda a contagem de cada item
+
+        Returns:
+            ResultadoCorpus com os totais por modelo e, opcionalmente,
+            as contagens por item
+        """
+        representantes = list(self._representantes.values())
+        totais_tokens = {modelo: 0 for modelo in representantes}
+        contagens = {modelo: array(TIPO_CONTAGEM) for modelo in representantes}
+        total_itens = 0
+
+        def acumular(tamanho: int, resultado: ResultadoFragmento) -> None:
+            nonlocal total_itens
+            totais, contagens_fragmento = resultado
+            total_itens += tamanho
+            for modelo, total in totais.items():
+                totais_tokens[modelo] += total
+            for modelo, valores in contagens_fragmento.items():
+                contagens[modelo].extend(valores)
+
+        if self.processos == 1:
+            _inicializar_processo(representantes)
+            for fragmento in self._fragmentos(textos):
+                acumular(len(fragmento), _processar_fragmento(
+                    fragmento, representantes, manter_contagens))
+        else:
+            self._processar_em_pool(textos, representantes,
+                                    manter_contagens, acumular)
+
+        return self._montar_resultado(total_itens, totais_tokens,
+                                      contagens if manter_contagens else {})
+
+    def _processar_em_pool(self, textos: Iterable[str], representantes: List[str],
+                           manter_contagens: bool,
+                           acumular: Callable[[int, ResultadoFragmento], None]) -> None:
+        """Distribui os fragmentos no pool, mantendo a ordem dos resultados"""
+        # Limita os fragmentos em andamento e os concluídos à espera de um
+        # fragmento anterior, para manter a memória estável
+        max_pendentes = self.processos * 2
+        pendentes: Set[Future] = set()
+        indice_por_futuro: Dict[Future, Tuple[int, int]] = {}
+        concluidos: Dict[int, Tuple[int, ResultadoFragmento]] = {}
+        proximo = 0
+
+        def recolher(feitos: Set[Future]) -> None:
+            nonlocal proximo
+            for futuro in feitos:
+                indice, tamanho = indice_por_futuro.pop(futuro)
+                concluidos[indice] = (tamanho, futuro.result())
+            # Acumula em ordem para que as contagens sigam a ordem de entrada
+            while proximo in concluidos:
+                tamanho, resultado = concluidos.pop(proximo)
+                acumular(tamanho, resultado)
+                proximo += 1
+
+        with ProcessPoolExecutor(max_workers=self.processos,
+                                 initializer=_inicializar_processo,
+                                 initargs=(representantes,)) as executor:
+            for indice, fragmento in enumerate(self._fragmentos(textos)):
+                futuro = executor.submit(_processar_fragmento, fragmento,
+                                         representantes, manter_contagens)
+                indice_por_futuro[futuro] = (indice, len(fragmento))
+                pendentes.add(futuro)
+                # Um fragmento lento segura os seguintes em concluidos; eles
+                # também contam no limite
+                while pendentes and len(pendentes) + len(concluidos) >= max_pendentes:
+                    feitos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    recolher(feitos)
+
+            feitos, _ = wait(pendentes)
+            recolher(feitos)
+
+    def _montar_resultado(self, total_itens: int, totais_tokens: Dict[str, int],
+                          contagens: Dict[str, array]) -> ResultadoCorpus:
+        """Calcula os custos de cada modelo a partir dos totais de tokens"""
+        totais_por_modelo: Dict[str, Dict[str, float]] = {}
+        contagens_por_modelo: Dict[str, array] = {}
+        tokens_saida = self.tokens_resposta * total_itens
+
+        for modelo in self.modelos:
+            representante = self._representante_por_modelo[modelo]
+            tokens_entrada = totais_tokens[representante]
+            custo_entrada = self.calculadora.calcular_custo(modelo, tokens_entrada, 0)
+            custo_saida = self.calculadora.calcular_custo(modelo, 0, tokens_saida)
+            totais_por_modelo[modelo] = {
+                'tokens_entrada': tokens_entrada,
+                'tokens_saida': tokens_saida,
+                'custo_entrada': custo_entrada,
+                'custo_saida': custo_saida,
+                'custo_total': custo_entrada + custo_saida
+            }
+            if representante in contagens:
+                contagens_por_modelo[modelo] = contagens[representante]
+
+        return ResultadoCorpus(
+            total_itens=total_itens,
+            tokens_resposta=self.tokens_resposta,
+            totais_por_modelo=totais_por_modelo,
+            contagens_por_modelo=contagens_por_modelo
+        )
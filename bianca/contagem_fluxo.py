@@ -0,0 +1,193 @@
+"""
+Leitura em Blocos para Contagem de Tokens em Fluxo - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo permite contar tokens de arquivos grandes sem carregá-los
+inteiros na memória:
+- Leitura de arquivos em blocos (com mmap sempre que possível)
+- Leitura de qualquer fluxo de texto ou binário em blocos
+- Corte dos blocos em limites seguros para a tokenização
+
+Um limite é seguro quando a pré-tokenização do tiktoken (cl100k_base,
+o200k_base e anteriores) sempre separa o texto naquele ponto. Assim, a soma
+das contagens dos trechos é igual à contagem do texto inteiro. São usados:
+- Início de uma linha que começa com letra ou dígito ("\\n" + "x")
+- Espaço entre duas letras, cortando antes do espaço ("a" | " b")
+
+Usado por CalculadoraTokens.contar_tokens_arquivo e contar_tokens_fluxo.
+"""
+
+import codecs
+import io
+import mmap
+from typing import IO, Iterable, Iterator, Union
+
+# Tamanho padrão dos blocos lidos (em bytes para arquivos, em caracteres para fluxos)
+TAMANHO_BLOCO_PADRAO = 1024 * 1024
+
+
+def _decodificar_blocos(blocos_binarios: Iterable[bytes], encoding: str) -> Iterator[str]:
+    """Decodifica blocos binários, tratando caracteres e quebras de linha divididos"""
+    # Mesma tradução de quebras de linha feita por open(..., "r")
+    decodificador = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(encoding)(), translate=True)
+    for bloco in blocos_binarios:
+        texto = decodificador.decode(bloco)
+        if texto:
+            yield texto
+    texto = decodificador.decode(b"", final=True)
+    if texto:
+        yield texto
+
+
+def _blocos_mmap(mapa: mmap.mmap, tamanho_bloco: int) -> Iterator[bytes]:
+    """Percorre um arquivo mapeado em memória em fatias"""
+    for inicio in range(0, len(mapa), tamanho_bloco):
+        yield mapa[inicio:inicio + tamanho_bloco]
+
+
+def ler_blocos_arquivo(caminho_arquivo: str, encoding: str = "utf-8",
+                       tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Iterator[str]:
+    """
+    Lê um arquivo de texto em blocos, mapeando-o em memória quando possível
+
+    Os blocos são cortados em posições arbitrárias; use dividir_em_limites_seguros
+    antes de tokenizar.
+
+    Args:
+        caminho_arquivo: Caminho do arquivo a ser lido
+        encoding: Codificação do arquivo (padrão: "utf-8")
+        tamanho_bloco: Tamanho de cada bloco em bytes
+
+    Yields:
+        Blocos de texto decodificados
+
+    Raises:
+        FileNotFoundError: Se o arquivo não for encontrado
+        PermissionError: Se não houver permissão para ler o arquivo
+        UnicodeDecodeError: Se houver erro na decodificação do arquivo
+    """
+    try:
+        with open(caminho_arquivo, "rb") as f:
+            try:
+                mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Arquivo vazio, pipe ou sistema de arquivos sem suporte a mmap
+                mapa = None
+
+            if mapa is None:
+                yield from _decodificar_blocos(
+                    iter(lambda: f.read(tamanho_bloco), b""), encoding)
+            else:
+                with mapa:
+                    yield from _decodificar_blocos(
+                        _blocos_mmap(mapa, tamanho_bloco), encoding)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(
+            e.errno, f"Arquivo '{caminho_arquivo}' não encontrado", caminho_arquivo) from e
+    except PermissionError as e:
+        raise PermissionError(
+            e.errno, f"Sem permissão para ler o arquivo '{caminho_arquivo}'",
+            caminho_arquivo) from e
+    except UnicodeDecodeError as e:
+        raise UnicodeDecodeError(
+            e.encoding, e.object, e.start, e.end,
+            f"{e.reason} (arquivo '{caminho_arquivo}' lido com encoding '{encoding}')") from e
+
+
+def ler_blocos_fluxo(fluxo: IO, encoding: str = "utf-8",
+                     tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Iterator[str]:
+    """
+    Lê um fluxo aberto (texto ou binário) em blocos
+
+    Args:
+        fluxo: Objeto com método read (ex.: arquivo aberto, sys.stdin, io.StringIO)
+        encoding: Codificação usada quando o fluxo é binário
+        tamanho_bloco: Tamanho de cada leitura
+
+    Yields:
+        Blocos de texto
+    """
+    primeiro = fluxo.read(tamanho_bloco)
+    if isinstance(primeiro, bytes):
+        def binarios() -> Iterator[bytes]:
+            yield primeiro
+            yield from iter(lambda: fluxo.read(tamanho_bloco), b"")
+        yield from _decodificar_blocos(binarios(), encoding)
+        return
+
+    while primeiro:
+        yield primeiro
+        primeiro = fluxo.read(tamanho_bloco)
+
+
+def _encontrar_limite_seguro(texto: str) -> int:
+    """
+    Retorna a última posição de corte segura no texto (0 se não houver)
+
+    O último caractere é deixado de fora da busca porque o que vem depois
+    dele ainda não é conhecido.
+    """
+    # Início de linha com letra ou dígito (pontuação pode ser absorvida pela
+    # linha anterior, como em ".\n/" no o200k_base)
+    posicao = texto.rfind("\n", 0, len(texto) - 1)
+    while posicao >= 0:
+        if texto[posicao + 1].isalnum():
+            return posicao + 1
+        posicao = texto.rfind("\n", 0, posicao)
+
+    # Espaço simples entre duas letras
+    posicao = texto.rfind(" ", 1, len(texto) - 1)
+    while posicao > 0:
+        if texto[posicao - 1].isalpha() and texto[posicao + 1].isalpha():
+            return posicao
+        posicao = texto.rfind(" ", 1, posicao)
+
+    return 0
+
+
+def dividir_em_limites_seguros(blocos: Iterable[str]) -> Iterator[str]:
+    """
+    Reagrupa blocos de texto em trechos cortados em limites seguros
+
+    A memória usada é limitada pelo tamanho dos blocos, exceto em trechos
+    muito longos sem nenhum limite seguro, que são acumulados até o próximo.
+
+    Args:
+        blocos: Blocos de texto cortados em posições arbitrárias
+
+    Yields:
+        Trechos cuja soma de tokens é igual à do texto completo
+    """
+    pendente = ""
+    for bloco in blocos:
+        pendente += bloco
+        corte = _encontrar_limite_seguro(pendente)
+        if corte > 0:
+            yield pendente[:corte]
+            pendente = pendente[corte:]
+
+    if pendente:
+        yield pendente
+
+
+def abrir_blocos(origem: Union[str, IO, Iterable[str]], encoding: str = "utf-8",
+                 tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Iterator[str]:
+    """
+    Retorna os trechos seguros de um caminho, fluxo ou iterável de blocos
+
+    Args:
+        origem: Caminho de arquivo, fluxo com método read ou iterável de textos
+        encoding: Codificação do arquivo ou fluxo binário
+        tamanho_bloco: Tamanho de cada leitura
+
+    Returns:
+        Iterador de trechos cortados em limites seguros
+    """
+    if isinstance(origem, str):
+        blocos: Iterable[str] = ler_blocos_arquivo(origem, encoding, tamanho_bloco)
+    elif hasattr(origem, "read"):
+        blocos = ler_blocos_fluxo(origem, encoding, tamanho_bloco)
+    else:
+        blocos = origem
+    return dividir_em_limites_seguros(blocos)
@@ -1,34 +1,407 @@
+"""
+Conversão de Áudio para Texto - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
 
+Este módulo transcreve áudios longos (ex.: reuniões de uma hora) em paralelo:
+- Divide o áudio em trechos nos silêncios, abaixo do limite de tamanho da API
+- Transcreve os trechos ao mesmo tempo pelo cliente do ModeloIA
+- Junta os textos na ordem, com os tempos de início e fim de cada trecho
+- Entrega o texto parcial de cada trecho assim que ele fica pronto
 
-# TODO: Implementar conversão de áudio para texto
-# Usar biblioteca da OpenAI ou outra apropriada
-# A função deve receber um arquivo de áudio e retornar o texto transcrito
-
-# Finalidade: montar mapas mentais, resumos, etc.
-# Deve ser possível escolher o modelo de transcrição
-# Deve ser possível escolher o idioma do áudio
-# Deve ser possível escolher o formato de saída (texto simples, JSON, etc.) .estatisticas de uso
-# .historico de uso
-# .etc.
-# Deve ser possível gerar relatórios de uso e custos
-# .diarios  # .semanais
-# .mensais  # .anuais
-# .por projeto  # .por usuario .por equipe .por departamento
-# Deve ser possível exportar os dados em formatos comuns    (CSV, PDF, etc.)    
-# Deve ser possível integrar com outras ferramentas
-# .APIs  # .webhooks  # .etc.   
-# Deve ser possível configurar alertas e notificacoes
-# .limites de uso  # .custos  # .erros  # .etc.
-# Deve ser possível gerenciar usuarios e permissoes # .criar  # .editar  # .excluir  # .etc.
-# Deve ser possível auditar o uso e as alteracoes
-# .logs  # .relatorios  # .etc. 
-# Deve ser possível personalizar a interface e as funcionalidades
-# .temas  # .atalhos  # .etc.   
-# Deve ser possível fornecer suporte e documentacao
-# .FAQs  # .tutoriais  # .etc.  
-# Deve ser possível garantir a seguranca e a privacidade dos dados
-# .criptografia  # .backup  # .etc. 
-# Deve ser possível escalar e otimizar o desempenho
-# .caching  # .balanceamento de carga  # .etc.
-# Deve ser possível monitorar e analisar o desempenho
-# .metricas  # .dashboards  # .etc. 
+A divisão lê arquivos WAV (PCM) com a biblioteca padrão; a energia de cada
+janela é calculada com NumPy quando disponível. Outros formatos são enviados
+inteiros se couberem no limite da API.
+"""
+
+import io
+import os
+import sys
+import wave
+from array import array
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Tuple
+
+from .calcular_tokens import CalculadoraTokens
+from .duracao_audio import MODELO_TRANSCRICAO_PADRAO, medir_duracao
+from .modelo import ModeloIA
+from .parametros import ParametrosIA, obter_parametros
+from .pool_clientes import PoolClientes
+
+if TYPE_CHECKING:
+    from .politica_tentativas import PoliticaTentativas
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Limite de tamanho de arquivo da API de transcrição (25 MB) e tamanho máximo
+# usado nos trechos, com folga para o cabeçalho e o multipart
+LIMITE_BYTES_API = 25 * 1024 * 1024
+TAMANHO_MAXIMO_TRECHO = 24 * 1024 * 1024
+
+# Trechos menores aumentam o paralelismo; o corte é feito no silêncio mais
+# próximo antes desse limite
+DURACAO_MAXIMA_TRECHO = 300.0
+
+# Detecção de silêncio: janelas de 50 ms com RMS abaixo de 2% da escala
+# cheia, por pelo menos 300 ms
+DURACAO_JANELA = 0.05
+LIMIAR_SILENCIO = 0.02
+DURACAO_MINIMA_SILENCIO = 0.3
+
+# Amostras usadas por janela no cálculo sem NumPy
+AMOSTRAS_POR_JANELA_PURO = 400
+
+# Janelas lidas do arquivo por vez no cálculo de energia
+JANELAS_POR_BLOCO = 2000
+
+MAX_PARALELO_PADRAO = 8
+
+EXTENSOES_WAV = ('.wav', '.wave')
+
+# Tipo e escala das amostras PCM por largura em bytes (WAV é little-endian)
+_FORMATOS_AMOSTRA = {1: ('B', '<u1', 128.0), 2: ('h', '<i2', 32768.0), 4: ('i', '<i4', 2147483648.0)}
+
+
+@dataclass
+class TrechoAudio:
+    """Trecho de um arquivo de áudio enviado em uma requisição"""
+    indice: int                          # Posição do trecho no áudio
+    inicio: float                        # Segundos desde o início do áudio
+    fim: Optional[float]                 # Segundos (None se a duração for desconhecida)
+    quadro_inicial: int = 0              # Primeiro quadro (WAV)
+    total_quadros: Optional[int] = None  # Quadros do trecho (None = arquivo inteiro)
+
+
+@dataclass
+class SegmentoTranscricao:
+    """Texto transcrito de um trecho (ou de um segmento dele), com tempos absolutos"""
+    indice: int                          # Índice do trecho de origem
+    inicio: float
+    fim: Optional[float]
+    texto: str
+
+
+@dataclass
+class ResultadoTranscricao:
+    """Transcrição completa de um arquivo de áudio"""
+    texto: str
+    segmentos: List[SegmentoTranscricao] = field(default_factory=list)
+    duracao: Optional[float] = None      # Segundos de áudio
+    modelo: str = MODELO_TRANSCRICAO_PADRAO
+    trechos: int = 0                     # Requisições feitas
+
+
+def _energias_bloco(dados: bytes, largura: int, amostras_janela: int) -> List[float]:
+    """RMS normalizado (0 a 1) de cada janela de um bloco de amostras PCM"""
+    codigo, tipo, escala = _FORMATOS_AMOSTRA[largura]
+    deslocamento = 128.0 if largura == 1 else 0.0
+
+    if NUMPY_AVAILABLE:
+        amostras = np.frombuffer(dados, dtype=tipo).astype(np.float32)
+        janelas = len(amostras) // amostras_janela
+        if janelas == 0:
+            return []
+        amostras = (amostras[:janelas * amostras_janela] - deslocamento) / escala
+        return np.sqrt(np.mean(
+            amostras.reshape(janelas, amostras_janela) ** 2, axis=1)).tolist()
+
+    amostras = array(codigo, dados)
+    if sys.byteorder == 'big' and largura > 1:
+        amostras.byteswap()
+    passo = max(1, amostras_janela // AMOSTRAS_POR_JANELA_PURO)
+    energias = []
+    for inicio in range(0, len(amostras) - amostras_janela + 1, amostras_janela):
+        parte = amostras[inicio:inicio + amostras_janela:passo]
+        soma = sum((valor - deslocamento) ** 2 for valor in parte)
+        energias.append((soma / len(parte)) ** 0.5 / escala)
+    return energias
+
+
+def calcular_energias(caminho_arquivo: str,
+                      duracao_janela: float = DURACAO_JANELA) -> Tuple[List[float], int]:
+    """
+    Calcula a energia (RMS normalizado) de cada janela de um arquivo WAV
+
+    Args:
+        caminho_arquivo: Caminho do arquivo WAV (PCM)
+        duracao_janela: Duração de cada janela em segundos
+
+    Returns:
+        Tupla (energias, quadros por janela)
+
+    Raises:
+        ValueError: Se a largura das amostras não for suportada (1, 2 ou 4 bytes)
+    """
+    with wave.open(caminho_arquivo, 'rb') as arquivo:
+        largura = arquivo.getsampwidth()
+        if largura not in _FORMATOS_AMOSTRA:
+            raise ValueError(f"Amostras de {largura} bytes não são suportadas na detecção de silêncio")
+        canais = arquivo.getnchannels()
+        quadros_janela = max(1, int(arquivo.getframerate() * duracao_janela))
+
+        energias: List[float] = []
+        while True:
+            dados = arquivo.readframes(quadros_janela * JANELAS_POR_BLOCO)
+            if not dados:
+                break
+            energias.extend(_energias_bloco(dados, largura, quadros_janela * canais))
+    return energias, quadros_janela
+
+
+def encontrar_silencios(energias: List[float], limiar: float = LIMIAR_SILENCIO,
+                        janelas_minimas: int = 1) -> List[int]:
+    """
+    Encontra os pontos de corte: o meio de cada silêncio longo o bastante
+
+    Args:
+        energias: RMS normalizado de cada janela
+        limiar: Energia abaixo da qual a janela é considerada silêncio
+        janelas_minimas: Janelas seguidas de silêncio necessárias
+
+    Returns:
+        Índices das janelas de corte, em ordem crescente
+    """
+    cortes = []
+    inicio = None
+    for indice, energia in enumerate(energias):
+        if energia < limiar:
+            if inicio is None:
+                inicio = indice
+        elif inicio is not None:
+            if indice - inicio >= janelas_minimas:
+                cortes.append((inicio + indice) // 2)
+            inicio = None
+    return cortes
+
+
+def dividir_wav(caminho_arquivo: str, tamanho_maximo: int = TAMANHO_MAXIMO_TRECHO,
+                duracao_maxima: float = DURACAO_MAXIMA_TRECHO,
+                limiar_silencio: float = LIMIAR_SILENCIO,
+                duracao_minima_silencio: float = DURACAO_MINIMA_SILENCIO) -> List[TrechoAudio]:
+    """
+    Divide um arquivo WAV em trechos, cortando nos silêncios
+
+    Cada trecho termina no último silêncio antes do limite de tamanho e de
+    duração (se houver um na segunda metade do trecho); sem silêncio, o corte
+    é feito no próprio limite.
+
+    Args:
+        caminho_arquivo: Caminho do arquivo WAV (PCM)
+        tamanho_maximo: Bytes máximos de cada trecho (incluindo o cabeçalho)
+        duracao_maxima: Segundos máximos de cada trecho
+        limiar_silencio: RMS normalizado abaixo do qual há silêncio
+        duracao_minima_silencio: Segundos de silêncio necessários para um corte
+
+    Returns:
+        Lista de TrechoAudio, em ordem
+    """
+    with wave.open(caminho_arquivo, 'rb') as arquivo:
+        taxa = arquivo.getframerate()
+        bytes_quadro = arquivo.getnchannels() * arquivo.getsampwidth()
+        total = arquivo.getnframes()
+
+    max_quadros = max(1, min((tamanho_maximo - 44) // bytes_quadro, int(duracao_maxima * taxa)))
+    if total <= max_quadros:
+        return [TrechoAudio(0, 0.0, total / taxa, 0, total)]
+
+    try:
+        energias, quadros_janela = calcular_energias(caminho_arquivo)
+        janelas_minimas = max(1, int(duracao_minima_silencio / DURACAO_JANELA))
+        cortes = [janela * quadros_janela for janela in
+                  encontrar_silencios(energias, limiar_silencio, janelas_minimas)]
+    except ValueError as e:
+        print(f"AVISO: {e}; dividindo '{caminho_arquivo}' em trechos de tamanho fixo")
+        cortes = []
+
+    trechos = []
+    inicio = 0
+    while inicio < total:
+        limite = inicio + max_quadros
+        if limite >= total:
+            fim = total
+        else:
+            # Último silêncio em (inicio + metade, limite]
+            posicao = bisect_right(cortes, limite) - 1
+            if posicao >= 0 and cortes[posicao] > inicio + max_quadros // 2:
+                fim = cortes[posicao]
+            else:
+                fim = limite
+        trechos.append(TrechoAudio(len(trechos), inicio / taxa, fim / taxa, inicio, fim - inicio))
+        inicio = fim
+    return trechos
+
+
+def ler_trecho_wav(caminho_arquivo: str, trecho: TrechoAudio) -> bytes:
+    """Retorna um trecho de um arquivo WAV como um novo arquivo WAV em memória"""
+    with wave.open(caminho_arquivo, 'rb') as origem:
+        parametros = origem.getparams()
+        origem.setpos(trecho.quadro_inicial)
+        dados = origem.readframes(trecho.total_quadros)
+
+    saida = io.BytesIO()
+    with wave.open(saida, 'wb') as destino:
+        destino.setparams(parametros)
+        destino.writeframes(dados)
+    return saida.getvalue()
+
+
+class ConversorAudioTexto:
+    """Transcreve arquivos de áudio em trechos paralelos"""
+
+    def __init__(self, modelo: str = MODELO_TRANSCRICAO_PADRAO,
+                 parametros_ia: Optional[ParametrosIA] = None,
+                 base_url: Optional[str] = None, pool: Optional[PoolClientes] = None,
+                 politica: Optional['PoliticaTentativas'] = None,
+                 max_paralelo: int = MAX_PARALELO_PADRAO, idioma: Optional[str] = None,
+                 tamanho_maximo_trecho: int = TAMANHO_MAXIMO_TRECHO,
+                 duracao_maxima_trecho: float = DURACAO_MAXIMA_TRECHO):
+        """
+        Args:
+            modelo: Modelo de transcrição
+            parametros_ia: Parâmetros com a chave da API (se None, usa obter_parametros)
+            base_url: URL base da API (ex.: servidor local de transcrição)
+            pool: Pool de clientes compartilhado (se None, usa o global)
+            politica: Política de novas tentativas aplicada a cada trecho (opcional)
+            max_paralelo: Máximo de trechos transcritos ao mesmo tempo
+            idioma: Idioma do áudio no formato ISO-639-1 (ex.: 'pt'); None = detectar
+            tamanho_maximo_trecho: Bytes máximos de cada trecho
+            duracao_maxima_trecho: Segundos máximos de cada trecho
+
+        Raises:
+            ValueError: Se o modelo não estiver configurado
+        """
+        self.modelo_ia = ModeloIA(modelo, parametros_ia or obter_parametros(),
+                                  base_url=base_url, pool=pool, politica=politica)
+        self.modelo = modelo
+        self.max_paralelo = max_paralelo
+        self.idioma = idioma
+        self.tamanho_maximo_trecho = tamanho_maximo_trecho
+        self.duracao_maxima_trecho = duracao_maxima_trecho
+
+    def estimar_custo(self, caminho_arquivo: str) -> float:
+        """
+        Estima o custo de transcrever um arquivo sem enviá-lo
+
+        A duração é lida dos cabeçalhos (duracao_audio.py) e multiplicada pelo
+        preço por minuto do modelo.
+
+        Raises:
+            ValueError: Se a duração não puder ser medida
+        """
+        return CalculadoraTokens().calcular_custo_audio(
+            self.modelo, medir_duracao(caminho_arquivo))
+
+    def dividir(self, caminho_arquivo: str) -> List[TrechoAudio]:
+        """
+        Divide um arquivo de áudio nos trechos que serão enviados
+
+        Args:
+            caminho_arquivo: Caminho do arquivo de áudio
+
+        Returns:
+            Lista de TrechoAudio
+
+        Raises:
+            ValueError: Se um arquivo que não é WAV passar do limite de tamanho
+        """
+        if caminho_arquivo.lower().endswith(EXTENSOES_WAV):
+            return dividir_wav(caminho_arquivo, self.tamanho_maximo_trecho,
+                               self.duracao_maxima_trecho)
+
+        if os.path.getsize(caminho_arquivo) > LIMITE_BYTES_API:
+            raise ValueError(
+                f"'{caminho_arquivo}' passa de {LIMITE_BYTES_API // (1024 * 1024)} MB e só "
+                f"arquivos WAV podem ser divididos; converta-o para WAV (ex.: ffmpeg)")
+        return [TrechoAudio(0, 0.0, None)]
+
+    def _transcrever_trecho(self, caminho_arquivo: str, trecho: TrechoAudio,
+                            opcoes: dict) -> List[SegmentoTranscricao]:
+        """Envia um trecho e converte a resposta em segmentos com tempos absolutos"""
+        nome = os.path.basename(caminho_arquivo)
+        if trecho.total_quadros is None:
+            with open(caminho_arquivo, 'rb') as arquivo:
+                dados = arquivo.read()
+        else:
+            dados = ler_trecho_wav(caminho_arquivo, trecho)
+            nome = f"{os.path.splitext(nome)[0]}_{trecho.indice:04d}.wav"
+
+        resposta = self.modelo_ia.executar_chamada(
+            lambda cliente: cliente.audio.transcriptions.create(
+                model=self.modelo, file=(nome, dados), **opcoes))
+
+        # response_format='verbose_json' traz segmentos com tempos relativos ao trecho
+        segmentos = getattr(resposta, 'segments', None)
+        if segmentos:
+            return [SegmentoTranscricao(trecho.indice, trecho.inicio + segmento.start,
+                                        trecho.inicio + segmento.end, segmento.text.strip())
+                    for segmento in segmentos]
+
+        texto = resposta if isinstance(resposta, str) else resposta.text
+        return [SegmentoTranscricao(trecho.indice, trecho.inicio, trecho.fim, texto.strip())]
+
+    def transcrever_fluxo(self, caminho_arquivo: str,
+                          **opcoes: Any) -> Iterator[SegmentoTranscricao]:
+        """
+        Transcreve um arquivo e entrega o texto de cada trecho assim que fica pronto
+
+        Os segmentos chegam na ordem em que os trechos terminam; use .indice e
+        .inicio para posicioná-los. Interromper a iteração cancela os trechos
+        que ainda não começaram.
+
+        Args:
+            caminho_arquivo: Caminho do arquivo de áudio
+            **opcoes: Demais argumentos de audio.transcriptions.create
+                (ex.: response_format='verbose_json', prompt=...)
+
+        Yields:
+            SegmentoTranscricao de cada trecho concluído
+        """
+        if self.idioma:
+            opcoes.setdefault('language', self.idioma)
+        trechos = self.dividir(caminho_arquivo)
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_paralelo, len(trechos)),
+                                      thread_name_prefix='bianca-transcricao')
+        futuros: List['Future[List[SegmentoTranscricao]]'] = []
+        try:
+            for trecho in trechos:
+                futuros.append(executor.submit(
+                    self._transcrever_trecho, caminho_arquivo, trecho, opcoes))
+            for futuro in as_completed(futuros):
+                yield from futuro.result()
+        finally:
+            # shutdown(cancel_futures=True) exige Python 3.9: os trechos que
+            # ainda não começaram são cancelados um a um
+            for futuro in futuros:
+                futuro.cancel()
+            executor.shutdown(wait=False)
+
+    def transcrever(self, caminho_arquivo: str, **opcoes: Any) -> ResultadoTranscricao:
+        """
+        Transcreve um arquivo de áudio, com os trechos em paralelo
+
+        Args:
+            caminho_arquivo: Caminho do arquivo de áudio
+            **opcoes: Demais argumentos de audio.transcriptions.create
+
+        Returns:
+            ResultadoTranscricao com o texto completo e os segmentos em ordem
+        """
+        segmentos = sorted(self.transcrever_fluxo(caminho_arquivo, **opcoes),
+                           key=lambda segmento: (segmento.indice, segmento.inicio))
+        fins = [segmento.fim for segmento in segmentos if segmento.fim is not None]
+        return ResultadoTranscricao(
+            texto=' '.join(segmento.texto for segmento in segmentos if segmento.texto),
+            segmentos=segmentos,
+            duracao=max(fins) if fins else None,
+            modelo=self.modelo,
+            trechos=len({segmento.indice for segmento in segmentos}))
+
+    def converter(self, caminho_arquivo: str, **opcoes: Any) -> str:
+        """Transcreve um arquivo de áudio e retorna apenas o texto"""
+        return self.transcrever(caminho_arquivo, **opcoes).texto
@@ -0,0 +1,250 @@
+"""
+Cálculo Vetorizado de Custos - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo recalcula custos de grandes volumes de registros de uso de uma
+só vez, em vez de chamar CalculadoraTokens.calcular_custo linha a linha:
+- Tabela de preços pré-calculada a partir de ParametrosIA.modelos
+- Custos por linha a partir de arrays de modelos e contagens de tokens
+- Totais agrupados por modelo
+- Acumulação exata em microdólares inteiros
+
+Os preços são convertidos para inteiros em microdólares por milhão de tokens,
+então os totais são somas exatas de inteiros, arredondadas uma única vez.
+
+Usa NumPy quando disponível (extra "vetorizado"); caso contrário, usa listas
+do Python com a mesma interface.
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .parametros import ParametrosIA, obter_parametros
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Fator de conversão de dólares por 1k tokens para microdólares por 1M tokens
+FATOR_PRECO_INTEIRO = 10 ** 9
+
+# Microdólares por milhão de tokens -> microdólares por token
+DIVISOR_TOKENS = 10 ** 6
+
+# Microdólares por milhão de tokens -> dólares por token
+DIVISOR_DOLARES = DIVISOR_TOKENS * 10 ** 6
+
+# Maior soma de tokens representada exatamente em ponto flutuante (bincount)
+_LIMITE_SOMA_EXATA = 2 ** 53
+
+
+def converter_preco_inteiro(preco_por_1k_tokens: float) -> int:
+    """
+    Converte um preço em dólares por 1k tokens para microdólares por 1M tokens
+
+    Args:
+        preco_por_1k_tokens: Preço configurado em ModeloConfig
+
+    Returns:
+        Preço inteiro em microdólares por milhão de tokens
+
+    Raises:
+        ValueError: Se o preço tiver mais casas decimais do que o suportado
+    """
+    valor = Decimal(repr(preco_por_1k_tokens)) * FATOR_PRECO_INTEIRO
+    if valor != valor.to_integral_value():
+        raise ValueError(
+            f"Preço {preco_por_1k_tokens} tem mais de 9 casas decimais")
+    return int(valor)
+
+
+def _dividir_arredondando(numerador: int, divisor: int) -> int:
+    """Divisão inteira com arredondamento para o mais próximo (metade para cima)"""
+    return (numerador + divisor // 2) // divisor
+
+
+class TabelaPrecos:
+    """Tabela de preços indexada para cálculo vetorizado de custos"""
+
+    def __init__(self, parametros: Optional[ParametrosIA] = None):
+        """
+        Args:
+            parametros: Parâmetros com os modelos (se None, usa os globais)
+        """
+        parametros = parametros or obter_parametros()
+        self._registro = parametros.registro
+        modelos = self._registro.modelos
+
+        self.nomes: List[str] = list(modelos.keys())
+        self.indice_por_nome: Dict[str, int] = {
+            nome: indice for indice, nome in enumerate(self.nomes)}
+        self.precos_entrada: List[int] = [
+            converter_preco_inteiro(config.preco_entrada_por_1k_tokens)
+            for config in modelos.values()]
+        self.precos_saida: List[int] = [
+            converter_preco_inteiro(config.preco_saida_por_1k_tokens)
+            for config in modelos.values()]
+
+        if NUMPY_AVAILABLE:
+            self._precos_entrada_np = np.array(self.precos_entrada, dtype=np.int64)
+            self._precos_saida_np = np.array(self.precos_saida, dtype=np.int64)
+
+    def indice(self, nome_modelo: str) -> int:
+        """
+        Retorna o índice de um modelo (ou alias com data) na tabela
+
+        Raises:
+            ValueError: Se o modelo não estiver na tabela
+        """
+        indice = self.indice_por_nome.get(nome_modelo)
+        if indice is None:
+            nome = self._registro.resolver(nome_modelo)
+            if nome is None:
+                raise ValueError(f"Modelo '{nome_modelo}' não encontrado")
+            indice = self.indice_por_nome[nome]
+        return indice
+
+    def converter_indices(self, modelos: Union[Sequence, Any]) -> Any:
+        """
+        Converte nomes de modelos (ou índices já prontos) em índices da tabela
+
+        Passar índices inteiros (ver indice) evita a conversão dos nomes, que
+        exige ordenar o array.
+
+        Args:
+            modelos: Array ou sequência de nomes de modelos ou de índices inteiros
+
+        Returns:
+            Array NumPy de índices (ou lista, sem NumPy)
+
+        Raises:
+            ValueError: Se algum modelo não estiver na tabela
+        """
+        if not NUMPY_AVAILABLE:
+            return [modelo if isinstance(modelo, int) else self.indice(modelo)
+                    for modelo in modelos]
+
+        modelos = np.asarray(modelos)
+        if modelos.dtype.kind in "iu":
+            if modelos.size and (modelos.min() < 0 or modelos.max() >= len(self.nomes)):
+                raise ValueError("Índice de modelo fora da tabela de preços")
+            return modelos.astype(np.intp, copy=False)
+
+        # Poucos modelos distintos: converte cada nome uma única vez
+        unicos, inversos = np.unique(modelos, return_inverse=True)
+        mapa = np.array([self.indice(str(nome)) for nome in unicos], dtype=np.intp)
+        return mapa[inversos.reshape(modelos.shape)]
+
+    def calcular_custos_microdolares(self, modelos: Union[Sequence, Any],
+                                     tokens_entrada: Union[Sequence[int], Any],
+                                     tokens_saida: Union[Sequence[int], Any]) -> Any:
+        """
+        Calcula o custo exato de cada linha em microdólares (arredondado)
+
+        Args:
+            modelos: Nomes ou índices dos modelos de cada linha
+            tokens_entrada: Tokens de entrada de cada linha
+            tokens_saida: Tokens de saída de cada linha
+
+        Returns:
+            Array int64 de custos em microdólares (ou lista, sem NumPy)
+        """
+        indices = self.converter_indices(modelos)
+        if not NUMPY_AVAILABLE:
+            return [_dividir_arredondando(
+                        entrada * self.precos_entrada[indice]
+                        + saida * self.precos_saida[indice], DIVISOR_TOKENS)
+                    for indice, entrada, saida in zip(indices, tokens_entrada, tokens_saida)]
+
+        entrada = np.asarray(tokens_entrada, dtype=np.int64)
+        saida = np.asarray(tokens_saida, dtype=np.int64)
+        numerador = (entrada * self._precos_entrada_np[indices]
+                     + saida * self._precos_saida_np[indices])
+        return (numerador + DIVISOR_TOKENS // 2) // DIVISOR_TOKENS
+
+    def calcular_custos(self, modelos: Union[Sequence, Any],
+                        tokens_entrada: Union[Sequence[int], Any],
+                        tokens_saida: Union[Sequence[int], Any]) -> Any:
+        """
+        Calcula o custo de cada linha em dólares
+
+        Args:
+            modelos: Nomes ou índices dos modelos de cada linha
+            tokens_entrada: Tokens de entrada de cada linha
+            tokens_saida: Tokens de saída de cada linha
+
+        Returns:
+            Array float64 de custos em dólares (ou lista, sem NumPy)
+        """
+        indices = self.converter_indices(modelos)
+        if not NUMPY_AVAILABLE:
+            return [(entrada * self.precos_entrada[indice]
+                     + saida * self.precos_saida[indice]) / DIVISOR_DOLARES
+                    for indice, entrada, saida in zip(indices, tokens_entrada, tokens_saida)]
+
+        entrada = np.asarray(tokens_entrada, dtype=np.float64)
+        saida = np.asarray(tokens_saida, dtype=np.float64)
+        return (entrada * self._precos_entrada_np[indices]
+                + saida * self._precos_saida_np[indices]) / DIVISOR_DOLARES
+
+    def _somar_por_modelo(self, indices: Any, valores: Any) -> List[int]:
+        """Soma exata de um array de inteiros agrupado por índice de modelo"""
+        valores = np.asarray(valores, dtype=np.int64)
+        if int(valores.sum()) < _LIMITE_SOMA_EXATA:
+            somas = np.bincount(indices, weights=valores, minlength=len(self.nomes))
+            return [int(soma) for soma in somas]
+
+        somas_inteiras = np.zeros(len(self.nomes), dtype=np.int64)
+        np.add.at(somas_inteiras, indices, valores)
+        return [int(soma) for soma in somas_inteiras]
+
+    def totalizar(self, modelos: Union[Sequence, Any],
+                  tokens_entrada: Union[Sequence[int], Any],
+                  tokens_saida: Union[Sequence[int], Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Soma tokens e custos agrupados por modelo
+
+        Os tokens são somados como inteiros e multiplicados pelos preços
+        inteiros, então custo_microdolares é exato (arredondado uma única vez).
+
+        Args:
+            modelos: Nomes ou índices dos modelos de cada linha
+            tokens_entrada: Tokens de entrada de cada linha
+            tokens_saida: Tokens de saída de cada linha
+
+        Returns:
+            Dicionário por modelo com linhas, tokens_entrada, tokens_saida,
+            custo_microdolares e custo_total (em dólares)
+        """
+        indices = self.converter_indices(modelos)
+
+        if NUMPY_AVAILABLE:
+            linhas = np.bincount(indices, minlength=len(self.nomes)).tolist()
+            somas_entrada = self._somar_por_modelo(indices, tokens_entrada)
+            somas_saida = self._somar_por_modelo(indices, tokens_saida)
+        else:
+            linhas = [0] * len(self.nomes)
+            somas_entrada = [0] * len(self.nomes)
+            somas_saida = [0] * len(self.nomes)
+            for indice, entrada, saida in zip(indices, tokens_entrada, tokens_saida):
+                linhas[indice] += 1
+                somas_entrada[indice] += int(entrada)
+                somas_saida[indice] += int(saida)
+
+        totais: Dict[str, Dict[str, Any]] = {}
+        for indice, nome in enumerate(self.nomes):
+            if not linhas[indice]:
+                continue
+            numerador = (somas_entrada[indice] * self.precos_entrada[indice]
+                         + somas_saida[indice] * self.precos_saida[indice])
+            totais[nome] = {
+                'linhas': int(linhas[indice]),
+                'tokens_entrada': somas_entrada[indice],
+                'tokens_saida': somas_saida[indice],
+                'custo_microdolares': _dividir_arredondando(numerador, DIVISOR_TOKENS),
+                'custo_total': numerador / DIVISOR_DOLARES
+            }
+
+        return totais
@@ -0,0 +1,266 @@
+"""
+Distribuição de Pedidos entre Vários Modelos - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo envia o mesmo pedido a vários modelos ao mesmo tempo:
+- primeira_resposta: vale a primeira resposta aceitável; as demais são canceladas
+  (ex.: gpt-4o-mini contra gpt-4o para reduzir a latência)
+- todas_respostas: reúne as respostas de todos os modelos com latência e custo
+  (ex.: comparação A/B de modelos em tráfego real)
+
+Os custos são calculados com CalculadoraTokens.calcular_custo, a partir do
+uso informado pela API. As chamadas passam por ModeloIA (síncrono) ou
+ModeloIAAssincrono, então agendador e política de tentativas também valem aqui.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NoReturn, Optional, Sequence
+
+from .calcular_tokens import CalculadoraTokens
+from .modelo import EntradaCompletion, ModeloIA, montar_mensagens
+from .modelo_assincrono import ModeloIAAssincrono
+from .parametros import ParametrosIA, obter_parametros
+from .pool_clientes import PoolClientes
+
+if TYPE_CHECKING:
+    from .agendador import AgendadorRequisicoes
+    from .politica_tentativas import PoliticaTentativas
+
+
+@dataclass
+class RespostaModelo:
+    """Resposta de um modelo em uma distribuição"""
+    modelo: str
+    resposta: Any = None                  # Resposta da API (ChatCompletion)
+    texto: Optional[str] = None           # Conteúdo da primeira escolha
+    latencia: float = 0.0                 # Segundos desde o envio
+    tokens_entrada: int = 0
+    tokens_saida: int = 0
+    custo: float = 0.0                    # Dólares (CalculadoraTokens.calcular_custo)
+    erro: Optional[Exception] = None      # Exceção do modelo (se houve falha)
+
+    @property
+    def sucesso(self) -> bool:
+        """Indica se o modelo respondeu sem erro"""
+        return self.erro is None
+
+
+class DistribuidorModelos:
+    """Envia o mesmo pedido a vários modelos ao mesmo tempo"""
+
+    def __init__(self, modelos: Sequence[str], parametros_ia: Optional[ParametrosIA] = None,
+                 base_url: Optional[str] = None, pool: Optional[PoolClientes] = None,
+                 agendador: Optional['AgendadorRequisicoes'] = None,
+                 politica: Optional['PoliticaTentativas'] = None):
+        """
+        Args:
+            modelos: Modelos consultados (na ordem usada por todas_respostas)
+            parametros_ia: Parâmetros com a chave da API e os valores padrão
+                (se None, usa obter_parametros)
+            base_url: URL base da API (se None, usa a padrão da OpenAI)
+            pool: Pool de clientes compartilhado (se None, usa o global)
+            agendador: Agendador de limites de RPM e TPM (opcional)
+            politica: Política de novas tentativas com prazo e hedge (opcional)
+
+        Raises:
+            ValueError: Se a lista estiver vazia ou algum modelo não estiver configurado
+        """
+        self.parametros_ia = parametros_ia or obter_parametros()
+        if not modelos:
+            raise ValueError("Informe ao menos um modelo")
+        for modelo in modelos:
+            if not self.parametros_ia.contem_modelo(modelo):
+                raise ValueError(
+                    f"Modelo '{modelo}' não está na lista de modelos disponíveis: "
+                    f"{self.parametros_ia.listar_modelos_disponiveis()}")
+
+        self.modelos = list(modelos)
+        self.calculadora = CalculadoraTokens()
+        self.modelos_ia = {
+            modelo: ModeloIA(modelo, self.parametros_ia, base_url=base_url, pool=pool,
+                             agendador=agendador, politica=politica)
+            for modelo in self.modelos}
+        self.modelo_assincrono = ModeloIAAssincrono(
+            self.modelos[0], self.parametros_ia, base_url=base_url, pool=pool,
+            agendador=agendador, politica=politica)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._trava = threading.Lock()
+
+    def _montar_resposta(self, modelo: str, mensagens: List[Dict[str, Any]],
+                         resposta: Any, inicio: float) -> RespostaModelo:
+        """Extrai texto, tokens e custo de uma resposta da API"""
+        latencia = time.monotonic() - inicio
+        texto = resposta.choices[0].message.content if resposta.choices else None
+
+        uso = getattr(resposta, 'usage', None)
+        if uso is not None:
+            tokens_entrada, tokens_saida = uso.prompt_tokens, uso.completion_tokens
+        else:
+            tokens_entrada = self.calculadora.contar_tokens_mensagens(mensagens, modelo)
+            tokens_saida = self.calculadora.contar_tokens(texto or '', modelo)
+
+        return RespostaModelo(
+            modelo=modelo, resposta=resposta, texto=texto, latencia=latencia,
+            tokens_entrada=tokens_entrada, tokens_saida=tokens_saida,
+            custo=self.calculadora.calcular_custo(modelo, tokens_entrada, tokens_saida))
+
+    # Versão síncrona (uma thread por modelo)
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._trava:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(4, 2 * len(self.modelos)),
+                        thread_name_prefix='bianca-distribuicao')
+        return self._executor
+
+    def fechar(self) -> None:
+        """
+        Encerra as threads da versão síncrona
+
+        Aguarda as requisições perdedoras ainda em andamento. O distribuidor
+        continua utilizável: um novo executor é criado na próxima chamada.
+        """
+        with self._trava:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'DistribuidorModelos':
+        return self
+
+    def __exit__(self, *excecao: Any) -> None:
+        self.fechar()
+
+    def _consultar(self, modelo: str, mensagens: List[Dict[str, Any]],
+                   inicio: float, opcoes: Dict[str, Any]) -> RespostaModelo:
+        try:
+            resposta = self.modelos_ia[modelo].completar(mensagens, **opcoes)
+        except Exception as e:
+            return RespostaModelo(modelo=modelo, latencia=time.monotonic() - inicio, erro=e)
+        return self._montar_resposta(modelo, mensagens, resposta, inicio)
+
+    def todas_respostas(self, entrada: EntradaCompletion, **opcoes: Any) -> List[RespostaModelo]:
+        """
+        Envia o pedido a todos os modelos e reúne as respostas
+
+        Args:
+            entrada: Texto do usuário ou lista de mensagens do chat
+            **opcoes: Argumentos repassados para ModeloIA.completar
+
+        Returns:
+            Lista de RespostaModelo, na ordem dos modelos (falhas ficam em .erro)
+        """
+        mensagens = montar_mensagens(entrada)
+        inicio = time.monotonic()
+        executor = self._obter_executor()
+        futuros = [executor.submit(self._consultar, modelo, mensagens, inicio, opcoes)
+                   for modelo in self.modelos]
+        return [futuro.result() for futuro in futuros]
+
+    def primeira_resposta(self, entrada: EntradaCompletion,
+                          aceitar: Optional[Callable[[RespostaModelo], bool]] = None,
+                          **opcoes: Any) -> RespostaModelo:
+        """
+        Envia o pedido a todos os modelos e retorna a primeira resposta aceitável
+
+        As requisições que ainda não começaram são canceladas; as que já estão
+        em andamento terminam em segundo plano e o resultado delas é descartado
+        (use primeira_resposta_assincrona para cancelá-las de fato).
+
+        Args:
+            entrada: Texto do usuário ou lista de mensagens do chat
+            aceitar: Critério de aceitação (se None, aceita qualquer resposta sem erro)
+            **opcoes: Argumentos repassados para ModeloIA.completar
+
+        Returns:
+            RespostaModelo vencedora
+
+        Raises:
+            RuntimeError: Se nenhum modelo retornar uma resposta aceitável
+        """
+        mensagens = montar_mensagens(entrada)
+        inicio = time.monotonic()
+        executor = self._obter_executor()
+        futuros = [executor.submit(self._consultar, modelo, mensagens, inicio, opcoes)
+                   for modelo in self.modelos]
+
+        respostas = []
+        try:
+            for futuro in as_completed(futuros):
+                resposta = futuro.result()
+                if resposta.sucesso and (aceitar is None or aceitar(resposta)):
+                    return resposta
+                respostas.append(resposta)
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+        self._nenhuma_aceitavel(respostas)
+
+    # Versão assíncrona (cancela as requisições perdedoras)
+
+    async def _consultar_assincrono(self, modelo: str, mensagens: List[Dict[str, Any]],
+                                    inicio: float, opcoes: Dict[str, Any]) -> RespostaModelo:
+        try:
+            resposta = await self.modelo_assincrono.completar(mensagens, modelo=modelo, **opcoes)
+        except Exception as e:
+            return RespostaModelo(modelo=modelo, latencia=time.monotonic() - inicio, erro=e)
+        return self._montar_resposta(modelo, mensagens, resposta, inicio)
+
+    async def todas_respostas_assincronas(self, entrada: EntradaCompletion,
+                                          **opcoes: Any) -> List[RespostaModelo]:
+        """
+        Versão assíncrona de todas_respostas
+
+        Returns:
+            Lista de RespostaModelo, na ordem dos modelos (falhas ficam em .erro)
+        """
+        mensagens = montar_mensagens(entrada)
+        inicio = time.monotonic()
+        return list(await asyncio.gather(
+            *(self._consultar_assincrono(modelo, mensagens, inicio, opcoes)
+              for modelo in self.modelos)))
+
+    async def primeira_resposta_assincrona(
+            self, entrada: EntradaCompletion,
+            aceitar: Optional[Callable[[RespostaModelo], bool]] = None,
+            **opcoes: Any) -> RespostaModelo:
+        """
+        Versão assíncrona de primeira_resposta: as requisições perdedoras são canceladas
+
+        Raises:
+            RuntimeError: Se nenhum modelo retornar uma resposta aceitável
+        """
+        mensagens = montar_mensagens(entrada)
+        inicio = time.monotonic()
+        tarefas = [asyncio.ensure_future(
+            self._consultar_assincrono(modelo, mensagens, inicio, opcoes))
+            for modelo in self.modelos]
+
+        respostas = []
+        try:
+            for proxima in asyncio.as_completed(tarefas):
+                resposta = await proxima
+                if resposta.sucesso and (aceitar is None or aceitar(resposta)):
+                    return resposta
+                respostas.append(resposta)
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+        self._nenhuma_aceitavel(respostas)
+
+    @staticmethod
+    def _nenhuma_aceitavel(respostas: List[RespostaModelo]) -> NoReturn:
+        """Lança o RuntimeError de nenhuma resposta aceitável, encadeado ao último erro"""
+        erros = [resposta.erro for resposta in respostas if resposta.erro is not None]
+        excecao = RuntimeError(
+            f"Nenhum modelo retornou uma resposta aceitável "
+            f"({len(respostas)} respostas, {len(erros)} com erro)")
+        if erros:
+            raise excecao from erros[-1]
+        raise excecao
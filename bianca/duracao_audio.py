@@ -0,0 +1,510 @@
+"""
+Duração de Arquivos de Áudio pelos Cabeçalhos - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo mede a duração de áudios sem decodificá-los, para estimar o
+custo de transcrição (preço por minuto do ModeloConfig):
+- WAV/RF64: tamanho do bloco de dados e taxa de bytes do bloco fmt
+- MP3: cabeçalhos Xing/Info ou VBRI; em CBR, tamanho e taxa de bits
+- M4A/MP4: duração e escala de tempo do mvhd (ou mdhd das faixas)
+- OGG (Vorbis/Opus): posição de grânulo da última página
+
+Quando os cabeçalhos não bastam (MP3 VBR sem Xing, OGG sem página final
+legível), os quadros ou páginas são percorridos pelos cabeçalhos, sem ler
+o áudio. O modo em lote mede diretórios inteiros em paralelo.
+"""
+
+import argparse
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+from .calcular_tokens import CalculadoraTokens
+
+EXTENSOES_AUDIO = ('.wav', '.wave', '.mp3', '.m4a', '.mp4', '.aac', '.ogg', '.oga', '.opus')
+
+MODELO_TRANSCRICAO_PADRAO = 'whisper-1'
+MAX_THREADS_PADRAO = 16
+
+# Métodos registrados em InfoAudio.metodo
+METODO_CABECALHO = 'cabecalho'
+METODO_VARREDURA = 'varredura'
+
+# Bytes lidos no início do arquivo para identificar o formato e achar o primeiro quadro MP3
+BYTES_INICIAIS = 64 * 1024
+
+# Bytes lidos do fim do arquivo por vez na busca da última página OGG
+BYTES_FIM_OGG = 64 * 1024
+
+# Quadros MP3 comparados para decidir se a taxa de bits é constante
+QUADROS_VERIFICACAO_CBR = 8
+
+# Tabelas do cabeçalho de quadro MPEG (taxas em kbps)
+_TAXAS_BITS = {
+    (3, 3): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (3, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (3, 1): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 3): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 1): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_TAXAS_AMOSTRAGEM = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+@dataclass
+class InfoAudio:
+    """Duração de um arquivo de áudio medida pelos cabeçalhos"""
+    caminho: str
+    formato: Optional[str] = None        # 'wav', 'mp3', 'm4a' ou 'ogg'
+    duracao: Optional[float] = None      # Segundos
+    tamanho_bytes: int = 0
+    metodo: Optional[str] = None         # METODO_CABECALHO ou METODO_VARREDURA
+    custo: Optional[float] = None        # Dólares (modo em lote)
+    erro: Optional[str] = None
+
+    @property
+    def sucesso(self) -> bool:
+        """Indica se a duração foi medida"""
+        return self.erro is None and self.duracao is not None
+
+
+@dataclass
+class ResultadoSondagem:
+    """Durações e custos de transcrição de um conjunto de arquivos"""
+    modelo: str
+    arquivos: List[InfoAudio] = field(default_factory=list)
+    duracao_total: float = 0.0           # Segundos (arquivos medidos)
+    custo_total: float = 0.0             # Dólares
+
+    @property
+    def falhas(self) -> List[InfoAudio]:
+        """Arquivos cuja duração não pôde ser medida"""
+        return [info for info in self.arquivos if not info.sucesso]
+
+
+# Detecção do formato
+
+def identificar_formato(inicio: bytes, caminho_arquivo: str = '') -> Optional[str]:
+    """
+    Identifica o formato pelos primeiros bytes (ou pela extensão)
+
+    Args:
+        inicio: Primeiros bytes do arquivo
+        caminho_arquivo: Caminho, usado quando os bytes não identificam o formato
+
+    Returns:
+        'wav', 'mp3', 'm4a', 'ogg' ou None
+    """
+    if inicio[:4] in (b'RIFF', b'RF64') and inicio[8:12] == b'WAVE':
+        return 'wav'
+    if inicio[:4] == b'OggS':
+        return 'ogg'
+    if inicio[4:8] == b'ftyp':
+        return 'm4a'
+    if inicio[:3] == b'ID3' or _cabecalho_mp3(inicio) is not None:
+        return 'mp3'
+
+    extensao = os.path.splitext(caminho_arquivo)[1].lower()
+    return {'.wav': 'wav', '.wave': 'wav', '.mp3': 'mp3', '.m4a': 'm4a', '.mp4': 'm4a',
+            '.ogg': 'ogg', '.oga': 'ogg', '.opus': 'ogg'}.get(extensao)
+
+
+# WAV
+
+def _duracao_wav(arquivo: BinaryIO, tamanho: int) -> Tuple[float, str]:
+    """Duração de um WAV pelos blocos fmt e data (sem ler as amostras)"""
+    cabecalho = arquivo.read(12)
+    rf64 = cabecalho[:4] == b'RF64'
+    taxa_bytes = None
+    tamanho_dados_64 = None
+
+    posicao = 12
+    while posicao + 8 <= tamanho:
+        arquivo.seek(posicao)
+        identificador, tamanho_bloco = struct.unpack('<4sI', arquivo.read(8))
+        if identificador == b'ds64' and rf64:
+            tamanho_dados_64 = struct.unpack('<Q', arquivo.read(16)[8:16])[0]
+        elif identificador == b'fmt ':
+            taxa_bytes = struct.unpack('<HHII', arquivo.read(12))[3]
+        elif identificador == b'data':
+            if not taxa_bytes:
+                raise ValueError("Bloco 'data' antes do bloco 'fmt ' ou taxa de bytes inválida")
+            disponivel = tamanho - (posicao + 8)
+            if rf64 and tamanho_bloco == 0xFFFFFFFF and tamanho_dados_64 is not None:
+                return tamanho_dados_64 / taxa_bytes, METODO_CABECALHO
+            if tamanho_bloco in (0, 0xFFFFFFFF) or tamanho_bloco > disponivel:
+                # Gravação interrompida ou em fluxo: usa o que existe no arquivo
+                return disponivel / taxa_bytes, METODO_VARREDURA
+            return tamanho_bloco / taxa_bytes, METODO_CABECALHO
+        posicao += 8 + tamanho_bloco + (tamanho_bloco & 1)
+
+    raise ValueError("Bloco 'data' não encontrado")
+
+
+# MP3
+
+def _cabecalho_mp3(dados: bytes, posicao: int = 0) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """
+    Interpreta um cabeçalho de quadro MPEG de áudio
+
+    Returns:
+        (versão, camada, taxa de bits em kbps, taxa de amostragem, amostras
+        por quadro, tamanho do quadro) ou None se não for um cabeçalho válido
+    """
+    if posicao + 4 > len(dados) or dados[posicao] != 0xFF or dados[posicao + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2 = dados[posicao + 1], dados[posicao + 2]
+    versao = (b1 >> 3) & 3
+    camada = (b1 >> 1) & 3
+    indice_bits = b2 >> 4
+    indice_amostragem = (b2 >> 2) & 3
+    if versao == 1 or camada == 0 or indice_bits in (0, 15) or indice_amostragem == 3:
+        return None
+
+    taxa_bits = _TAXAS_BITS[(3 if versao == 3 else 2, camada)][indice_bits]
+    taxa_amostragem = _TAXAS_AMOSTRAGEM[versao][indice_amostragem]
+    preenchimento = (b2 >> 1) & 1
+    if camada == 3:
+        amostras = 384
+        tamanho_quadro = (12 * taxa_bits * 1000 // taxa_amostragem + preenchimento) * 4
+    else:
+        amostras = 1152 if (camada == 2 or versao == 3) else 576
+        tamanho_quadro = amostras // 8 * taxa_bits * 1000 // taxa_amostragem + preenchimento
+    return versao, camada, taxa_bits, taxa_amostragem, amostras, tamanho_quadro
+
+
+def _inicio_audio_mp3(arquivo: BinaryIO) -> int:
+    """Posição após a etiqueta ID3v2 (0 se não houver)"""
+    arquivo.seek(0)
+    cabecalho = arquivo.read(10)
+    if cabecalho[:3] != b'ID3' or len(cabecalho) < 10:
+        return 0
+    tamanho = 0
+    for byte in cabecalho[6:10]:
+        tamanho = (tamanho << 7) | (byte & 0x7F)
+    rodape = 10 if cabecalho[5] & 0x10 else 0
+    return 10 + tamanho + rodape
+
+
+def _quadros_mp3(arquivo: BinaryIO, posicao: int, tamanho: int) -> Iterator[Tuple[int, tuple]]:
+    """Percorre os quadros a partir de uma posição, lendo apenas os cabeçalhos"""
+    while posicao + 4 <= tamanho:
+        arquivo.seek(posicao)
+        cabecalho = _cabecalho_mp3(arquivo.read(4))
+        if cabecalho is None or cabecalho[5] <= 0:
+            return
+        yield posicao, cabecalho
+        posicao += cabecalho[5]
+
+
+def _duracao_mp3(arquivo: BinaryIO, tamanho: int, varredura: bool) -> Tuple[float, str]:
+    """Duração de um MP3 pelos cabeçalhos Xing/Info ou VBRI, ou pela taxa de bits"""
+    inicio_audio = _inicio_audio_mp3(arquivo)
+    arquivo.seek(inicio_audio)
+    dados = arquivo.read(BYTES_INICIAIS)
+
+    # Primeiro quadro: cabeçalho válido seguido de outro cabeçalho válido
+    primeiro = primeiro_cabecalho = None
+    for deslocamento in range(len(dados) - 3):
+        cabecalho = _cabecalho_mp3(dados, deslocamento)
+        if cabecalho is None:
+            continue
+        proximo = deslocamento + cabecalho[5]
+        if proximo + 4 > len(dados) or _cabecalho_mp3(dados, proximo) is not None:
+            primeiro, primeiro_cabecalho = deslocamento, cabecalho
+            break
+    if primeiro is None or primeiro_cabecalho is None:
+        raise ValueError("Nenhum quadro MP3 encontrado")
+
+    versao, _, taxa_bits, taxa_amostragem, amostras, _ = primeiro_cabecalho
+    mono = (dados[primeiro + 3] >> 6) == 3
+
+    # Xing/Info: logo após as informações laterais do primeiro quadro
+    lateral = (17 if mono else 32) if versao == 3 else (9 if mono else 17)
+    posicao_xing = primeiro + 4 + lateral
+    if dados[posicao_xing:posicao_xing + 4] in (b'Xing', b'Info'):
+        bandeiras = struct.unpack('>I', dados[posicao_xing + 4:posicao_xing + 8])[0]
+        if bandeiras & 1:
+            quadros = struct.unpack('>I', dados[posicao_xing + 8:posicao_xing + 12])[0]
+            return quadros * amostras / taxa_amostragem, METODO_CABECALHO
+
+    # VBRI (Fraunhofer): 32 bytes após o cabeçalho
+    posicao_vbri = primeiro + 36
+    if dados[posicao_vbri:posicao_vbri + 4] == b'VBRI':
+        quadros = struct.unpack('>I', dados[posicao_vbri + 14:posicao_vbri + 18])[0]
+        return quadros * amostras / taxa_amostragem, METODO_CABECALHO
+
+    # Sem índice: em CBR a duração sai do tamanho; em VBR é preciso percorrer os quadros
+    inicio_quadros = inicio_audio + primeiro
+    taxas = {cabecalho[2] for _, cabecalho in islice(
+        _quadros_mp3(arquivo, inicio_quadros, tamanho), QUADROS_VERIFICACAO_CBR)}
+    if len(taxas) <= 1 or not varredura:
+        fim_audio = tamanho
+        arquivo.seek(max(0, tamanho - 128))
+        if arquivo.read(3) == b'TAG':
+            fim_audio -= 128
+        return (fim_audio - inicio_quadros) * 8 / (taxa_bits * 1000), METODO_CABECALHO
+
+    total_amostras = sum(cabecalho[4] for _, cabecalho in
+                         _quadros_mp3(arquivo, inicio_quadros, tamanho))
+    return total_amostras / taxa_amostragem, METODO_VARREDURA
+
+
+# M4A / MP4
+
+def _caixas(arquivo: BinaryIO, inicio: int, fim: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Percorre as caixas (atoms) de um intervalo: (tipo, início do conteúdo, fim)"""
+    posicao = inicio
+    while posicao + 8 <= fim:
+        arquivo.seek(posicao)
+        tamanho, tipo = struct.unpack('>I4s', arquivo.read(8))
+        conteudo = posicao + 8
+        if tamanho == 1:
+            tamanho = struct.unpack('>Q', arquivo.read(8))[0]
+            conteudo += 8
+        elif tamanho == 0:
+            tamanho = fim - posicao
+        if tamanho < 8:
+            return
+        yield tipo, conteudo, posicao + tamanho
+        posicao += tamanho
+
+
+def _ler_duracao_cabecalho_mp4(arquivo: BinaryIO, conteudo: int) -> Tuple[int, int]:
+    """(escala de tempo, duração) de uma caixa mvhd ou mdhd"""
+    arquivo.seek(conteudo)
+    versao = arquivo.read(4)[0]
+    if versao == 1:
+        _, _, escala, duracao = struct.unpack('>QQIQ', arquivo.read(28))
+    else:
+        _, _, escala, duracao = struct.unpack('>IIII', arquivo.read(16))
+    return escala, duracao
+
+
+def _duracao_m4a(arquivo: BinaryIO, tamanho: int) -> Tuple[float, str]:
+    """Duração de um M4A/MP4 pela caixa mvhd (ou pela faixa mais longa)"""
+    for tipo, conteudo, fim in _caixas(arquivo, 0, tamanho):
+        if tipo != b'moov':
+            continue
+        faixas = []
+        for subtipo, subconteudo, subfim in _caixas(arquivo, conteudo, fim):
+            if subtipo == b'mvhd':
+                escala, duracao = _ler_duracao_cabecalho_mp4(arquivo, subconteudo)
+                if escala and duracao:
+                    return duracao / escala, METODO_CABECALHO
+            elif subtipo == b'trak':
+                faixas.append((subconteudo, subfim))
+
+        # mvhd sem duração (ex.: arquivos fragmentados): usa o mdhd das faixas
+        duracoes = []
+        for inicio_faixa, fim_faixa in faixas:
+            for tipo_faixa, conteudo_faixa, fim_mdia in _caixas(arquivo, inicio_faixa, fim_faixa):
+                if tipo_faixa != b'mdia':
+                    continue
+                for tipo_mdia, conteudo_mdia, _ in _caixas(arquivo, conteudo_faixa, fim_mdia):
+                    if tipo_mdia == b'mdhd':
+                        escala, duracao = _ler_duracao_cabecalho_mp4(arquivo, conteudo_mdia)
+                        if escala:
+                            duracoes.append(duracao / escala)
+        if duracoes:
+            return max(duracoes), METODO_VARREDURA
+        break
+
+    raise ValueError("Caixa 'moov' com duração não encontrada")
+
+
+# OGG
+
+def _pagina_ogg(dados: bytes, posicao: int) -> Optional[Tuple[int, int]]:
+    """(posição de grânulo, número de série) da página OGG que começa na posição"""
+    if dados[posicao:posicao + 4] != b'OggS' or posicao + 18 > len(dados) or dados[posicao + 4] != 0:
+        return None
+    return struct.unpack('<qI', dados[posicao + 6:posicao + 18])
+
+
+def _duracao_ogg(arquivo: BinaryIO, tamanho: int, varredura: bool) -> Tuple[float, str]:
+    """Duração de um OGG (Vorbis ou Opus) pelo grânulo da última página"""
+    arquivo.seek(0)
+    dados = arquivo.read(BYTES_INICIAIS)
+    pagina = _pagina_ogg(dados, 0)
+    if pagina is None:
+        raise ValueError("Página OGG inválida")
+    serie = pagina[1]
+    pacote = dados[27 + dados[26]:]
+
+    if pacote[:7] == b'\x01vorbis':
+        taxa = struct.unpack('<I', pacote[12:16])[0]
+        pre_salto = 0
+    elif pacote[:8] == b'OpusHead':
+        # O grânulo do Opus é sempre contado a 48 kHz
+        taxa = 48000
+        pre_salto = struct.unpack('<H', pacote[10:12])[0]
+    else:
+        raise ValueError("Codec OGG não suportado (esperado Vorbis ou Opus)")
+    if not taxa:
+        raise ValueError("Taxa de amostragem OGG inválida")
+
+    # Última página do fluxo com grânulo definido, lendo o arquivo de trás para frente
+    fim = tamanho
+    while fim > 0:
+        inicio = max(0, fim - BYTES_FIM_OGG)
+        arquivo.seek(inicio)
+        bloco = arquivo.read(fim - inicio + 27)
+        posicao = bloco.rfind(b'OggS', 0, fim - inicio + 3)
+        while posicao >= 0:
+            pagina = _pagina_ogg(bloco, posicao)
+            if pagina is not None and pagina[1] == serie and pagina[0] >= 0:
+                return max(0, pagina[0] - pre_salto) / taxa, METODO_CABECALHO
+            posicao = bloco.rfind(b'OggS', 0, posicao)
+        if not varredura:
+            break
+        fim = inicio
+
+    raise ValueError("Nenhuma página OGG com posição de grânulo encontrada")
+
+
+# API pública
+
+def sondar_audio(caminho_arquivo: str, varredura: bool = True) -> InfoAudio:
+    """
+    Mede a duração de um arquivo de áudio pelos cabeçalhos
+
+    Erros de leitura ou de formato não são lançados: ficam em InfoAudio.erro.
+
+    Args:
+        caminho_arquivo: Caminho do arquivo
+        varredura: Permite percorrer quadros/páginas quando os cabeçalhos não bastam
+
+    Returns:
+        InfoAudio com formato, duração e método usado
+    """
+    info = InfoAudio(caminho=caminho_arquivo)
+    try:
+        with open(caminho_arquivo, 'rb') as arquivo:
+            info.tamanho_bytes = tamanho = os.fstat(arquivo.fileno()).st_size
+            info.formato = formato = identificar_formato(arquivo.read(12), caminho_arquivo)
+            arquivo.seek(0)
+            if formato == 'wav':
+                info.duracao, info.metodo = _duracao_wav(arquivo, tamanho)
+            elif formato == 'mp3':
+                info.duracao, info.metodo = _duracao_mp3(arquivo, tamanho, varredura)
+            elif formato == 'm4a':
+                info.duracao, info.metodo = _duracao_m4a(arquivo, tamanho)
+            elif formato == 'ogg':
+                info.duracao, info.metodo = _duracao_ogg(arquivo, tamanho, varredura)
+            else:
+                info.erro = "Formato de áudio não reconhecido"
+    except (OSError, ValueError, struct.error, IndexError) as e:
+        info.erro = str(e) or type(e).__name__
+    return info
+
+
+def medir_duracao(caminho_arquivo: str, varredura: bool = True) -> float:
+    """
+    Retorna a duração de um arquivo de áudio em segundos
+
+    Raises:
+        ValueError: Se a duração não puder ser medida
+    """
+    info = sondar_audio(caminho_arquivo, varredura)
+    duracao = info.duracao
+    if not info.sucesso or duracao is None:
+        raise ValueError(f"Não foi possível medir a duração de '{caminho_arquivo}': {info.erro}")
+    return duracao
+
+
+def listar_arquivos_audio(diretorio: str, recursivo: bool = True,
+                          extensoes: Sequence[str] = EXTENSOES_AUDIO) -> List[str]:
+    """Lista os arquivos de áudio de um diretório, em ordem"""
+    extensoes = tuple(extensao.lower() for extensao in extensoes)
+    arquivos = []
+    pendentes = [diretorio]
+    while pendentes:
+        with os.scandir(pendentes.pop()) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    if recursivo:
+                        pendentes.append(entrada.path)
+                elif entrada.name.lower().endswith(extensoes):
+                    arquivos.append(entrada.path)
+    return sorted(arquivos)
+
+
+def sondar_diretorio_audio(diretorio: str, modelo: str = MODELO_TRANSCRICAO_PADRAO,
+                           recursivo: bool = True, max_threads: int = MAX_THREADS_PADRAO,
+                           extensoes: Sequence[str] = EXTENSOES_AUDIO,
+                           calculadora: Optional[CalculadoraTokens] = None) -> ResultadoSondagem:
+    """
+    Mede os áudios de um diretório em paralelo e estima o custo de transcrição
+
+    A leitura dos cabeçalhos é limitada por E/S, então usa threads.
+
+    Args:
+        diretorio: Diretório com os arquivos
+        modelo: Modelo de transcrição usado no preço (preco_por_minuto)
+        recursivo: Inclui os subdiretórios
+        max_threads: Arquivos lidos ao mesmo tempo
+        extensoes: Extensões consideradas
+        calculadora: Calculadora usada nos custos (se None, cria uma)
+
+    Returns:
+        ResultadoSondagem com os arquivos na ordem dos caminhos
+    """
+    calculadora = calculadora or CalculadoraTokens()
+    calculadora.calcular_custo_audio(modelo, 0)  # Valida o modelo antes de ler os arquivos
+
+    arquivos = listar_arquivos_audio(diretorio, recursivo, extensoes)
+    with ThreadPoolExecutor(max_workers=max_threads) as executor:
+        infos = list(executor.map(sondar_audio, arquivos))
+
+    resultado = ResultadoSondagem(modelo=modelo, arquivos=infos)
+    for info in infos:
+        duracao = info.duracao
+        if info.sucesso and duracao is not None:
+            info.custo = custo = calculadora.calcular_custo_audio(modelo, duracao)
+            resultado.duracao_total += duracao
+            resultado.custo_total += custo
+    return resultado
+
+
+def main() -> None:
+    """Função principal para a linha de comando"""
+    parser = argparse.ArgumentParser(
+        description="Mede a duração de áudios pelos cabeçalhos e estima o custo de transcrição")
+    parser.add_argument('caminhos', nargs='+', help='Arquivos ou diretórios')
+    parser.add_argument('--modelo', default=MODELO_TRANSCRICAO_PADRAO)
+    parser.add_argument('--threads', type=int, default=MAX_THREADS_PADRAO)
+    parser.add_argument('--sem-recursao', action='store_true')
+    argumentos = parser.parse_args()
+
+    calculadora = CalculadoraTokens()
+    duracao_total = custo_total = 0.0
+    for caminho in argumentos.caminhos:
+        if os.path.isdir(caminho):
+            resultado = sondar_diretorio_audio(
+                caminho, argumentos.modelo, not argumentos.sem_recursao,
+                argumentos.threads, calculadora=calculadora)
+            infos = resultado.arquivos
+        else:
+            info = sondar_audio(caminho)
+            if info.sucesso and info.duracao is not None:
+                info.custo = calculadora.calcular_custo_audio(argumentos.modelo, info.duracao)
+            infos = [info]
+
+        for info in infos:
+            duracao, custo = info.duracao, info.custo
+            if info.sucesso and duracao is not None and custo is not None:
+                duracao_total += duracao
+                custo_total += custo
+                print(f"{duracao:10.2f}s  ${custo:.4f}  {info.formato:4}  {info.caminho}")
+            else:
+                print(f"{'-':>11}  {'-':>7}  {info.formato or '?':4}  {info.caminho}  ({info.erro})")
+
+    print(f"Total: {duracao_total / 60:.1f} min, ${custo_total:.2f} ({argumentos.modelo})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Respostas em Fluxo com Contabilidade de Tokens e Custos - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo acompanha completions em fluxo (stream=True) enquanto chegam:
+- Texto entregue pedaço a pedaço, assim que chega
+- Contagem acumulada de tokens de saída e custo (preços do ModeloConfig)
+- Tempo até o primeiro token (TTFT) e tokens por segundo
+- Interrupção ao atingir um teto de custo ou de tokens
+
+Ao final, a contagem estimada é substituída pelo uso informado pela API
+(stream_options={"include_usage": True}), quando disponível.
+
+Usado por ModeloIA.completar_fluxo e ModeloIAAssincrono.completar_fluxo.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from .calcular_tokens import CalculadoraTokens
+from .parametros import ModeloConfig
+
+# Motivos de interrupção registrados em EstatisticasFluxo.motivo_interrupcao
+MOTIVO_CUSTO = 'custo_maximo'
+MOTIVO_TOKENS = 'tokens_maximos'
+MOTIVO_CHAMADOR = 'interrompido'
+
+
+@dataclass
+class EstatisticasFluxo:
+    """Tokens, custos e tempos de uma resposta em fluxo"""
+    modelo: str
+    tokens_entrada: int = 0
+    tokens_saida: int = 0
+    custo_entrada: float = 0.0
+    custo_saida: float = 0.0
+    tempo_primeiro_token: Optional[float] = None  # Segundos até o primeiro texto
+    duracao: float = 0.0                          # Segundos desde o envio
+    uso_informado: bool = False                   # Tokens vindos do usage da API
+    interrompido: bool = False
+    motivo_interrupcao: Optional[str] = None
+
+    @property
+    def custo_total(self) -> float:
+        """Custo de entrada + saída"""
+        return self.custo_entrada + self.custo_saida
+
+    @property
+    def tokens_por_segundo(self) -> float:
+        """Tokens de saída por segundo, contados a partir do primeiro token"""
+        if self.tempo_primeiro_token is None:
+            return 0.0
+        geracao = self.duracao - self.tempo_primeiro_token
+        return self.tokens_saida / geracao if geracao > 0 else 0.0
+
+
+class _ContabilidadeFluxo:
+    """Contabilidade comum às versões síncrona e assíncrona do fluxo"""
+
+    def __init__(self, modelo: str, config: ModeloConfig, tokens_entrada: int,
+                 calculadora: CalculadoraTokens, inicio: float,
+                 custo_maximo: Optional[float], tokens_maximos: Optional[int],
+                 ao_finalizar: Optional[Callable[['EstatisticasFluxo', Any], None]]):
+        self.config = config
+        self.calculadora = calculadora
+        self.custo_maximo = custo_maximo
+        self.tokens_maximos = tokens_maximos
+        self.ao_finalizar = ao_finalizar
+        self.inicio = inicio
+        self.texto_partes = []
+        self.uso = None
+        self.finalizado = False
+
+        self.estatisticas = EstatisticasFluxo(modelo=modelo, tokens_entrada=tokens_entrada)
+        self.estatisticas.custo_entrada = (
+            tokens_entrada / 1000) * config.preco_entrada_por_1k_tokens
+
+    @property
+    def texto(self) -> str:
+        """Texto recebido até o momento"""
+        return ''.join(self.texto_partes)
+
+    def _processar(self, pedaco: Any) -> Optional[str]:
+        """Atualiza a contabilidade com um pedaço e retorna o texto dele (se houver)"""
+        uso = getattr(pedaco, 'usage', None)
+        if uso is not None:
+            self.uso = uso
+
+        if not pedaco.choices:
+            return None
+        conteudo = pedaco.choices[0].delta.content
+        if not conteudo:
+            return None
+
+        estatisticas = self.estatisticas
+        agora = time.monotonic()
+        if estatisticas.tempo_primeiro_token is None:
+            estatisticas.tempo_primeiro_token = agora - self.inicio
+        estatisticas.duracao = agora - self.inicio
+
+        self.texto_partes.append(conteudo)
+        estatisticas.tokens_saida += self.calculadora.contar_tokens(conteudo, estatisticas.modelo)
+        estatisticas.custo_saida = (
+            estatisticas.tokens_saida / 1000) * self.config.preco_saida_por_1k_tokens
+        return conteudo
+
+    def _teto_atingido(self) -> Optional[str]:
+        """Retorna o motivo da interrupção se algum teto foi atingido"""
+        estatisticas = self.estatisticas
+        if self.custo_maximo is not None and estatisticas.custo_total >= self.custo_maximo:
+            return MOTIVO_CUSTO
+        if self.tokens_maximos is not None and estatisticas.tokens_saida >= self.tokens_maximos:
+            return MOTIVO_TOKENS
+        return None
+
+    def _marcar_interrupcao(self, motivo: str) -> None:
+        if not self.finalizado:
+            self.estatisticas.interrompido = True
+            self.estatisticas.motivo_interrupcao = motivo
+
+    def _finalizar(self) -> None:
+        """Aplica o uso informado pela API e chama o retorno de finalização"""
+        if self.finalizado:
+            return
+        self.finalizado = True
+        estatisticas = self.estatisticas
+        estatisticas.duracao = time.monotonic() - self.inicio
+
+        if self.uso is not None:
+            estatisticas.tokens_entrada = self.uso.prompt_tokens
+            estatisticas.tokens_saida = self.uso.completion_tokens
+            estatisticas.custo_entrada = (
+                self.uso.prompt_tokens / 1000) * self.config.preco_entrada_por_1k_tokens
+            estatisticas.custo_saida = (
+                self.uso.completion_tokens / 1000) * self.config.preco_saida_por_1k_tokens
+            estatisticas.uso_informado = True
+
+        if self.ao_finalizar is not None:
+            self.ao_finalizar(estatisticas, self.uso)
+
+
+class FluxoResposta(_ContabilidadeFluxo):
+    """
+    Resposta em fluxo (síncrona): itere para receber os pedaços de texto
+
+    Exemplo:
+        fluxo = modelo.completar_fluxo(pergunta, custo_maximo=0.05)
+        for texto in fluxo:
+            print(texto, end='', flush=True)
+        print(fluxo.estatisticas.custo_total)
+    """
+
+    def __init__(self, resposta: Any, *args: Any, **kwargs: Any):
+        """
+        Args:
+            resposta: Stream retornado por chat.completions.create(stream=True)
+            *args, **kwargs: Parâmetros de contabilidade (ver _ContabilidadeFluxo)
+        """
+        super().__init__(*args, **kwargs)
+        self.resposta = resposta
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for pedaco in self.resposta:
+                conteudo = self._processar(pedaco)
+                if conteudo is not None:
+                    # O teto é verificado antes de entregar o pedaço, então o
+                    # fluxo é encerrado mesmo se o chamador parar de iterar nele
+                    motivo = self._teto_atingido()
+                    if motivo is not None:
+                        self.interromper(motivo)
+                    yield conteudo
+                    if motivo is not None:
+                        return
+        finally:
+            # Fecha a conexão também quando o chamador abandona a iteração
+            self.resposta.close()
+            self._finalizar()
+
+    def __enter__(self) -> 'FluxoResposta':
+        return self
+
+    def __exit__(self, *excecao: Any) -> None:
+        self.interromper()
+
+    def interromper(self, motivo: str = MOTIVO_CHAMADOR) -> None:
+        """Encerra o fluxo e a conexão (a resposta deixa de ser gerada)"""
+        self._marcar_interrupcao(motivo)
+        self.resposta.close()
+        self._finalizar()
+
+    def consumir(self) -> str:
+        """Lê o fluxo até o fim (ou até um teto) e retorna o texto completo"""
+        for _ in self:
+            pass
+        return self.texto
+
+
+class FluxoRespostaAssincrono(_ContabilidadeFluxo):
+    """Resposta em fluxo (assíncrona): use async for para receber os pedaços de texto"""
+
+    def __init__(self, resposta: Any, *args: Any, **kwargs: Any):
+        """
+        Args:
+            resposta: AsyncStream retornado por chat.completions.create(stream=True)
+            *args, **kwargs: Parâmetros de contabilidade (ver _ContabilidadeFluxo)
+        """
+        super().__init__(*args, **kwargs)
+        self.resposta = resposta
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for pedaco in self.resposta:
+                conteudo = self._processar(pedaco)
+                if conteudo is not None:
+                    motivo = self._teto_atingido()
+                    if motivo is not None:
+                        await self.interromper(motivo)
+                    yield conteudo
+                    if motivo is not None:
+                        return
+        finally:
+            await self.resposta.close()
+            self._finalizar()
+
+    async def __aenter__(self) -> 'FluxoRespostaAssincrono':
+        return self
+
+    async def __aexit__(self, *excecao: Any) -> None:
+        await self.interromper()
+
+    async def interromper(self, motivo: str = MOTIVO_CHAMADOR) -> None:
+        """Encerra o fluxo e a conexão (a resposta deixa de ser gerada)"""
+        self._marcar_interrupcao(motivo)
+        await self.resposta.close()
+        self._finalizar()
+
+    async def consumir(self) -> str:
+        """Lê o fluxo até o fim (ou até um teto) e retorna o texto completo"""
+        async for _ in self:
+            pass
+        return self.texto
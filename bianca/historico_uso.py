@@ -0,0 +1,729 @@
+"""
+Histórico de Uso em Arquivo Binário - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo guarda cada uso (chamada do ModeloIA ou estimativa da
+CalculadoraTokens) em um registro binário de tamanho fixo:
+- Escrita por mmap, sem serialização de texto (poucos microssegundos)
+- Segmentos de tamanho fixo, trocados quando enchem
+- Nomes de modelo, projeto e usuário guardados como ids (nomes.json)
+- Agregações lidas por coluna (NumPy, sem interpretar registro a registro)
+  por modelo, projeto, usuário, tipo, hora, dia, semana ou mês (UTC)
+
+Projeto e usuário vêm dos argumentos ou do contexto atual (contexto_uso).
+Um único processo escreve em cada diretório (trava exclusiva em escritor.lock);
+leitores podem ser vários, abertos com somente_leitura=True.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .calcular_tokens import CalculadoraTokens
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: sem trava entre processos
+    FCNTL_AVAILABLE = False
+
+VARIAVEL_DIRETORIO_HISTORICO = 'BIANCA_DIRETORIO_HISTORICO'
+
+# Tipos de registro
+TIPO_CHAMADA = 0      # Uso informado pela API
+TIPO_ESTIMATIVA = 1   # Estimativa da CalculadoraTokens
+
+# Registro: instante (µs desde a época, UTC), modelo, tipo, reservado, projeto,
+# usuário, tokens de entrada, tokens de saída, custo (dólares), duração (ms)
+FORMATO_REGISTRO = struct.Struct('<qHBBIIIIdI')
+TAMANHO_REGISTRO = FORMATO_REGISTRO.size  # 40 bytes
+
+# Cabeçalho do segmento: identificação, versão, tamanho do registro,
+# capacidade e quantidade de registros gravados
+IDENTIFICACAO = b'BIANCAH1'
+VERSAO_FORMATO = 1
+FORMATO_CABECALHO = struct.Struct('<8sIIQQ')
+TAMANHO_CABECALHO = 64
+POSICAO_CONTAGEM = 24
+
+REGISTROS_POR_SEGMENTO = 1 << 20  # ~40 MB por segmento
+ARQUIVO_NOMES = 'nomes.json'
+ARQUIVO_TRAVA = 'escritor.lock'
+
+# Dimensões aceitas em agregar
+DIMENSOES_NOMES = ('modelo', 'projeto', 'usuario')
+PERIODOS = ('hora', 'dia', 'semana', 'mes')
+DIMENSOES = DIMENSOES_NOMES + ('tipo',) + PERIODOS
+
+# Acima deste número de combinações possíveis, os grupos são encontrados por
+# ordenação (np.unique) em vez de contagem direta (np.bincount)
+LIMITE_GRUPOS_DIRETOS = 1 << 22
+
+MICROSSEGUNDOS_HORA = 3_600_000_000
+MICROSSEGUNDOS_DIA = 86_400_000_000
+
+if NUMPY_AVAILABLE:
+    TIPO_NUMPY_REGISTRO = np.dtype([
+        ('instante', '<i8'), ('modelo', '<u2'), ('tipo', 'u1'), ('reservado', 'u1'),
+        ('projeto', '<u4'), ('usuario', '<u4'), ('tokens_entrada', '<u4'),
+        ('tokens_saida', '<u4'), ('custo', '<f8'), ('duracao_ms', '<u4')])
+
+# Projeto e usuário da tarefa atual (asyncio) ou da thread atual
+_inquilino_contexto: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar(
+    'bianca_inquilino_uso', default=(None, None))
+
+
+@contextmanager
+def contexto_uso(projeto: Optional[str] = None,
+                 usuario: Optional[str] = None) -> Iterator[None]:
+    """
+    Define o projeto e o usuário dos registros feitos dentro do bloco
+
+    Exemplo:
+        with contexto_uso(projeto='atendimento', usuario='ana'):
+            modelo.completar('...')
+    """
+    token = _inquilino_contexto.set((projeto, usuario))
+    try:
+        yield
+    finally:
+        _inquilino_contexto.reset(token)
+
+
+@dataclass
+class TotaisUso:
+    """Totais de um grupo de registros"""
+    requisicoes: int = 0
+    tokens_entrada: int = 0
+    tokens_saida: int = 0
+    custo: float = 0.0
+
+    def somar(self, outro: 'TotaisUso') -> None:
+        """Acumula os totais de outro grupo"""
+        self.requisicoes += outro.requisicoes
+        self.tokens_entrada += outro.tokens_entrada
+        self.tokens_saida += outro.tokens_saida
+        self.custo += outro.custo
+
+
+def _para_microssegundos(instante: Union[None, float, datetime]) -> Optional[int]:
+    """Converte segundos desde a época ou datetime (sem fuso = UTC) em microssegundos"""
+    if instante is None:
+        return None
+    if isinstance(instante, datetime):
+        if instante.tzinfo is None:
+            instante = instante.replace(tzinfo=timezone.utc)
+        instante = instante.timestamp()
+    return int(instante * 1_000_000)
+
+
+def _rotulo_periodo(periodo: str, valor: int) -> str:
+    """Rótulo ISO do início de um período (UTC)"""
+    if periodo == 'mes':
+        return f"{1970 + valor // 12:04d}-{valor % 12 + 1:02d}"
+    if periodo == 'hora':
+        return datetime.fromtimestamp(valor * 3600, timezone.utc).strftime('%Y-%m-%dT%H:00')
+    dias = valor * 7 - 3 if periodo == 'semana' else valor
+    return datetime.fromtimestamp(dias * 86400, timezone.utc).strftime('%Y-%m-%d')
+
+
+def _periodo_puro(periodo: str, instante: int) -> int:
+    """Índice do período de um instante (µs), sem NumPy"""
+    if periodo == 'hora':
+        return instante // MICROSSEGUNDOS_HORA
+    dia = instante // MICROSSEGUNDOS_DIA
+    if periodo == 'dia':
+        return dia
+    if periodo == 'semana':
+        # 1970-01-01 foi uma quinta-feira; semanas começam na segunda
+        return (dia + 3) // 7
+    data = datetime.fromtimestamp(dia * 86400, timezone.utc)
+    return (data.year - 1970) * 12 + data.month - 1
+
+
+class HistoricoUso:
+    """Histórico de uso em segmentos binários mapeados em memória"""
+
+    def __init__(self, diretorio: str, registros_por_segmento: int = REGISTROS_POR_SEGMENTO,
+                 calculadora: Optional[CalculadoraTokens] = None,
+                 somente_leitura: bool = False):
+        """
+        Args:
+            diretorio: Diretório dos segmentos (criado se não existir, exceto na leitura)
+            registros_por_segmento: Capacidade de cada segmento
+            calculadora: Calculadora usada nos custos de registrar_resposta
+                (se None, cria uma no primeiro uso)
+            somente_leitura: Abre apenas para consultas, sem travar o diretório
+                nem criar ou trocar segmentos (registrar lança ValueError)
+
+        Raises:
+            ValueError: Se outro escritor já estiver com o diretório aberto
+        """
+        self.diretorio = diretorio
+        self.registros_por_segmento = registros_por_segmento
+        self.somente_leitura = somente_leitura
+        self._calculadora = calculadora
+        self._trava = threading.Lock()
+
+        self._nomes: Dict[str, List[str]] = {dimensao: [] for dimensao in DIMENSOES_NOMES}
+        self._ids: Dict[str, Dict[str, int]] = {dimensao: {} for dimensao in DIMENSOES_NOMES}
+
+        self._arquivo: Optional[BinaryIO] = None
+        self._arquivo_trava: Optional[BinaryIO] = None
+        self._mapa: Optional[mmap.mmap] = None
+        self._numero_segmento = 0
+        self._contagem = 0
+        self._capacidade = 0
+        self._ouvintes: List[Callable[[], None]] = []
+
+        if not somente_leitura:
+            os.makedirs(diretorio, exist_ok=True)
+            self._travar_diretorio()
+        self._carregar_nomes()
+        if not somente_leitura:
+            try:
+                self._abrir_ultimo_segmento()
+            except BaseException:
+                self._liberar_diretorio()
+                raise
+
+    # Trava do escritor
+
+    def _travar_diretorio(self) -> None:
+        """Garante um único escritor por diretório (trava exclusiva, sem espera)"""
+        if not FCNTL_AVAILABLE:
+            return
+        arquivo = open(os.path.join(self.diretorio, ARQUIVO_TRAVA), 'a+b')
+        try:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            arquivo.close()
+            raise ValueError(
+                f"Outro escritor já está com o histórico '{self.diretorio}' aberto; "
+                f"use somente_leitura=True para consultas") from None
+        self._arquivo_trava = arquivo
+
+    def _liberar_diretorio(self) -> None:
+        if self._arquivo_trava is not None:
+            # Fechar o arquivo libera a trava
+            self._arquivo_trava.close()
+            self._arquivo_trava = None
+
+    # Nomes
+
+    def _carregar_nomes(self) -> None:
+        caminho = os.path.join(self.diretorio, ARQUIVO_NOMES)
+        if not os.path.exists(caminho):
+            return
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            dados = json.load(arquivo)
+        for dimensao in DIMENSOES_NOMES:
+            self._nomes[dimensao] = list(dados.get(dimensao, []))
+            self._ids[dimensao] = {nome: indice + 1
+                                   for indice, nome in enumerate(self._nomes[dimensao])}
+
+    def _salvar_nomes(self) -> None:
+        caminho = os.path.join(self.diretorio, ARQUIVO_NOMES)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(self._nomes, arquivo, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    def _obter_id(self, dimensao: str, nome: Optional[str]) -> int:
+        """Id de um nome (0 = sem nome); nomes novos são gravados em nomes.json"""
+        if not nome:
+            return 0
+        identificador = self._ids[dimensao].get(nome)
+        if identificador is None:
+            self._nomes[dimensao].append(nome)
+            identificador = self._ids[dimensao][nome] = len(self._nomes[dimensao])
+            self._salvar_nomes()
+        return identificador
+
+    def obter_nome(self, dimensao: str, identificador: int) -> Optional[str]:
+        """Nome de um id de modelo, projeto ou usuário (None para 0)"""
+        if identificador == 0:
+            return None
+        if identificador > len(self._nomes[dimensao]):
+            # Nome criado por outro processo depois da leitura de nomes.json
+            self._carregar_nomes()
+        return self._nomes[dimensao][identificador - 1]
+
+    # Segmentos
+
+    def _caminho_segmento(self, numero: int) -> str:
+        return os.path.join(self.diretorio, f"segmento_{numero:06d}.bin")
+
+    def listar_segmentos(self) -> List[str]:
+        """Caminhos dos segmentos, em ordem"""
+        if not os.path.isdir(self.diretorio):
+            return []
+        return sorted(os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio)
+                      if nome.startswith('segmento_') and nome.endswith('.bin'))
+
+    def _abrir_ultimo_segmento(self) -> None:
+        segmentos = self.listar_segmentos()
+        if not segmentos:
+            self._abrir_segmento(1)
+            return
+        numero = int(os.path.basename(segmentos[-1])[9:15])
+        self._abrir_segmento(numero)
+        if self._contagem >= self._capacidade:
+            self._rotacionar()
+
+    def _abrir_segmento(self, numero: int) -> None:
+        """Abre (ou cria, com o tamanho da capacidade) um segmento para escrita"""
+        caminho = self._caminho_segmento(numero)
+        novo = not os.path.exists(caminho)
+        self._arquivo = open(caminho, 'w+b' if novo else 'r+b')
+        if novo:
+            self._arquivo.write(FORMATO_CABECALHO.pack(
+                IDENTIFICACAO, VERSAO_FORMATO, TAMANHO_REGISTRO, self.registros_por_segmento, 0))
+            # Arquivo esparso: o espaço é ocupado conforme os registros chegam
+            self._arquivo.truncate(TAMANHO_CABECALHO + self.registros_por_segmento * TAMANHO_REGISTRO)
+            self._arquivo.flush()
+
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0)
+        identificacao, _, tamanho, capacidade, contagem = FORMATO_CABECALHO.unpack_from(self._mapa)
+        if identificacao != IDENTIFICACAO or tamanho != TAMANHO_REGISTRO:
+            raise ValueError(f"'{caminho}' não é um segmento de histórico válido")
+        self._numero_segmento = numero
+        self._capacidade = capacidade
+        self._contagem = contagem
+
+    def _fechar_segmento(self) -> None:
+        if self._mapa is not None:
+            self._mapa.flush()
+            self._mapa.close()
+            self._mapa = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def _rotacionar(self) -> None:
+        """Fecha o segmento cheio e abre o próximo"""
+        self._fechar_segmento()
+        self._abrir_segmento(self._numero_segmento + 1)
+
+    # Escrita
+
+    def registrar(self, modelo: str, tokens_entrada: int, tokens_saida: int, custo: float,
+                  projeto: Optional[str] = None, usuario: Optional[str] = None,
+                  tipo: int = TIPO_CHAMADA, duracao: float = 0.0,
+                  instante: Union[None, float, datetime] = None) -> None:
+        """
+        Acrescenta um registro de uso
+
+        Args:
+            modelo: Nome do modelo
+            tokens_entrada: Tokens de entrada
+            tokens_saida: Tokens de saída
+            custo: Custo em dólares
+            projeto: Projeto (se None, usa o de contexto_uso)
+            usuario: Usuário (se None, usa o de contexto_uso)
+            tipo: TIPO_CHAMADA ou TIPO_ESTIMATIVA
+            duracao: Duração da chamada em segundos
+            instante: Momento do uso (se None, agora)
+        """
+        if projeto is None or usuario is None:
+            projeto_contexto, usuario_contexto = _inquilino_contexto.get()
+            projeto = projeto if projeto is not None else projeto_contexto
+            usuario = usuario if usuario is not None else usuario_contexto
+        microssegundos = _para_microssegundos(instante)
+        if microssegundos is None:
+            microssegundos = time.time_ns() // 1000
+
+        with self._trava:
+            if self.somente_leitura:
+                raise ValueError("Histórico de uso aberto somente para leitura")
+            if self._mapa is None:
+                raise ValueError("Histórico de uso fechado")
+            if self._contagem >= self._capacidade:
+                self._rotacionar()
+            FORMATO_REGISTRO.pack_into(
+                self._mapa, TAMANHO_CABECALHO + self._contagem * TAMANHO_REGISTRO,
+                microssegundos, self._obter_id('modelo', modelo), tipo, 0,
+                self._obter_id('projeto', projeto), self._obter_id('usuario', usuario),
+                tokens_entrada, tokens_saida, custo, int(duracao * 1000))
+            # A contagem é gravada depois do registro, então leitores nunca veem
+            # um registro incompleto
+            self._contagem += 1
+            struct.pack_into('<Q', self._mapa, POSICAO_CONTAGEM, self._contagem)
+
+        for ouvinte in self._ouvintes:
+            ouvinte()
+
+    def adicionar_ouvinte(self, ouvinte: Callable[[], None]) -> None:
+        """Registra uma função chamada após cada novo registro (deve ser rápida)"""
+        self._ouvintes = self._ouvintes + [ouvinte]
+
+    def remover_ouvinte(self, ouvinte: Callable[[], None]) -> None:
+        """Remove uma função registrada com adicionar_ouvinte"""
+        self._ouvintes = [funcao for funcao in self._ouvintes if funcao != ouvinte]
+
+    def registrar_resposta(self, modelo: str, resposta: Any, duracao: float = 0.0,
+                           **opcoes: Any) -> None:
+        """
+        Registra o uso informado em uma resposta da API (se houver usage)
+
+        Args:
+            modelo: Nome do modelo
+            resposta: Resposta da API (ChatCompletion, CreateEmbeddingResponse...)
+            duracao: Duração da chamada em segundos
+            **opcoes: projeto, usuario ou instante (ver registrar)
+        """
+        uso = getattr(resposta, 'usage', None)
+        if uso is None:
+            return
+        tokens_entrada = getattr(uso, 'prompt_tokens', 0) or 0
+        tokens_saida = getattr(uso, 'completion_tokens', 0) or 0
+        if self._calculadora is None:
+            self._calculadora = CalculadoraTokens()
+        custo = self._calculadora.calcular_custo(modelo, tokens_entrada, tokens_saida)
+        self.registrar(modelo, tokens_entrada, tokens_saida, custo, duracao=duracao, **opcoes)
+
+    def registrar_estimativa(self, modelo: str, tokens_entrada: int, tokens_saida: int,
+                             custo: float, **opcoes: Any) -> None:
+        """Registra uma estimativa de uso (TIPO_ESTIMATIVA); ver registrar"""
+        self.registrar(modelo, tokens_entrada, tokens_saida, custo, tipo=TIPO_ESTIMATIVA, **opcoes)
+
+    def sincronizar(self) -> None:
+        """Grava em disco os registros do segmento atual"""
+        with self._trava:
+            if self._mapa is not None:
+                self._mapa.flush()
+
+    def fechar(self) -> None:
+        """Grava os registros pendentes, fecha o segmento atual e libera o diretório"""
+        with self._trava:
+            self._fechar_segmento()
+            self._liberar_diretorio()
+
+    def __enter__(self) -> 'HistoricoUso':
+        return self
+
+    def __exit__(self, *excecao: Any) -> None:
+        self.fechar()
+
+    # Leitura
+
+    def _ler_segmento(self, caminho: str) -> Tuple[Any, int]:
+        """Mapeia um segmento para leitura: (mmap, quantidade de registros)"""
+        with open(caminho, 'rb') as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        identificacao, _, tamanho, _, contagem = FORMATO_CABECALHO.unpack_from(mapa)
+        if identificacao != IDENTIFICACAO or tamanho != TAMANHO_REGISTRO:
+            raise ValueError(f"'{caminho}' não é um segmento de histórico válido")
+        return mapa, contagem
+
+    def _segmentos_desde(self, posicao: Tuple[int, int]) -> Iterator[Tuple[int, int, Any, int]]:
+        """Segmentos a partir de uma posição: (número, primeiro registro, mmap, contagem)"""
+        numero_inicial, indice_inicial = posicao
+        for caminho in self.listar_segmentos():
+            numero = int(os.path.basename(caminho)[9:15])
+            if numero < numero_inicial:
+                continue
+            mapa, contagem = self._ler_segmento(caminho)
+            yield numero, indice_inicial if numero == numero_inicial else 0, mapa, contagem
+
+    def colunas(self) -> Iterator[Any]:
+        """
+        Percorre os segmentos como arrays estruturados do NumPy (sem cópia)
+
+        Yields:
+            Array com os campos de TIPO_NUMPY_REGISTRO, um por segmento
+
+        Raises:
+            ImportError: Se o NumPy não estiver instalado
+        """
+        for _, registros in self.colunas_desde((0, 0)):
+            yield registros
+
+    def colunas_desde(self, posicao: Tuple[int, int]) -> Iterator[Tuple[Tuple[int, int], Any]]:
+        """
+        Percorre, por colunas, os registros gravados a partir de uma posição
+
+        Args:
+            posicao: (número do segmento, índice do registro); (0, 0) para o início
+
+        Yields:
+            (posição logo após o último registro lido, array de TIPO_NUMPY_REGISTRO)
+
+        Raises:
+            ImportError: Se o NumPy não estiver instalado
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("Leitura por colunas requer NumPy (pip install bianca-ai[vetorizado])")
+        for numero, inicio, mapa, contagem in self._segmentos_desde(posicao):
+            if contagem > inicio:
+                # O array mantém o mmap aberto enquanto existir
+                yield (numero, contagem), np.frombuffer(
+                    mapa, dtype=TIPO_NUMPY_REGISTRO, count=contagem - inicio,
+                    offset=TAMANHO_CABECALHO + inicio * TAMANHO_REGISTRO)
+
+    def registros(self) -> Iterator[Tuple]:
+        """Percorre os registros como tuplas (ver FORMATO_REGISTRO), sem NumPy"""
+        for _, registros in self.registros_desde((0, 0)):
+            yield from registros
+
+    def registros_desde(self, posicao: Tuple[int, int]
+                        ) -> Iterator[Tuple[Tuple[int, int], Iterator[Tuple]]]:
+        """
+        Percorre, sem NumPy, os registros gravados a partir de uma posição
+
+        Args:
+            posicao: (número do segmento, índice do registro); (0, 0) para o início
+
+        Yields:
+            (posição logo após o último registro do segmento, tuplas do segmento)
+        """
+        for numero, inicio, mapa, contagem in self._segmentos_desde(posicao):
+            if contagem > inicio:
+                dados = memoryview(mapa)[TAMANHO_CABECALHO + inicio * TAMANHO_REGISTRO:
+                                         TAMANHO_CABECALHO + contagem * TAMANHO_REGISTRO]
+                yield (numero, contagem), FORMATO_REGISTRO.iter_unpack(dados)
+
+    def __len__(self) -> int:
+        total = 0
+        for caminho in self.listar_segmentos():
+            with open(caminho, 'rb') as arquivo:
+                total += FORMATO_CABECALHO.unpack(arquivo.read(FORMATO_CABECALHO.size))[4]
+        return total
+
+    # Agregação
+
+    def _filtros_ids(self, modelo: Optional[str], projeto: Optional[str],
+                     usuario: Optional[str]) -> Optional[Dict[str, int]]:
+        """Ids dos filtros por nome (None se algum nome não existir no histórico)"""
+        filtros = {}
+        for dimensao, nome in (('modelo', modelo), ('projeto', projeto), ('usuario', usuario)):
+            if nome is not None:
+                identificador = self._ids[dimensao].get(nome)
+                if identificador is None:
+                    # Nome criado por outro processo depois da leitura de nomes.json
+                    self._carregar_nomes()
+                    identificador = self._ids[dimensao].get(nome)
+                if identificador is None:
+                    return None
+                filtros[dimensao] = identificador
+        return filtros
+
+    def agregar(self, por: Sequence[str] = ('modelo',),
+                inicio: Union[None, float, datetime] = None,
+                fim: Union[None, float, datetime] = None,
+                modelo: Optional[str] = None, projeto: Optional[str] = None,
+                usuario: Optional[str] = None,
+                tipo: Optional[int] = None) -> Dict[Tuple, TotaisUso]:
+        """
+        Soma requisições, tokens e custos agrupados por dimensões
+
+        Args:
+            por: Dimensões do grupo: 'modelo', 'projeto', 'usuario', 'tipo',
+                'hora', 'dia', 'semana' ou 'mes' (períodos em UTC)
+            inicio: Início do intervalo, inclusivo (segundos desde a época ou datetime)
+            fim: Fim do intervalo, exclusivo
+            modelo: Considera apenas este modelo
+            projeto: Considera apenas este projeto
+            usuario: Considera apenas este usuário
+            tipo: Considera apenas TIPO_CHAMADA ou TIPO_ESTIMATIVA
+
+        Returns:
+            Dicionário {chave: TotaisUso}; a chave tem um valor por dimensão
+            (nomes, tipo ou rótulo ISO do início do período)
+
+        Raises:
+            ValueError: Se alguma dimensão for desconhecida
+        """
+        por = tuple(por)
+        for dimensao in por:
+            if dimensao not in DIMENSOES:
+                raise ValueError(f"Dimensão '{dimensao}' desconhecida. Use: {DIMENSOES}")
+
+        filtros = self._filtros_ids(modelo, projeto, usuario)
+        if filtros is None:
+            return {}
+        if tipo is not None:
+            filtros['tipo'] = tipo
+        limites = (_para_microssegundos(inicio), _para_microssegundos(fim))
+
+        if NUMPY_AVAILABLE:
+            grupos = self._agregar_numpy(por, filtros, limites)
+        else:
+            grupos = self._agregar_puro(por, filtros, limites)
+
+        # Cada valor distinto é decodificado uma vez (muitos grupos repetem nomes e períodos)
+        decodificados: List[Dict[int, Any]] = [{} for _ in por]
+
+        def decodificar(chave: Tuple[int, ...]) -> Tuple:
+            valores = []
+            for dimensao, cache, valor in zip(por, decodificados, chave):
+                if valor not in cache:
+                    if dimensao in DIMENSOES_NOMES:
+                        cache[valor] = self.obter_nome(dimensao, valor)
+                    elif dimensao in PERIODOS:
+                        cache[valor] = _rotulo_periodo(dimensao, valor)
+                    else:
+                        cache[valor] = valor
+                valores.append(cache[valor])
+            return tuple(valores)
+
+        return {decodificar(chave): totais for chave, totais in grupos.items()}
+
+    @staticmethod
+    def _coluna_numpy(registros: Any, dimensao: str) -> Any:
+        """Coluna de uma dimensão como int64 (períodos calculados a partir do instante)"""
+        if dimensao not in PERIODOS:
+            return registros[dimensao].astype(np.int64)
+        instantes = registros['instante']
+        if dimensao == 'hora':
+            return instantes // MICROSSEGUNDOS_HORA
+        if dimensao == 'dia':
+            return instantes // MICROSSEGUNDOS_DIA
+        if dimensao == 'semana':
+            return (instantes // MICROSSEGUNDOS_DIA + 3) // 7
+        return instantes.astype('datetime64[us]').astype('datetime64[M]').astype(np.int64)
+
+    def _agregar_numpy(self, por: Tuple[str, ...], filtros: Dict[str, int],
+                       limites: Tuple[Optional[int], Optional[int]]) -> Dict[Tuple, TotaisUso]:
+        """Agrega segmento a segmento, por colunas, e converte os grupos só no final"""
+        acumulado: Optional[Tuple[List[Any], List[Any]]] = None
+        for registros in self.colunas():
+            mascara = None
+            condicoes = [registros[campo] == valor for campo, valor in filtros.items()]
+            if limites[0] is not None:
+                condicoes.append(registros['instante'] >= limites[0])
+            if limites[1] is not None:
+                condicoes.append(registros['instante'] < limites[1])
+            for condicao in condicoes:
+                mascara = condicao if mascara is None else mascara & condicao
+            if mascara is not None:
+                registros = registros[mascara]
+            if len(registros) == 0:
+                continue
+
+            chaves = [self._coluna_numpy(registros, dimensao) for dimensao in por]
+            valores = [np.ones(len(registros), dtype=np.float64),
+                       registros['tokens_entrada'], registros['tokens_saida'], registros['custo']]
+            if acumulado is not None:
+                # Junta com os grupos dos segmentos anteriores (memória limitada aos grupos)
+                chaves = [np.concatenate(par) for par in zip(acumulado[0], chaves)]
+                valores = [np.concatenate(par) for par in zip(acumulado[1], valores)]
+            acumulado = self._reduzir_grupos(chaves, valores)
+
+        if acumulado is None:
+            return {}
+        chaves, valores = acumulado
+        requisicoes, tokens_entrada, tokens_saida, custos = (valor.tolist() for valor in valores)
+        # Sem dimensões há um único grupo, de chave vazia
+        chaves_grupos = (zip(*(coluna.tolist() for coluna in chaves)) if chaves
+                         else [()] * len(requisicoes))
+        return {
+            chave: TotaisUso(int(round(requisicoes[posicao])), int(round(tokens_entrada[posicao])),
+                             int(round(tokens_saida[posicao])), custos[posicao])
+            for posicao, chave in enumerate(chaves_grupos)}
+
+    @staticmethod
+    def _reduzir_grupos(chaves: List[Any], valores: List[Any]) -> Tuple[List[Any], List[Any]]:
+        """
+        Soma os valores de linhas com a mesma chave
+
+        Args:
+            chaves: Uma coluna int64 por dimensão
+            valores: Colunas somadas por grupo (requisições, tokens e custo)
+
+        Returns:
+            (colunas das chaves distintas, somas por chave)
+        """
+        # Combina as dimensões em um único código inteiro (base mista)
+        minimos = [int(coluna.min()) for coluna in chaves]
+        bases = [int(coluna.max()) - minimo + 1 for coluna, minimo in zip(chaves, minimos)]
+        combinacoes = 1
+        for base in bases:
+            combinacoes *= base
+
+        if combinacoes >= 1 << 62:
+            # Códigos não cabem em int64: agrupa pelas linhas de colunas
+            linhas, indices = np.unique(np.stack(chaves, axis=1), axis=0, return_inverse=True)
+            indices = indices.reshape(-1)
+            somas = [np.bincount(indices, valor, len(linhas)) for valor in valores]
+            return [linhas[:, coluna] for coluna in range(len(chaves))], somas
+
+        codigos = np.zeros(len(chaves[0]) if chaves else len(valores[0]), dtype=np.int64)
+        for coluna, minimo, base in zip(chaves, minimos, bases):
+            codigos = codigos * base + (coluna - minimo)
+
+        if combinacoes <= LIMITE_GRUPOS_DIRETOS:
+            somas = [np.bincount(codigos, valor, combinacoes) for valor in valores]
+            presentes = np.flatnonzero(somas[0])
+            somas = [soma[presentes] for soma in somas]
+            codigos = presentes
+        else:
+            codigos, indices = np.unique(codigos, return_inverse=True)
+            somas = [np.bincount(indices, valor, len(codigos)) for valor in valores]
+
+        # Separa o código de volta em uma coluna por dimensão
+        colunas = []
+        for minimo, base in zip(reversed(minimos), reversed(bases)):
+            codigos, resto = np.divmod(codigos, base)
+            colunas.append(resto + minimo)
+        return colunas[::-1], somas
+
+    def _agregar_puro(self, por: Tuple[str, ...], filtros: Dict[str, int],
+                      limites: Tuple[Optional[int], Optional[int]]) -> Dict[Tuple, TotaisUso]:
+        """Agregação registro a registro, quando o NumPy não está disponível"""
+        posicoes = {'modelo': 1, 'tipo': 2, 'projeto': 4, 'usuario': 5}
+        filtros_posicoes = [(posicoes[campo], valor) for campo, valor in filtros.items()]
+        inicio, fim = limites
+
+        grupos: Dict[Tuple, TotaisUso] = {}
+        for registro in self.registros():
+            instante = registro[0]
+            if (inicio is not None and instante < inicio) or (fim is not None and instante >= fim):
+                continue
+            if any(registro[posicao] != valor for posicao, valor in filtros_posicoes):
+                continue
+            chave = tuple(_periodo_puro(dimensao, instante) if dimensao in PERIODOS
+                          else registro[posicoes[dimensao]] for dimensao in por)
+            totais = grupos.get(chave)
+            if totais is None:
+                totais = grupos[chave] = TotaisUso()
+            totais.requisicoes += 1
+            totais.tokens_entrada += registro[6]
+            totais.tokens_saida += registro[7]
+            totais.custo += registro[8]
+        return grupos
+
+
+# Instância global, criada no primeiro uso
+_historico_uso: Optional[HistoricoUso] = None
+_trava_historico = threading.Lock()
+
+
+def obter_historico_uso() -> HistoricoUso:
+    """
+    Retorna o histórico de uso global
+
+    O diretório vem de BIANCA_DIRETORIO_HISTORICO (padrão: ~/.bianca/historico).
+    """
+    global _historico_uso
+    if _historico_uso is None:
+        with _trava_historico:
+            if _historico_uso is None:
+                diretorio = os.getenv(VARIAVEL_DIRETORIO_HISTORICO) or os.path.join(
+                    os.path.expanduser('~'), '.bianca', 'historico')
+                _historico_uso = HistoricoUso(diretorio)
+    return _historico_uso
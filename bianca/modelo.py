@@ -7,20 +7,70 @@ Este modulo gerencia um modelo específico de IA.
 # TODO: Implementar a classe ModeloIA para gerenciar um modelo específico de IA. Uma forma é especializar essa classe para colocar caracteristicas
 # específicas de cada modelo de IA.
 
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+
 from openai import OpenAI  # Adiciona importação de OpenAI no escopo correto
+from .calcular_tokens import CalculadoraTokens
+from .fluxo_resposta import EstatisticasFluxo, FluxoResposta
 from .parametros import ParametrosIA
+from .pool_clientes import PoolClientes, obter_pool_clientes
+
+if TYPE_CHECKING:
+    from .agendador import AgendadorRequisicoes
+    from .historico_uso import HistoricoUso
+    from .politica_tentativas import PoliticaTentativas
+
+EntradaCompletion = Union[str, List[Dict[str, Any]]]
+
+
+def montar_mensagens(entrada: EntradaCompletion) -> List[Dict[str, Any]]:
+    """Converte um texto em uma lista de mensagens do chat (listas são mantidas)"""
+    if isinstance(entrada, str):
+        return [{'role': 'user', 'content': entrada}]
+    return list(entrada)
+
+
+def opcoes_fluxo(opcoes: Dict[str, Any]) -> Dict[str, Any]:
+    """Adiciona stream=True e pede o uso real de tokens no último pedaço do fluxo"""
+    opcoes = dict(opcoes)
+    opcoes['stream'] = True
+    opcoes.setdefault('stream_options', {'include_usage': True})
+    return opcoes
 
 
 class ModeloIA:
     """Classe para gerenciar um modelo específico"""
 
-    def __init__(self, modelo: str, parametros_ia: ParametrosIA):
-        if modelo not in parametros_ia.listar_modelos_disponiveis():
+    def __init__(self, modelo: str, parametros_ia: ParametrosIA,
+                 base_url: Optional[str] = None, pool: Optional[PoolClientes] = None,
+                 agendador: Optional['AgendadorRequisicoes'] = None,
+                 politica: Optional['PoliticaTentativas'] = None,
+                 historico: Optional['HistoricoUso'] = None):
+        """
+        Args:
+            modelo: Nome do modelo
+            parametros_ia: Parâmetros com a chave da API e o tempo de espera
+            base_url: URL base da API (se None, usa a padrão da OpenAI)
+            pool: Pool de clientes compartilhado (se None, usa o global)
+            agendador: Agendador de limites de RPM e TPM (opcional)
+            politica: Política de novas tentativas com prazo e hedge (opcional)
+            historico: Histórico onde o uso de cada completion é registrado (opcional)
+        """
+        if not parametros_ia.contem_modelo(modelo):
             raise ValueError(
                 f"Modelo '{modelo}' não está na lista de modelos disponíveis: {parametros_ia.listar_modelos_disponiveis()}")
         self.modelo = modelo
         self.parametros_ia = parametros_ia
-        self.cliente = OpenAI(api_key=self.parametros_ia.obter_chave_api())
+        self.base_url = base_url
+        self.agendador = agendador
+        self.politica = politica
+        self.historico = historico
+        self.calculadora = CalculadoraTokens()
+        # Clientes (e conexões HTTP) são compartilhados entre instâncias
+        self.cliente = (pool or obter_pool_clientes()).obter_cliente(
+            self.parametros_ia.obter_chave_api(), base_url,
+            self.parametros_ia.obter_tempo_espera())
 
     def obter_modelo(self) -> str:
         """Retorna o modelo"""
@@ -33,3 +83,127 @@ class ModeloIA:
     def obter_cliente(self) -> OpenAI:
         """Retorna o cliente"""
         return self.cliente
+
+    def executar_chamada(self, chamada: Callable[[OpenAI], Any]) -> Any:
+        """
+        Executa uma chamada à API com o cliente do modelo
+
+        Com uma política, a chamada é repetida em falhas transitórias dentro
+        do prazo, e cada tentativa recebe um cliente com o tempo limite restante.
+
+        Args:
+            chamada: Recebe o cliente e faz a requisição (ex.: lambda c: c.embeddings.create(...))
+
+        Returns:
+            Retorno da chamada
+        """
+        if self.politica is None:
+            return chamada(self.cliente)
+
+        def tentativa(tempo_limite: float) -> Any:
+            # A política controla as tentativas e o prazo de cada uma
+            return chamada(self.cliente.with_options(max_retries=0, timeout=tempo_limite))
+
+        return self.politica.executar(
+            tentativa, self.parametros_ia.obter_tempo_espera(), chave=self.modelo)
+
+    def _criar_completion(self, **argumentos: Any) -> Any:
+        """Chama chat.completions.create (pela política de tentativas, se houver)"""
+        return self.executar_chamada(lambda cliente: cliente.chat.completions.create(**argumentos))
+
+    def completar(self, entrada: EntradaCompletion, temperatura: Optional[float] = None,
+                  max_tokens: Optional[int] = None, **opcoes: Any) -> Any:
+        """
+        Gera uma completion de chat com o modelo
+
+        Com um agendador, a requisição espera na fila até haver capacidade
+        de RPM e TPM, e a reserva é conciliada com o uso informado pela API.
+        Com uma política, falhas transitórias são repetidas dentro do prazo
+        de tempo_espera_padrao. Com um histórico, o uso informado é registrado.
+
+        Args:
+            entrada: Texto do usuário ou lista de mensagens do chat
+            temperatura: Temperatura (se None, usa a padrão dos parâmetros)
+            max_tokens: Máximo de tokens na resposta (se None, usa o padrão)
+            **opcoes: Demais argumentos de chat.completions.create
+
+        Returns:
+            Resposta da API (ChatCompletion)
+        """
+        if temperatura is None:
+            temperatura = self.parametros_ia.obter_temperatura_padrao()
+        if max_tokens is None:
+            max_tokens = self.parametros_ia.obter_max_tokens_padrao()
+        mensagens = montar_mensagens(entrada)
+        inicio = time.monotonic()
+
+        if self.agendador is None:
+            resposta = self._criar_completion(
+                model=self.modelo, messages=mensagens,
+                temperature=temperatura, max_tokens=max_tokens, **opcoes)
+        else:
+            with self.agendador.agendar(self.modelo, mensagens, max_tokens) as reserva:
+                resposta = self._criar_completion(
+                    model=self.modelo, messages=mensagens,
+                    temperature=temperatura, max_tokens=max_tokens, **opcoes)
+                self.agendador.conciliar_resposta(reserva, resposta)
+
+        if self.historico is not None:
+            self.historico.registrar_resposta(
+                self.modelo, resposta, duracao=time.monotonic() - inicio)
+        return resposta
+
+    def completar_fluxo(self, entrada: EntradaCompletion, temperatura: Optional[float] = None,
+                        max_tokens: Optional[int] = None, custo_maximo: Optional[float] = None,
+                        tokens_maximos: Optional[int] = None, **opcoes: Any) -> FluxoResposta:
+        """
+        Gera uma completion em fluxo, com contabilidade de tokens e custo
+
+        Args:
+            entrada: Texto do usuário ou lista de mensagens do chat
+            temperatura: Temperatura (se None, usa a padrão dos parâmetros)
+            max_tokens: Máximo de tokens na resposta (se None, usa o padrão)
+            custo_maximo: Custo (entrada + saída) que interrompe o fluxo
+            tokens_maximos: Tokens de saída que interrompem o fluxo
+            **opcoes: Demais argumentos de chat.completions.create
+
+        Returns:
+            FluxoResposta: itere para receber o texto; veja .estatisticas
+        """
+        if temperatura is None:
+            temperatura = self.parametros_ia.obter_temperatura_padrao()
+        if max_tokens is None:
+            max_tokens = self.parametros_ia.obter_max_tokens_padrao()
+        mensagens = montar_mensagens(entrada)
+        tokens_entrada = self.calculadora.contar_tokens_mensagens(mensagens, self.modelo)
+
+        agendador = self.agendador
+        reserva = None
+        if agendador is not None:
+            reserva = agendador.reservar(self.modelo, tokens_entrada + max_tokens)
+
+        def ao_finalizar(estatisticas: EstatisticasFluxo, uso: Any) -> None:
+            if agendador is not None and reserva is not None:
+                # Sem usage (fluxo interrompido): concilia com a contagem estimada
+                agendador.conciliar(
+                    reserva, uso.total_tokens if uso is not None
+                    else estatisticas.tokens_entrada + estatisticas.tokens_saida)
+            if self.historico is not None:
+                self.historico.registrar(
+                    self.modelo, estatisticas.tokens_entrada, estatisticas.tokens_saida,
+                    estatisticas.custo_total, duracao=estatisticas.duracao)
+
+        inicio = time.monotonic()
+        try:
+            resposta = self.cliente.chat.completions.create(
+                model=self.modelo, messages=mensagens, temperature=temperatura,
+                max_tokens=max_tokens, **opcoes_fluxo(opcoes))
+        except BaseException as erro:
+            # O fluxo não foi aberto: só erros de conexão devolvem a reserva inteira
+            if agendador is not None and reserva is not None:
+                agendador.encerrar_com_erro(reserva, erro, tokens_entrada)
+            raise
+        return FluxoResposta(
+            resposta, self.modelo, self.parametros_ia.obter_modelo(self.modelo),
+            tokens_entrada, self.calculadora, inicio, custo_maximo, tokens_maximos,
+            ao_finalizar)
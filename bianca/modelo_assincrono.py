@@ -0,0 +1,351 @@
+"""
+Módulo de modelo de IA assíncrono - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo oferece a contraparte assíncrona de ModeloIA, sobre AsyncOpenAI:
+- Chamadas de completion, embedding e moderação
+- Concorrência limitada por modelo (semáforo)
+- Execução em lote com resultados na ordem de entrada e erros por item
+- Limites de RPM e TPM opcionais (agendador.py)
+- Novas tentativas com prazo e hedge opcionais (politica_tentativas.py)
+- Completions em fluxo com contabilidade de tokens e custo (fluxo_resposta.py)
+
+Permite manter centenas de requisições em andamento sem uma thread por
+requisição. Os clientes vêm do pool compartilhado (pool_clientes.py).
+"""
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from openai import AsyncOpenAI
+
+from .calcular_tokens import CalculadoraTokens
+from .fluxo_resposta import EstatisticasFluxo, FluxoRespostaAssincrono
+from .modelo import EntradaCompletion, montar_mensagens, opcoes_fluxo
+from .parametros import ParametrosIA, obter_parametros
+from .pool_clientes import PoolClientes, obter_pool_clientes
+
+if TYPE_CHECKING:
+    from .agendador import AgendadorRequisicoes
+    from .historico_uso import HistoricoUso
+    from .politica_tentativas import PoliticaTentativas
+
+# Máximo de requisições simultâneas por modelo
+MAX_CONCORRENCIA_PADRAO = 50
+
+# Modelos usados quando nenhum é informado
+MODELO_EMBEDDING_PADRAO = 'text-embedding-3-small'
+MODELO_MODERACAO_PADRAO = 'text-moderation-latest'
+
+
+@dataclass
+class ResultadoItem:
+    """Resultado de um item de uma execução em lote"""
+    indice: int                          # Posição do item na entrada
+    resultado: Any = None                # Resposta da API (se houve sucesso)
+    erro: Optional[Exception] = None     # Exceção do item (se houve falha)
+
+    @property
+    def sucesso(self) -> bool:
+        """Indica se o item foi concluído sem erro"""
+        return self.erro is None
+
+
+class ModeloIAAssincrono:
+    """Classe assíncrona para gerenciar chamadas a um modelo específico"""
+
+    def __init__(self, modelo: str, parametros_ia: Optional[ParametrosIA] = None,
+                 base_url: Optional[str] = None, pool: Optional[PoolClientes] = None,
+                 max_concorrencia: int = MAX_CONCORRENCIA_PADRAO,
+                 limites_por_modelo: Optional[Dict[str, int]] = None,
+                 agendador: Optional['AgendadorRequisicoes'] = None,
+                 politica: Optional['PoliticaTentativas'] = None,
+                 historico: Optional['HistoricoUso'] = None):
+        """
+        Args:
+            modelo: Nome do modelo usado nas completions
+            parametros_ia: Parâmetros com a chave da API e os valores padrão
+                (se None, usa obter_parametros)
+            base_url: URL base da API (se None, usa a padrão da OpenAI)
+            pool: Pool de clientes compartilhado (se None, usa o global)
+            max_concorrencia: Máximo de requisições simultâneas por modelo
+            limites_por_modelo: Limites específicos de concorrência por modelo
+            agendador: Agendador de limites de RPM e TPM (opcional)
+            politica: Política de novas tentativas com prazo e hedge (opcional)
+            historico: Histórico onde o uso de cada chamada é registrado (opcional)
+
+        Raises:
+            ValueError: Se o modelo não estiver configurado
+        """
+        self.parametros_ia = parametros_ia or obter_parametros()
+        self.modelo = self._validar_modelo(modelo)
+        self.base_url = base_url
+        self.pool = pool or obter_pool_clientes()
+        self.max_concorrencia = max_concorrencia
+        self.limites_por_modelo = dict(limites_por_modelo or {})
+        self.agendador = agendador
+        self.politica = politica
+        self.historico = historico
+        self.calculadora = CalculadoraTokens()
+        # Semáforos por laço de eventos (um semáforo fica preso ao laço em que foi usado)
+        self._semaforos: 'weakref.WeakKeyDictionary[Any, Dict[str, asyncio.Semaphore]]' = \
+            weakref.WeakKeyDictionary()
+
+    def _validar_modelo(self, modelo: str) -> str:
+        """Verifica se o modelo está configurado e o retorna"""
+        if not self.parametros_ia.contem_modelo(modelo):
+            raise ValueError(
+                f"Modelo '{modelo}' não está na lista de modelos disponíveis: "
+                f"{self.parametros_ia.listar_modelos_disponiveis()}")
+        return modelo
+
+    def obter_modelo(self) -> str:
+        """Retorna o modelo"""
+        return self.modelo
+
+    def obter_cliente(self) -> AsyncOpenAI:
+        """Retorna o cliente assíncrono do laço de eventos atual"""
+        return self.pool.obter_cliente_assincrono(
+            self.parametros_ia.obter_chave_api(), self.base_url,
+            self.parametros_ia.obter_tempo_espera())
+
+    def _semaforo(self, modelo: str) -> asyncio.Semaphore:
+        """Retorna o semáforo do laço atual que limita as requisições simultâneas de um modelo"""
+        laco = asyncio.get_running_loop()
+        semaforos = self._semaforos.get(laco)
+        if semaforos is None:
+            semaforos = self._semaforos.setdefault(laco, {})
+        semaforo = semaforos.get(modelo)
+        if semaforo is None:
+            limite = self.limites_por_modelo.get(modelo, self.max_concorrencia)
+            semaforo = semaforos.setdefault(modelo, asyncio.Semaphore(limite))
+        return semaforo
+
+    async def _chamar(self, modelo: str,
+                      chamada: Callable[[AsyncOpenAI], Awaitable[Any]]) -> Any:
+        """Executa uma chamada no semáforo do modelo, pela política de tentativas se houver"""
+        if self.politica is None:
+            async with self._semaforo(modelo):
+                return await chamada(self.obter_cliente())
+
+        async def tentativa(tempo_limite: float) -> Any:
+            # A política controla as tentativas e o prazo de cada uma; a espera
+            # entre tentativas acontece fora do semáforo
+            cliente = self.obter_cliente().with_options(max_retries=0, timeout=tempo_limite)
+            async with self._semaforo(modelo):
+                return await chamada(cliente)
+
+        return await self.politica.executar_assincrono(
+            tentativa, self.parametros_ia.obter_tempo_espera(), chave=modelo)
+
+    async def _executar(self, modelo: str, entrada: Any, max_tokens_resposta: int,
+                        chamada: Callable[[AsyncOpenAI], Awaitable[Any]]) -> Any:
+        """Executa uma chamada dentro dos limites do agendador e do semáforo do modelo"""
+        inicio = time.monotonic()
+        if self.agendador is None:
+            resposta = await self._chamar(modelo, chamada)
+        else:
+            tokens_entrada = self.agendador.contar_entrada(modelo, entrada)
+            reserva = await self.agendador.reservar_assincrono(
+                modelo, tokens_entrada + max_tokens_resposta)
+            try:
+                resposta = await self._chamar(modelo, chamada)
+            except BaseException as erro:
+                # Requisição sem resposta: só erros de conexão devolvem a reserva inteira
+                self.agendador.encerrar_com_erro(reserva, erro, tokens_entrada)
+                raise
+            self.agendador.conciliar_resposta(reserva, resposta)
+
+        if self.historico is not None:
+            self.historico.registrar_resposta(modelo, resposta, duracao=time.monotonic() - inicio)
+        return resposta
+
+    async def completar(self, entrada: EntradaCompletion, modelo: Optional[str] = None,
+                        temperatura: Optional[float] = None,
+                        max_tokens: Optional[int] = None, **opcoes: Any) -> Any:
+        """
+        Gera uma completion de chat
+
+        Args:
+            entrada: Texto do usuário ou lista de mensagens do chat
+            modelo: Modelo usado (se None, usa o modelo da instância)
+            temperatura: Temperatura (se None, usa a padrão dos parâmetros)
+            max_tokens: Máximo de tokens na resposta (se None, usa o padrão)
+            **opcoes: Demais argumentos de chat.completions.create
+
+        Returns:
+            Resposta da API (ChatCompletion)
+        """
+        modelo = self._validar_modelo(modelo) if modelo else self.modelo
+        if temperatura is None:
+            temperatura = self.parametros_ia.obter_temperatura_padrao()
+        if max_tokens is None:
+            max_tokens = self.parametros_ia.obter_max_tokens_padrao()
+
+        mensagens = montar_mensagens(entrada)
+        return await self._executar(
+            modelo, mensagens, max_tokens,
+            lambda cliente: cliente.chat.completions.create(
+                model=modelo, messages=mensagens,
+                temperature=temperatura, max_tokens=max_tokens, **opcoes))
+
+    async def completar_fluxo(self, entrada: EntradaCompletion, modelo: Optional[str] = None,
+                              temperatura: Optional[float] = None,
+                              max_tokens: Optional[int] = None,
+                              custo_maximo: Optional[float] = None,
+                              tokens_maximos: Optional[int] = None,
+                              **opcoes: Any) -> FluxoRespostaAssincrono:
+        """
+        Gera uma completion em fluxo, com contabilidade de tokens e custo
+
+        O semáforo do modelo limita apenas o envio da requisição; a leitura
+        do fluxo acontece fora dele.
+
+        Args:
+            entrada: Texto do usuário ou lista de mensagens do chat
+            modelo: Modelo usado (se None, usa o modelo da instância)
+            temperatura: Temperatura (se None, usa a padrão dos parâmetros)
+            max_tokens: Máximo de tokens na resposta (se None, usa o padrão)
+            custo_maximo: Custo (entrada + saída) que interrompe o fluxo
+            tokens_maximos: Tokens de saída que interrompem o fluxo
+            **opcoes: Demais argumentos de chat.completions.create
+
+        Returns:
+            FluxoRespostaAssincrono: use async for para receber o texto
+        """
+        modelo = self._validar_modelo(modelo) if modelo else self.modelo
+        if temperatura is None:
+            temperatura = self.parametros_ia.obter_temperatura_padrao()
+        if max_tokens is None:
+            max_tokens = self.parametros_ia.obter_max_tokens_padrao()
+        mensagens = montar_mensagens(entrada)
+        tokens_entrada = self.calculadora.contar_tokens_mensagens(mensagens, modelo)
+
+        agendador = self.agendador
+        reserva = None
+        if agendador is not None:
+            reserva = await agendador.reservar_assincrono(
+                modelo, tokens_entrada + max_tokens)
+
+        def ao_finalizar(estatisticas: EstatisticasFluxo, uso: Any) -> None:
+            if agendador is not None and reserva is not None:
+                # Sem usage (fluxo interrompido): concilia com a contagem estimada
+                agendador.conciliar(
+                    reserva, uso.total_tokens if uso is not None
+                    else estatisticas.tokens_entrada + estatisticas.tokens_saida)
+            if self.historico is not None:
+                self.historico.registrar(
+                    modelo, estatisticas.tokens_entrada, estatisticas.tokens_saida,
+                    estatisticas.custo_total, duracao=estatisticas.duracao)
+
+        inicio = time.monotonic()
+        try:
+            async with self._semaforo(modelo):
+                resposta = await self.obter_cliente().chat.completions.create(
+                    model=modelo, messages=mensagens, temperature=temperatura,
+                    max_tokens=max_tokens, **opcoes_fluxo(opcoes))
+        except BaseException as erro:
+            # O fluxo não foi aberto: só erros de conexão devolvem a reserva inteira
+            if agendador is not None and reserva is not None:
+                agendador.encerrar_com_erro(reserva, erro, tokens_entrada)
+            raise
+        return FluxoRespostaAssincrono(
+            resposta, modelo, self.parametros_ia.obter_modelo(modelo), tokens_entrada,
+            self.calculadora, inicio, custo_maximo, tokens_maximos, ao_finalizar)
+
+    async def gerar_embedding(self, textos: Union[str, List[str]],
+                              modelo: str = MODELO_EMBEDDING_PADRAO, **opcoes: Any) -> Any:
+        """
+        Gera embeddings para um texto ou uma lista de textos
+
+        Args:
+            textos: Texto ou lista de textos
+            modelo: Modelo de embeddings
+            **opcoes: Demais argumentos de embeddings.create
+
+        Returns:
+            Resposta da API (CreateEmbeddingResponse)
+        """
+        modelo = self._validar_modelo(modelo)
+        return await self._executar(
+            modelo, textos, 0,
+            lambda cliente: cliente.embeddings.create(
+                model=modelo, input=textos, **opcoes))
+
+    async def moderar(self, textos: Union[str, List[str]],
+                      modelo: str = MODELO_MODERACAO_PADRAO, **opcoes: Any) -> Any:
+        """
+        Classifica um texto (ou uma lista de textos) quanto à moderação de conteúdo
+
+        Args:
+            textos: Texto ou lista de textos
+            modelo: Modelo de moderação
+            **opcoes: Demais argumentos de moderations.create
+
+        Returns:
+            Resposta da API (ModerationCreateResponse)
+        """
+        modelo = self._validar_modelo(modelo)
+        return await self._executar(
+            modelo, textos, 0,
+            lambda cliente: cliente.moderations.create(
+                model=modelo, input=textos, **opcoes))
+
+    async def reunir(self, chamadas: Iterable[Awaitable[Any]]) -> List[ResultadoItem]:
+        """
+        Aguarda várias chamadas e retorna os resultados na ordem de entrada
+
+        A falha de um item não interrompe os demais: o erro fica no item.
+        A concorrência é limitada pelos semáforos de cada modelo.
+
+        Args:
+            chamadas: Corrotinas (ex.: modelo.completar(...))
+
+        Returns:
+            Lista de ResultadoItem, na mesma ordem das chamadas
+        """
+        async def capturar(indice: int, chamada: Awaitable[Any]) -> ResultadoItem:
+            try:
+                return ResultadoItem(indice, resultado=await chamada)
+            except Exception as e:
+                return ResultadoItem(indice, erro=e)
+
+        return list(await asyncio.gather(
+            *(capturar(indice, chamada) for indice, chamada in enumerate(chamadas))))
+
+    async def completar_lote(self, entradas: Iterable[EntradaCompletion],
+                             **opcoes: Any) -> List[ResultadoItem]:
+        """
+        Gera completions para várias entradas
+
+        Args:
+            entradas: Textos ou listas de mensagens
+            **opcoes: Argumentos repassados para completar
+
+        Returns:
+            Lista de ResultadoItem, na ordem das entradas
+        """
+        return await self.reunir(self.completar(entrada, **opcoes) for entrada in entradas)
+
+    async def gerar_embeddings_lote(self, textos: Iterable[Union[str, List[str]]],
+                                    **opcoes: Any) -> List[ResultadoItem]:
+        """
+        Gera embeddings para vários textos (ou grupos de textos), uma requisição por item
+
+        Returns:
+            Lista de ResultadoItem, na ordem dos textos
+        """
+        return await self.reunir(self.gerar_embedding(texto, **opcoes) for texto in textos)
+
+    async def moderar_lote(self, textos: Iterable[Union[str, List[str]]],
+                           **opcoes: Any) -> List[ResultadoItem]:
+        """
+        Classifica vários textos (ou grupos de textos), uma requisição por item
+
+        Returns:
+            Lista de ResultadoItem, na ordem dos textos
+        """
+        return await self.reunir(self.moderar(texto, **opcoes) for texto in textos)
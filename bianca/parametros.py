@@ -17,23 +17,48 @@ Modelos incluídos:
 - Modelos de Embeddings (text-embedding-3-small/large)
 - Modelos de Moderação (text-moderation-latest)
 
+A tabela de modelos pode vir de um arquivo JSON ou TOML (parâmetro
+arquivo_modelos ou variável BIANCA_ARQUIVO_MODELOS), recarregado
+automaticamente quando o arquivo muda.
+
+Chave da API e valores padrão podem ser sobrepostos por tarefa ou por cliente
+com contexto_parametros, sem alterar a instância global (ver ParametrosContexto).
+
 Refatorado em: Dezembro 2024
 """
 
+import hashlib
+import json
+import math
 import os
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
-
-try:
-    from dotenv import load_dotenv
-    # Carrega variáveis de ambiente
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, Mapping, Optional, List, Tuple
+from dataclasses import asdict, dataclass
+
+# O arquivo .env é carregado na primeira criação de ParametrosIA, e não na
+# importação do módulo
+_ambiente_carregado = False
+
+
+def carregar_variaveis_ambiente() -> None:
+    """Carrega o arquivo .env uma única vez (se python-dotenv estiver instalado)"""
+    global _ambiente_carregado
+    if _ambiente_carregado:
+        return
+    _ambiente_carregado = True
+
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        # Se dotenv não estiver disponível, continua sem carregar
+        # O usuário pode definir as variáveis de ambiente manualmente
+        return
     load_dotenv()
-except ImportError as e:
-    print("Erro ao carregar o arquivo .env")
-    raise e
-    # Se dotenv não estiver disponível, continua sem carregar
-    # O usuário pode definir as variáveis de ambiente manualmente
-    pass
 
 
 @dataclass
@@ -46,12 +71,302 @@ class ModeloConfig:
     temperatura_padrao: float          # Temperatura padrão
     max_tokens_resposta: int           # Número máximo de tokens na resposta
     descricao: str                     # Descrição do modelo
+    preco_por_minuto: float = 0.0      # Preço por minuto de áudio (transcrição)
+
+
+# Sufixo de data das versões fixadas dos modelos: "-2024-08-06" ou "-0613"
+_PADRAO_SUFIXO_DATA = re.compile(r"-(?:\d{4}-\d{2}-\d{2}|\d{4})$")
+
+# Limite de nomes guardados no cache de resolução de aliases, para que nomes
+# arbitrários vindos de requisições não façam o cache crescer sem limite
+MAX_RESOLUCOES_CACHE = 4096
+
+
+class RegistroModelos:
+    """
+    Instantâneo imutável dos modelos configurados
+
+    As consultas por nome e por alias com data (ex.: 'gpt-4o-2024-08-06' ->
+    'gpt-4o') são O(1), e as resoluções de alias ficam em cache. Alterações
+    criam um novo registro (cópia na escrita), então leitores concorrentes
+    nunca usam trava nem copiam o dicionário.
+    """
+
+    __slots__ = ('_modelos', '_nomes', '_aliases', '_resolucoes')
+
+    _modelos: Mapping[str, ModeloConfig]
+    _nomes: Tuple[str, ...]
+    _aliases: Mapping[str, str]
+    _resolucoes: Dict[str, Optional[str]]
+
+    def __init__(self, modelos: Mapping[str, ModeloConfig],
+                 aliases: Optional[Mapping[str, str]] = None):
+        """
+        Args:
+            modelos: Dicionário nome -> ModeloConfig
+            aliases: Dicionário alias -> nome do modelo (além dos aliases com data)
+
+        Raises:
+            ValueError: Se algum alias apontar para um modelo inexistente
+        """
+        modelos = dict(modelos)
+        aliases = dict(aliases or {})
+        for alias, nome in aliases.items():
+            if nome not in modelos:
+                raise ValueError(f"Alias '{alias}' aponta para o modelo inexistente '{nome}'")
+
+        object.__setattr__(self, '_modelos', MappingProxyType(modelos))
+        object.__setattr__(self, '_nomes', tuple(modelos))
+        object.__setattr__(self, '_aliases', MappingProxyType(aliases))
+        object.__setattr__(self, '_resolucoes', {})
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        raise AttributeError("RegistroModelos é imutável; use com_modelo/sem_modelo")
+
+    def __delattr__(self, nome: str) -> None:
+        raise AttributeError("RegistroModelos é imutável; use com_modelo/sem_modelo")
+
+    def __contains__(self, nome_modelo: object) -> bool:
+        return isinstance(nome_modelo, str) and self.resolver(nome_modelo) is not None
+
+    def __len__(self) -> int:
+        return len(self._nomes)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nomes)
+
+    @property
+    def modelos(self) -> Mapping[str, ModeloConfig]:
+        """Visão somente leitura do dicionário nome -> ModeloConfig"""
+        return self._modelos
+
+    @property
+    def nomes(self) -> Tuple[str, ...]:
+        """Nomes dos modelos, na ordem de configuração"""
+        return self._nomes
+
+    @property
+    def aliases(self) -> Mapping[str, str]:
+        """Visão somente leitura dos aliases explícitos"""
+        return self._aliases
+
+    def resolver(self, nome_modelo: str) -> Optional[str]:
+        """
+        Resolve um nome ou alias para o nome do modelo configurado
+
+        Ordem: nome exato, alias explícito, nome sem o sufixo de data.
+
+        Args:
+            nome_modelo: Nome do modelo ou alias
+
+        Returns:
+            Nome do modelo configurado, ou None se não for encontrado
+        """
+        if nome_modelo in self._modelos:
+            return nome_modelo
+
+        resolucoes = self._resolucoes
+        try:
+            return resolucoes[nome_modelo]
+        except KeyError:
+            pass
+
+        nome = self._aliases.get(nome_modelo)
+        if nome is None:
+            sem_data = _PADRAO_SUFIXO_DATA.sub("", nome_modelo)
+            if sem_data != nome_modelo:
+                nome = sem_data if sem_data in self._modelos else self._aliases.get(sem_data)
+
+        # Escritas concorrentes guardam o mesmo valor, então dispensam trava
+        if len(resolucoes) < MAX_RESOLUCOES_CACHE:
+            resolucoes[nome_modelo] = nome
+        return nome
+
+    def obter(self, nome_modelo: str) -> Optional[ModeloConfig]:
+        """Retorna a configuração de um modelo pelo nome ou alias (ou None)"""
+        config = self._modelos.get(nome_modelo)
+        if config is not None:
+            return config
+        nome = self.resolver(nome_modelo)
+        return self._modelos[nome] if nome is not None else None
+
+    def com_modelo(self, config: ModeloConfig) -> 'RegistroModelos':
+        """Retorna um novo registro com o modelo incluído (ou substituído)"""
+        modelos = dict(self._modelos)
+        modelos[config.nome] = config
+        return RegistroModelos(modelos, self._aliases)
+
+    def sem_modelo(self, nome_modelo: str) -> 'RegistroModelos':
+        """
+        Retorna um novo registro sem o modelo (e sem os aliases dele)
+
+        Raises:
+            ValueError: Se o modelo não estiver no registro
+        """
+        if nome_modelo not in self._modelos:
+            raise ValueError(f"Modelo '{nome_modelo}' não encontrado")
+        modelos = {nome: config for nome, config in self._modelos.items()
+                   if nome != nome_modelo}
+        aliases = {alias: nome for alias, nome in self._aliases.items()
+                   if nome != nome_modelo}
+        return RegistroModelos(modelos, aliases)
+
+    def com_alias(self, alias: str, nome_modelo: str) -> 'RegistroModelos':
+        """Retorna um novo registro com um alias explícito adicional"""
+        aliases = dict(self._aliases)
+        aliases[alias] = nome_modelo
+        return RegistroModelos(self._modelos, aliases)
+
+
+# Variável de ambiente com o caminho do arquivo da tabela de modelos
+VARIAVEL_ARQUIVO_MODELOS = 'BIANCA_ARQUIVO_MODELOS'
+
+# Intervalo mínimo (segundos) entre verificações de alteração do arquivo
+INTERVALO_VERIFICACAO_PADRAO = 1.0
+
+
+def _ler_conteudo_tabela(conteudo: bytes, caminho_arquivo: str) -> Dict[str, Any]:
+    """Interpreta o conteúdo do arquivo como TOML (extensão .toml) ou JSON"""
+    if caminho_arquivo.lower().endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError(
+                    "Leitura de TOML requer Python 3.11+ ou o pacote tomli") from None
+        return tomllib.loads(conteudo.decode('utf-8'))
+    return json.loads(conteudo)
+
+
+# Campos numéricos do ModeloConfig: (aceita float, mínimo, máximo)
+_LIMITES_CAMPOS_MODELO: Dict[str, Tuple[bool, float, float]] = {
+    'preco_entrada_por_1k_tokens': (True, 0.0, math.inf),
+    'preco_saida_por_1k_tokens': (True, 0.0, math.inf),
+    'preco_por_minuto': (True, 0.0, math.inf),
+    'temperatura_padrao': (True, 0.0, 2.0),
+    'limite_tokens': (False, 0, math.inf),
+    'max_tokens_resposta': (False, 0, math.inf),
+}
+
+
+def _validar_campos_modelo(nome: str, campos: Mapping[str, Any]) -> None:
+    """Verifica o tipo e o intervalo de cada campo de um modelo da tabela"""
+    for campo in ('nome', 'descricao'):
+        if campo in campos and not isinstance(campos[campo], str):
+            raise ValueError(f"Modelo '{nome}': '{campo}' deve ser texto")
+
+    for campo, (aceita_float, minimo, maximo) in _LIMITES_CAMPOS_MODELO.items():
+        if campo not in campos:
+            continue
+        valor = campos[campo]
+        tipos = (int, float) if aceita_float else (int,)
+        # bool é subclasse de int, mas não é um valor válido aqui
+        if isinstance(valor, bool) or not isinstance(valor, tipos):
+            tipo = 'um número' if aceita_float else 'um inteiro'
+            raise ValueError(f"Modelo '{nome}': '{campo}' deve ser {tipo}, "
+                             f"recebido {valor!r}")
+        if not minimo <= valor <= maximo:
+            intervalo = (f"entre {minimo} e {maximo}" if maximo != math.inf
+                         else f"no mínimo {minimo}")
+            raise ValueError(f"Modelo '{nome}': '{campo}' deve ser {intervalo}, "
+                             f"recebido {valor!r}")
+
+
+def interpretar_tabela_modelos(dados: Mapping[str, Any]) -> RegistroModelos:
+    """
+    Cria um registro de modelos a partir dos dados de uma tabela
+
+    Formato esperado (JSON ou TOML):
+        {"modelos": {"gpt-4o": {"preco_entrada_por_1k_tokens": 0.005, ...}},
+         "aliases": {"meu-modelo": "gpt-4o"}}
+
+    O campo "nome" de cada modelo é opcional (padrão: a chave). Preços devem
+    ser números não negativos, limite_tokens e max_tokens_resposta inteiros
+    não negativos e a temperatura_padrao estar entre 0.0 e 2.0.
+
+    Args:
+        dados: Conteúdo já interpretado do arquivo
+
+    Returns:
+        Novo RegistroModelos
+
+    Raises:
+        ValueError: Se a tabela estiver vazia ou algum modelo ou alias for inválido
+    """
+    if not isinstance(dados, Mapping):
+        raise ValueError("A tabela de modelos deve ser um objeto")
+    entradas = dados.get('modelos')
+    if not isinstance(entradas, Mapping) or not entradas:
+        raise ValueError("A tabela de modelos deve ter uma seção 'modelos' não vazia")
+
+    modelos = {}
+    for nome, campos in entradas.items():
+        if not isinstance(campos, Mapping):
+            raise ValueError(f"Configuração inválida para o modelo '{nome}': "
+                             f"esperado um objeto, recebido {campos!r}")
+        campos = dict(campos)
+        campos.setdefault('nome', nome)
+        _validar_campos_modelo(nome, campos)
+        try:
+            modelos[nome] = ModeloConfig(**campos)
+        except TypeError as e:
+            raise ValueError(f"Configuração inválida para o modelo '{nome}': {e}") from None
+
+    aliases = dados.get('aliases') or {}
+    if not isinstance(aliases, Mapping):
+        raise ValueError("A seção 'aliases' deve ser um objeto")
+    for alias, nome in aliases.items():
+        if not isinstance(nome, str):
+            raise ValueError(f"Alias '{alias}' deve apontar para o nome de um modelo, "
+                             f"recebido {nome!r}")
+
+    return RegistroModelos(modelos, aliases)
+
+
+def carregar_tabela_modelos(caminho_arquivo: str) -> RegistroModelos:
+    """
+    Lê um arquivo JSON ou TOML com a tabela de modelos
+
+    Args:
+        caminho_arquivo: Caminho do arquivo (.json ou .toml)
+
+    Returns:
+        Novo RegistroModelos
+
+    Raises:
+        FileNotFoundError: Se o arquivo não for encontrado
+        ValueError: Se o conteúdo for inválido
+    """
+    with open(caminho_arquivo, 'rb') as f:
+        conteudo = f.read()
+    return interpretar_tabela_modelos(_ler_conteudo_tabela(conteudo, caminho_arquivo))
+
+
+def _validar_temperatura(temperatura: float) -> None:
+    """Verifica se a temperatura está entre 0.0 e 2.0"""
+    if not 0.0 <= temperatura <= 2.0:
+        raise ValueError("Temperatura deve estar entre 0.0 e 2.0")
 
 
 class ParametrosIA:
     """Classe principal para gerenciar parâmetros de IA"""
 
-    def __init__(self):
+    def __init__(self, arquivo_modelos: Optional[str] = None,
+                 intervalo_verificacao: float = INTERVALO_VERIFICACAO_PADRAO):
+        """
+        Args:
+            arquivo_modelos: Arquivo JSON ou TOML com a tabela de modelos (se None,
+                usa BIANCA_ARQUIVO_MODELOS ou, sem ela, a tabela embutida)
+            intervalo_verificacao: Intervalo mínimo (segundos) entre verificações
+                de alteração do arquivo
+
+        Raises:
+            FileNotFoundError: Se o arquivo de modelos não for encontrado
+            ValueError: Se o arquivo de modelos for inválido
+        """
+        carregar_variaveis_ambiente()
         self.chave_api = os.getenv('OPENAI_API_KEY', '')
         # Não exigir chave da API na inicialização para permitir importação do módulo
         # A validação será feita quando necessário
@@ -60,6 +375,16 @@ class ParametrosIA:
         self.temperatura_padrao = 0.7
         self.max_tokens_padrao = 1000
 
+        # Alterações nos modelos trocam o registro inteiro (cópia na escrita)
+        self._trava_registro = threading.Lock()
+
+        # Arquivo externo da tabela de modelos (recarregado quando muda)
+        self.arquivo_modelos = arquivo_modelos or os.getenv(VARIAVEL_ARQUIVO_MODELOS)
+        self.intervalo_verificacao = intervalo_verificacao
+        self._assinatura_arquivo: Optional[Tuple[int, int]] = None
+        self._hash_arquivo: Optional[bytes] = None
+        self._proxima_verificacao = 0.0
+
         # Configurações dos modelos - Atualizados com modelos mais recentes da OpenAI
         self.modelos = {
             # Modelos GPT-4 (mais antigos, ainda disponíveis)
@@ -180,9 +505,167 @@ class ParametrosIA:
                 temperatura_padrao=0.0,
                 max_tokens_resposta=1,
                 descricao='Modelo para moderação de conteúdo'
+            ),
+
+            # Modelos de Transcrição (cobrados por minuto de áudio)
+            'whisper-1': ModeloConfig(
+                nome='whisper-1',
+                preco_entrada_por_1k_tokens=0.0,
+                preco_saida_por_1k_tokens=0.0,
+                limite_tokens=0,
+                temperatura_padrao=0.0,
+                max_tokens_resposta=0,
+                descricao='Modelo Whisper para transcrição de áudio (arquivos de até 25 MB)',
+                preco_por_minuto=0.006
+            ),
+            'gpt-4o-transcribe': ModeloConfig(
+                nome='gpt-4o-transcribe',
+                preco_entrada_por_1k_tokens=0.0,
+                preco_saida_por_1k_tokens=0.0,
+                limite_tokens=0,
+                temperatura_padrao=0.0,
+                max_tokens_resposta=0,
+                descricao='Transcrição de áudio com GPT-4o, mais precisa que o Whisper',
+                preco_por_minuto=0.006
+            ),
+            'gpt-4o-mini-transcribe': ModeloConfig(
+                nome='gpt-4o-mini-transcribe',
+                preco_entrada_por_1k_tokens=0.0,
+                preco_saida_por_1k_tokens=0.0,
+                limite_tokens=0,
+                temperatura_padrao=0.0,
+                max_tokens_resposta=0,
+                descricao='Transcrição de áudio com GPT-4o mini, mais econômica',
+                preco_por_minuto=0.003
             )
         }
 
+        if self.arquivo_modelos:
+            self.recarregar_modelos(forcar=True)
+
+    @property
+    def registro(self) -> RegistroModelos:
+        """Instantâneo atual do registro de modelos (recarregado se o arquivo mudou)"""
+        if self.arquivo_modelos and time.monotonic() >= self._proxima_verificacao:
+            self._verificar_arquivo_modelos()
+        return self._registro
+
+    def _verificar_arquivo_modelos(self) -> None:
+        """Recarrega o arquivo de modelos se ele mudou, mantendo a tabela atual em caso de erro"""
+        # Se outra thread já está verificando, usa o registro atual
+        if not self._trava_registro.acquire(blocking=False):
+            return
+        try:
+            self._proxima_verificacao = time.monotonic() + self.intervalo_verificacao
+            self._recarregar_se_alterado(forcar=False)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"AVISO: Falha ao recarregar '{self.arquivo_modelos}', "
+                  f"mantendo a tabela atual: {e}")
+        finally:
+            self._trava_registro.release()
+
+    def _recarregar_se_alterado(self, forcar: bool) -> bool:
+        """Lê e troca o registro se o arquivo mudou (chamado com a trava adquirida)"""
+        estado = os.stat(self.arquivo_modelos)
+        assinatura = (estado.st_mtime_ns, estado.st_size)
+        if not forcar and assinatura == self._assinatura_arquivo:
+            return False
+
+        with open(self.arquivo_modelos, 'rb') as f:
+            conteudo = f.read()
+        hash_conteudo = hashlib.sha256(conteudo).digest()
+        self._assinatura_arquivo = assinatura
+        if not forcar and hash_conteudo == self._hash_arquivo:
+            # Só o mtime mudou (ex.: touch ou cópia idêntica)
+            return False
+
+        self._registro = interpretar_tabela_modelos(
+            _ler_conteudo_tabela(conteudo, self.arquivo_modelos))
+        self._hash_arquivo = hash_conteudo
+        return True
+
+    def recarregar_modelos(self, forcar: bool = False) -> bool:
+        """
+        Recarrega a tabela de modelos do arquivo configurado
+
+        Normalmente não é necessário: o arquivo é verificado automaticamente
+        nas consultas, no máximo uma vez a cada intervalo_verificacao.
+        Alterações feitas com registrar_modelo são descartadas na recarga.
+
+        Args:
+            forcar: Recarrega mesmo que o arquivo não tenha mudado
+
+        Returns:
+            True se uma nova tabela foi carregada
+
+        Raises:
+            ValueError: Se nenhum arquivo estiver configurado ou o conteúdo for inválido
+            FileNotFoundError: Se o arquivo não for encontrado
+        """
+        if not self.arquivo_modelos:
+            raise ValueError("Nenhum arquivo de modelos configurado")
+        with self._trava_registro:
+            self._proxima_verificacao = time.monotonic() + self.intervalo_verificacao
+            return self._recarregar_se_alterado(forcar)
+
+    def exportar_tabela_modelos(self, caminho_arquivo: str) -> None:
+        """
+        Grava a tabela de modelos atual em um arquivo JSON
+
+        Útil para criar o arquivo externo a partir da tabela embutida.
+
+        Args:
+            caminho_arquivo: Caminho do arquivo JSON a ser criado
+        """
+        registro = self.registro
+        dados = {
+            'modelos': {nome: asdict(config) for nome, config in registro.modelos.items()},
+            'aliases': dict(registro.aliases),
+        }
+        # Grava em um arquivo temporário e substitui, para que leitores nunca
+        # vejam o arquivo pela metade
+        temporario = f"{caminho_arquivo}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho_arquivo)
+
+    @property
+    def modelos(self) -> Mapping[str, ModeloConfig]:
+        """Visão somente leitura dos modelos configurados"""
+        return self.registro.modelos
+
+    @modelos.setter
+    def modelos(self, modelos: Mapping[str, ModeloConfig]) -> None:
+        """Substitui todos os modelos configurados por um novo registro"""
+        registro = RegistroModelos(modelos)
+        with self._trava_registro:
+            self._registro = registro
+
+    def registrar_modelo(self, config: ModeloConfig) -> None:
+        """Inclui ou substitui a configuração de um modelo"""
+        with self._trava_registro:
+            self._registro = self._registro.com_modelo(config)
+
+    def remover_modelo(self, nome_modelo: str) -> None:
+        """
+        Remove um modelo configurado
+
+        Raises:
+            ValueError: Se o modelo não estiver configurado
+        """
+        with self._trava_registro:
+            self._registro = self._registro.sem_modelo(nome_modelo)
+
+    def registrar_alias(self, alias: str, nome_modelo: str) -> None:
+        """
+        Registra um nome alternativo para um modelo configurado
+
+        Raises:
+            ValueError: Se o modelo não estiver configurado
+        """
+        with self._trava_registro:
+            self._registro = self._registro.com_alias(alias, nome_modelo)
+
     def obter_chave_api(self) -> str:
         """Retorna a chave da API"""
         return self.chave_api
@@ -192,16 +675,34 @@ class ParametrosIA:
         self.chave_api = chave
 
     def obter_modelo(self, nome_modelo: str) -> Optional[ModeloConfig]:
-        """Retorna a configuração de um modelo específico"""
-        return self.modelos.get(nome_modelo)
+        """Retorna a configuração de um modelo específico (aceita aliases com data)"""
+        return self.registro.obter(nome_modelo)
 
-    def listar_modelos(self) -> Dict[str, ModeloConfig]:
-        """Retorna todos os modelos configurados"""
-        return self.modelos.copy()
+    def contem_modelo(self, nome_modelo: str) -> bool:
+        """Verifica em O(1) se um modelo (ou alias) está configurado"""
+        return self.registro.resolver(nome_modelo) is not None
+
+    def resolver_modelo(self, nome_modelo: str) -> Optional[str]:
+        """Retorna o nome configurado para um modelo ou alias (ou None)"""
+        return self.registro.resolver(nome_modelo)
+
+    def listar_modelos(self) -> Mapping[str, ModeloConfig]:
+        """Retorna todos os modelos configurados (visão somente leitura, sem cópia)"""
+        return self.registro.modelos
 
     def listar_modelos_disponiveis(self) -> List[str]:
         """Retorna nomes dos modelos disponíveis"""
-        return list(self.modelos.keys())
+        return list(self.registro.nomes)
+
+    def listar_modelos_texto(self) -> List[str]:
+        """Retorna nomes dos modelos cobrados por tokens (exclui os de transcrição)"""
+        return [nome for nome, modelo in self.registro.modelos.items()
+                if modelo.preco_por_minuto <= 0]
+
+    def listar_modelos_audio(self) -> List[str]:
+        """Retorna nomes dos modelos de transcrição (cobrados por minuto de áudio)"""
+        return [nome for nome, modelo in self.registro.modelos.items()
+                if modelo.preco_por_minuto > 0]
 
     def obter_tempo_espera(self) -> int:
         """Retorna o tempo de espera padrão em segundos"""
@@ -217,10 +718,8 @@ class ParametrosIA:
 
     def definir_temperatura_padrao(self, temperatura: float) -> None:
         """Define a temperatura padrão (0.0 a 2.0)"""
-        if 0.0 <= temperatura <= 2.0:
-            self.temperatura_padrao = temperatura
-        else:
-            raise ValueError("Temperatura deve estar entre 0.0 e 2.0")
+        _validar_temperatura(temperatura)
+        self.temperatura_padrao = temperatura
 
     def obter_max_tokens_padrao(self) -> int:
         """Retorna o número máximo de tokens padrão para resposta"""
@@ -252,6 +751,7 @@ class ParametrosIA:
             'temperatura_padrao': modelo.temperatura_padrao,
             'max_tokens_resposta': modelo.max_tokens_resposta,
             'descricao': modelo.descricao,
+            'preco_por_minuto': modelo.preco_por_minuto,
             'tempo_espera_padrao': self.tempo_espera_padrao,
             'chave_api_configurada': bool(self.chave_api)
         }
@@ -298,10 +798,142 @@ class ParametrosIA:
         }
 
 
-# Instância global para uso em toda a aplicação
-parametros_ia = ParametrosIA()
+# Campos que podem ser sobrepostos por contexto
+CAMPOS_CONTEXTUAIS = ('chave_api', 'modelo', 'tempo_espera_padrao',
+                      'temperatura_padrao', 'max_tokens_padrao')
+
+
+class ParametrosContexto(ParametrosIA):
+    """
+    Visão de ParametrosIA com valores sobrepostos para uma tarefa ou cliente
+
+    Apenas os campos de CAMPOS_CONTEXTUAIS são sobrepostos; todo o resto
+    (tabela de modelos, consultas, recarga do arquivo) vem dos parâmetros
+    base, sem cópia. Os métodos definir_* alteram apenas a sobreposição.
+
+    Os demais métodos que alteram estado (registrar_modelo, remover_modelo,
+    registrar_alias, recarregar_modelos) atuam sobre os parâmetros base:
+    chamados por um contexto, alteram a instância global.
+    """
+
+    __slots__ = ('_base', '_sobrescritas')
+
+    _base: ParametrosIA
+    _sobrescritas: Dict[str, Any]
+
+    def __init__(self, base: ParametrosIA, **sobrescritas: Any):
+        """
+        Args:
+            base: Parâmetros sobrepostos (globais ou outro contexto)
+            **sobrescritas: Valores de CAMPOS_CONTEXTUAIS
+
+        Raises:
+            ValueError: Se algum campo não puder ser sobreposto ou a temperatura
+                for inválida
+        """
+        # ParametrosIA.__init__ não é chamado: o estado fica nos parâmetros base
+        invalidos = set(sobrescritas) - set(CAMPOS_CONTEXTUAIS)
+        if invalidos:
+            raise ValueError(
+                f"Campos não podem ser definidos por contexto: {sorted(invalidos)}")
+        if 'temperatura_padrao' in sobrescritas:
+            _validar_temperatura(sobrescritas['temperatura_padrao'])
+
+        object.__setattr__(self, '_base', base)
+        object.__setattr__(self, '_sobrescritas', sobrescritas)
+
+    def __getattr__(self, nome: str) -> Any:
+        # Chamado só para nomes que não são da classe: sobreposição ou base
+        sobrescritas = object.__getattribute__(self, '_sobrescritas')
+        if nome in sobrescritas:
+            return sobrescritas[nome]
+        return getattr(object.__getattribute__(self, '_base'), nome)
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        if nome in CAMPOS_CONTEXTUAIS:
+            self._sobrescritas[nome] = valor
+        elif nome.startswith('_'):
+            # Estado interno (registro, recarga do arquivo) pertence à base
+            setattr(self._base, nome, valor)
+        else:
+            raise AttributeError(f"'{nome}' não pode ser alterado em um contexto")
+
+    @property
+    def base(self) -> ParametrosIA:
+        """Parâmetros sobrepostos por este contexto"""
+        return self._base
+
+    @property
+    def sobrescritas(self) -> Dict[str, Any]:
+        """Cópia dos valores sobrepostos neste contexto"""
+        return dict(self._sobrescritas)
+
+
+# Instância global para uso em toda a aplicação, criada no primeiro uso
+_parametros_ia: Optional[ParametrosIA] = None
+_trava_parametros = threading.Lock()
+
+# Parâmetros da tarefa atual (asyncio) ou da thread atual
+_parametros_contexto: ContextVar[Optional[ParametrosContexto]] = ContextVar(
+    'bianca_parametros_contexto', default=None)
+
+
+def obter_parametros_globais() -> ParametrosIA:
+    """Retorna a instância global de parâmetros, ignorando contextos ativos"""
+    global _parametros_ia
+    if _parametros_ia is None:
+        with _trava_parametros:
+            if _parametros_ia is None:
+                _parametros_ia = ParametrosIA()
+    return _parametros_ia
 
 
 def obter_parametros() -> ParametrosIA:
-    """Função de conveniência para obter a instância global de parâmetros"""
-    return parametros_ia
+    """
+    Função de conveniência para obter os parâmetros em uso
+
+    Returns:
+        Os parâmetros do contexto ativo (ver contexto_parametros) ou, fora de
+        um contexto, a instância global
+    """
+    contexto = _parametros_contexto.get()
+    if contexto is not None:
+        return contexto
+    return obter_parametros_globais()
+
+
+@contextmanager
+def contexto_parametros(**sobrescritas: Any) -> Iterator[ParametrosContexto]:
+    """
+    Sobrepõe parâmetros apenas para o código executado dentro do bloco
+
+    Baseado em contextvars: cada tarefa asyncio e cada thread veem o seu
+    próprio contexto, sem trava e sem copiar a tabela de modelos. Contextos
+    aninhados sobrepõem o contexto externo.
+
+    Exemplo:
+        with contexto_parametros(chave_api=chave_cliente, temperatura_padrao=0.2):
+            params = obter_parametros()  # ParametrosContexto do cliente
+
+    Args:
+        **sobrescritas: Valores de CAMPOS_CONTEXTUAIS
+
+    Yields:
+        ParametrosContexto ativo dentro do bloco
+
+    Raises:
+        ValueError: Se algum campo não puder ser sobreposto
+    """
+    contexto = ParametrosContexto(obter_parametros(), **sobrescritas)
+    token = _parametros_contexto.set(contexto)
+    try:
+        yield contexto
+    finally:
+        _parametros_contexto.reset(token)
+
+
+def __getattr__(nome: str) -> ParametrosIA:
+    """Mantém o acesso a parametros.parametros_ia, criando a instância sob demanda"""
+    if nome == 'parametros_ia':
+        return obter_parametros_globais()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
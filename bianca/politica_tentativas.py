@@ -0,0 +1,339 @@
+"""
+Política de Novas Tentativas com Prazo e Requisições Duplicadas - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo define como as chamadas de ModeloIA e ModeloIAAssincrono são
+repetidas em caso de falha:
+- Prazo total por chamada (padrão: ParametrosIA.tempo_espera_padrao)
+- Espera exponencial com variação aleatória (jitter) entre as tentativas
+- Repetição apenas de erros transitórios (conexão, 429, 5xx), respeitando Retry-After
+- Requisição duplicada (hedge) quando a primeira passa do percentil 95 de
+  latência observado; vale a primeira resposta e a outra é cancelada
+
+Cada tentativa recebe como tempo limite o que resta do prazo, então a
+chamada inteira nunca ultrapassa o prazo.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, NoReturn, Optional, Set, TypeVar
+
+import openai
+
+from .parametros import obter_parametros
+
+T = TypeVar('T')
+
+# Códigos HTTP considerados transitórios
+STATUS_REPETIVEIS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# Amostras de latência mantidas por chave e mínimo para calcular o percentil
+TAMANHO_JANELA_LATENCIAS = 200
+MIN_AMOSTRAS_HEDGE = 20
+
+
+class JanelaLatencias:
+    """Latências recentes (segundos) de chamadas bem-sucedidas"""
+
+    def __init__(self, tamanho: int = TAMANHO_JANELA_LATENCIAS):
+        self._amostras: Deque[float] = deque(maxlen=tamanho)
+        self._trava = threading.Lock()
+
+    def registrar(self, latencia: float) -> None:
+        """Adiciona uma latência à janela"""
+        with self._trava:
+            self._amostras.append(latencia)
+
+    def percentil(self, fracao: float) -> Optional[float]:
+        """Retorna o percentil (ex.: 0.95) das latências, ou None se a janela estiver vazia"""
+        with self._trava:
+            amostras = sorted(self._amostras)
+        if not amostras:
+            return None
+        return amostras[min(len(amostras) - 1, int(fracao * len(amostras)))]
+
+    def __len__(self) -> int:
+        return len(self._amostras)
+
+
+class PoliticaTentativas:
+    """Política de novas tentativas com prazo, espera exponencial e hedge"""
+
+    def __init__(self, max_tentativas: int = 4, espera_inicial: float = 0.5,
+                 espera_maxima: float = 8.0, multiplicador: float = 2.0,
+                 prazo: Optional[float] = None, hedge: bool = False,
+                 percentil_hedge: float = 0.95, atraso_hedge: Optional[float] = None,
+                 min_amostras_hedge: int = MIN_AMOSTRAS_HEDGE):
+        """
+        Args:
+            max_tentativas: Número máximo de tentativas (incluindo a primeira)
+            espera_inicial: Espera máxima (segundos) antes da segunda tentativa
+            espera_maxima: Limite da espera entre tentativas
+            multiplicador: Fator de crescimento da espera a cada tentativa
+            prazo: Prazo total em segundos (se None, usa o tempo de espera
+                padrão dos parâmetros no momento da chamada)
+            hedge: Envia uma requisição duplicada quando a primeira demora
+            percentil_hedge: Percentil de latência que dispara a duplicada
+            atraso_hedge: Atraso fixo (segundos) para a duplicada, no lugar do percentil
+            min_amostras_hedge: Latências observadas necessárias antes de usar o percentil
+
+        Raises:
+            ValueError: Se max_tentativas for menor que 1
+        """
+        if max_tentativas < 1:
+            raise ValueError("max_tentativas deve ser pelo menos 1")
+        self.max_tentativas = max_tentativas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.multiplicador = multiplicador
+        self.prazo = prazo
+        self.hedge = hedge
+        self.percentil_hedge = percentil_hedge
+        self.atraso_hedge = atraso_hedge
+        self.min_amostras_hedge = min_amostras_hedge
+
+        self._janelas: Dict[Optional[str], JanelaLatencias] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._trava = threading.Lock()
+
+    def janela(self, chave: Optional[str] = None) -> JanelaLatencias:
+        """Retorna a janela de latências de uma chave (ex.: nome do modelo)"""
+        janela = self._janelas.get(chave)
+        if janela is None:
+            with self._trava:
+                janela = self._janelas.setdefault(chave, JanelaLatencias())
+        return janela
+
+    def calcular_atraso_hedge(self, chave: Optional[str] = None) -> Optional[float]:
+        """Segundos de espera antes da requisição duplicada (None = sem duplicada)"""
+        if not self.hedge:
+            return None
+        if self.atraso_hedge is not None:
+            return self.atraso_hedge
+        janela = self.janela(chave)
+        if len(janela) < self.min_amostras_hedge:
+            return None
+        return janela.percentil(self.percentil_hedge)
+
+    @staticmethod
+    def pode_repetir(erro: BaseException) -> bool:
+        """Indica se o erro é transitório e a chamada pode ser repetida"""
+        if isinstance(erro, (openai.APIConnectionError, TimeoutError, ConnectionError)):
+            return True
+        if isinstance(erro, openai.APIStatusError):
+            return erro.status_code in STATUS_REPETIVEIS
+        return False
+
+    def calcular_espera(self, tentativa: int, erro: Optional[BaseException] = None) -> float:
+        """
+        Espera antes da próxima tentativa (espera exponencial com jitter completo)
+
+        Se a resposta de erro trouxer o cabeçalho Retry-After, ele é respeitado.
+
+        Args:
+            tentativa: Número da tentativa que falhou (0 para a primeira)
+            erro: Erro da tentativa
+        """
+        resposta = getattr(erro, 'response', None)
+        if resposta is not None:
+            try:
+                return min(float(resposta.headers.get('retry-after')), self.espera_maxima)
+            except (TypeError, ValueError):
+                pass
+        limite = min(self.espera_maxima, self.espera_inicial * self.multiplicador ** tentativa)
+        return random.uniform(0, limite)
+
+    def _obter_prazo(self, prazo_padrao: Optional[float]) -> float:
+        """Prazo da política, o padrão informado ou o tempo de espera padrão dos parâmetros"""
+        if self.prazo is not None:
+            return self.prazo
+        if prazo_padrao is not None:
+            return prazo_padrao
+        return obter_parametros().obter_tempo_espera()
+
+    def _prazo_esgotado(self, prazo: float, tentativas: int,
+                        erro: Optional[BaseException]) -> NoReturn:
+        """Lança o TimeoutError do prazo esgotado, encadeado ao último erro transitório"""
+        excecao = TimeoutError(f"Prazo de {prazo}s esgotado após {tentativas} tentativa(s)")
+        if erro is not None:
+            raise excecao from erro
+        raise excecao
+
+    # Execução síncrona
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._trava:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix='bianca-hedge')
+        return self._executor
+
+    def fechar(self) -> None:
+        """
+        Encerra as threads das requisições duplicadas síncronas
+
+        A política continua utilizável: um novo executor é criado no próximo hedge.
+        """
+        with self._trava:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'PoliticaTentativas':
+        return self
+
+    def __exit__(self, *excecao: Any) -> None:
+        self.fechar()
+
+    def _medir(self, funcao: Callable[[float], T], limite: float, chave: Optional[str]) -> T:
+        """Executa uma tentativa e registra a latência se houver sucesso"""
+        inicio = time.monotonic()
+        resultado = funcao(limite)
+        self.janela(chave).registrar(time.monotonic() - inicio)
+        return resultado
+
+    def _tentar(self, funcao: Callable[[float], T], limite: float, chave: Optional[str]) -> T:
+        """Uma tentativa, com requisição duplicada se a primeira demorar"""
+        atraso = self.calcular_atraso_hedge(chave)
+        if atraso is None or atraso >= limite:
+            return self._medir(funcao, limite, chave)
+
+        executor = self._obter_executor()
+        futuros: Set['Future[T]'] = {executor.submit(self._medir, funcao, limite, chave)}
+        feitos, _ = wait(futuros, timeout=atraso)
+        if not feitos:
+            futuros.add(executor.submit(self._medir, funcao, limite - atraso, chave))
+
+        erro: Optional[BaseException] = None
+        while futuros:
+            feitos, futuros = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in feitos:
+                if futuro.exception() is None:
+                    # A requisição perdedora não pode ser interrompida em outra
+                    # thread: o resultado dela é descartado
+                    for pendente in futuros:
+                        pendente.cancel()
+                    return futuro.result()
+                erro = futuro.exception()
+        # Todas as requisições falharam: propaga o último erro
+        assert erro is not None
+        raise erro
+
+    def executar(self, funcao: Callable[[float], T], prazo_padrao: Optional[float] = None,
+                 chave: Optional[str] = None) -> T:
+        """
+        Executa uma chamada síncrona com novas tentativas dentro do prazo
+
+        Args:
+            funcao: Recebe o tempo limite (segundos) da tentativa e faz a chamada
+            prazo_padrao: Prazo total em segundos, se a política não tiver um prazo fixo
+            chave: Chave da janela de latências (ex.: nome do modelo)
+
+        Returns:
+            Resultado da primeira tentativa bem-sucedida
+
+        Raises:
+            TimeoutError: Se o prazo terminar antes de uma resposta
+            Exception: O erro da tentativa, se não for transitório
+        """
+        prazo = self._obter_prazo(prazo_padrao)
+        fim = time.monotonic() + prazo
+        erro: Optional[BaseException] = None
+        tentativas = 0
+
+        for tentativa in range(self.max_tentativas):
+            restante = fim - time.monotonic()
+            if restante <= 0:
+                break
+            tentativas += 1
+            try:
+                return self._tentar(funcao, restante, chave)
+            except Exception as e:
+                if not self.pode_repetir(e) or tentativa == self.max_tentativas - 1:
+                    raise
+                erro = e
+                espera = self.calcular_espera(tentativa, e)
+                if time.monotonic() + espera >= fim:
+                    break
+                time.sleep(espera)
+
+        self._prazo_esgotado(prazo, tentativas, erro)
+
+    # Execução assíncrona
+
+    async def _medir_assincrono(self, funcao: Callable[[float], Awaitable[T]],
+                                limite: float, chave: Optional[str]) -> T:
+        inicio = time.monotonic()
+        resultado = await funcao(limite)
+        self.janela(chave).registrar(time.monotonic() - inicio)
+        return resultado
+
+    async def _tentar_assincrono(self, funcao: Callable[[float], Awaitable[T]],
+                                 limite: float, chave: Optional[str]) -> T:
+        """Uma tentativa assíncrona, com requisição duplicada se a primeira demorar"""
+        atraso = self.calcular_atraso_hedge(chave)
+        if atraso is None or atraso >= limite:
+            return await self._medir_assincrono(funcao, limite, chave)
+
+        tarefas = {asyncio.ensure_future(self._medir_assincrono(funcao, limite, chave))}
+        try:
+            feitas, _ = await asyncio.wait(tarefas, timeout=atraso)
+            if not feitas:
+                tarefas.add(asyncio.ensure_future(
+                    self._medir_assincrono(funcao, limite - atraso, chave)))
+
+            erro: Optional[BaseException] = None
+            while tarefas:
+                feitas, tarefas = await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in feitas:
+                    if tarefa.exception() is None:
+                        return tarefa.result()
+                    erro = tarefa.exception()
+            assert erro is not None
+            raise erro
+        finally:
+            # Cancela a requisição perdedora (ou todas, se a chamada foi cancelada)
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    async def executar_assincrono(self, funcao: Callable[[float], Awaitable[T]],
+                                  prazo_padrao: Optional[float] = None,
+                                  chave: Optional[str] = None) -> T:
+        """
+        Versão assíncrona de executar
+
+        Args:
+            funcao: Recebe o tempo limite (segundos) da tentativa e retorna a corrotina
+            prazo_padrao: Prazo total em segundos, se a política não tiver um prazo fixo
+            chave: Chave da janela de latências (ex.: nome do modelo)
+
+        Raises:
+            TimeoutError: Se o prazo terminar antes de uma resposta
+            Exception: O erro da tentativa, se não for transitório
+        """
+        prazo = self._obter_prazo(prazo_padrao)
+        fim = time.monotonic() + prazo
+        erro: Optional[BaseException] = None
+        tentativas = 0
+
+        for tentativa in range(self.max_tentativas):
+            restante = fim - time.monotonic()
+            if restante <= 0:
+                break
+            tentativas += 1
+            try:
+                return await self._tentar_assincrono(funcao, restante, chave)
+            except Exception as e:
+                if not self.pode_repetir(e) or tentativa == self.max_tentativas - 1:
+                    raise
+                erro = e
+                espera = self.calcular_espera(tentativa, e)
+                if time.monotonic() + espera >= fim:
+                    break
+                await asyncio.sleep(espera)
+
+        self._prazo_esgotado(prazo, tentativas, erro)
@@ -0,0 +1,205 @@
+"""
+Pool de Clientes da OpenAI - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo compartilha clientes da OpenAI (e suas conexões HTTP) entre as
+instâncias de ModeloIA:
+- Um cliente por (chave da API, URL base, tempo de espera)
+- Tamanho do pool de conexões e keep-alive configuráveis
+- Tempo de espera padrão obtido de ParametrosIA.obter_tempo_espera
+- Fechamento de todas as conexões ao encerrar o processo
+- Clientes assíncronos (AsyncOpenAI), um conjunto por laço de eventos
+
+Assim, criar vários objetos ModeloIA não abre novas conexões TCP/TLS.
+"""
+
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from openai import (DEFAULT_CONNECTION_LIMITS, AsyncOpenAI, DefaultAsyncHttpxClient,
+                    DefaultHttpxClient, OpenAI)
+
+from .parametros import obter_parametros
+
+# Valores padrão do pool de conexões HTTP de cada cliente
+MAX_CONEXOES_PADRAO = 100
+MAX_CONEXOES_OCIOSAS_PADRAO = 20
+TEMPO_OCIOSO_PADRAO = 30.0  # segundos que uma conexão ociosa é mantida aberta
+
+ChaveCliente = Tuple[str, Optional[str], float]
+
+
+class PoolClientes:
+    """Clientes da OpenAI compartilhados, um por (chave da API, URL base, tempo de espera)"""
+
+    def __init__(self, max_conexoes: int = MAX_CONEXOES_PADRAO,
+                 max_conexoes_ociosas: int = MAX_CONEXOES_OCIOSAS_PADRAO,
+                 tempo_ocioso: float = TEMPO_OCIOSO_PADRAO,
+                 max_tentativas: int = 2):
+        """
+        Args:
+            max_conexoes: Máximo de conexões simultâneas por cliente
+            max_conexoes_ociosas: Máximo de conexões mantidas abertas (keep-alive)
+            tempo_ocioso: Segundos que uma conexão ociosa é mantida aberta
+            max_tentativas: Novas tentativas feitas pelo próprio cliente da OpenAI
+        """
+        self.max_conexoes = max_conexoes
+        self.max_conexoes_ociosas = max_conexoes_ociosas
+        self.tempo_ocioso = tempo_ocioso
+        self.max_tentativas = max_tentativas
+
+        self._clientes: Dict[ChaveCliente, OpenAI] = {}
+        # Conexões assíncronas pertencem a um laço de eventos: um conjunto por laço
+        self._clientes_assincronos: 'weakref.WeakKeyDictionary[Any, Dict[ChaveCliente, AsyncOpenAI]]' = \
+            weakref.WeakKeyDictionary()
+        self._trava = threading.Lock()
+        self._criados = 0
+        self._reutilizados = 0
+
+    def _limites(self) -> Any:
+        """Limites do pool de conexões, na classe usada pelo cliente HTTP da openai"""
+        # A biblioteca HTTP muda entre versões da openai (httpx, httpx2): a
+        # classe dos limites vem dos limites padrão da própria openai
+        return type(DEFAULT_CONNECTION_LIMITS)(
+            max_connections=self.max_conexoes,
+            max_keepalive_connections=self.max_conexoes_ociosas,
+            keepalive_expiry=self.tempo_ocioso)
+
+    def obter_cliente(self, chave_api: str, base_url: Optional[str] = None,
+                      tempo_espera: Optional[float] = None) -> OpenAI:
+        """
+        Retorna o cliente compartilhado para a combinação informada
+
+        Args:
+            chave_api: Chave da API
+            base_url: URL base da API (se None, usa a padrão da OpenAI)
+            tempo_espera: Tempo de espera em segundos (se None, usa
+                ParametrosIA.obter_tempo_espera)
+
+        Returns:
+            Cliente OpenAI (criado na primeira chamada)
+        """
+        if tempo_espera is None:
+            tempo_espera = obter_parametros().obter_tempo_espera()
+        chave = (chave_api, base_url, float(tempo_espera))
+
+        cliente = self._clientes.get(chave)
+        if cliente is not None:
+            self._reutilizados += 1
+            return cliente
+
+        with self._trava:
+            cliente = self._clientes.get(chave)
+            if cliente is None:
+                cliente = OpenAI(
+                    api_key=chave_api,
+                    base_url=base_url,
+                    timeout=tempo_espera,
+                    max_retries=self.max_tentativas,
+                    http_client=DefaultHttpxClient(limits=self._limites(),
+                                                   timeout=tempo_espera))
+                self._clientes[chave] = cliente
+                self._criados += 1
+            else:
+                self._reutilizados += 1
+            return cliente
+
+    def obter_cliente_assincrono(self, chave_api: str, base_url: Optional[str] = None,
+                                 tempo_espera: Optional[float] = None) -> AsyncOpenAI:
+        """
+        Retorna o cliente assíncrono compartilhado no laço de eventos atual
+
+        Args:
+            chave_api: Chave da API
+            base_url: URL base da API (se None, usa a padrão da OpenAI)
+            tempo_espera: Tempo de espera em segundos (se None, usa
+                ParametrosIA.obter_tempo_espera)
+
+        Returns:
+            Cliente AsyncOpenAI (criado na primeira chamada neste laço)
+
+        Raises:
+            RuntimeError: Se chamado fora de um laço de eventos
+        """
+        laco = asyncio.get_running_loop()
+        if tempo_espera is None:
+            tempo_espera = obter_parametros().obter_tempo_espera()
+        chave = (chave_api, base_url, float(tempo_espera))
+
+        with self._trava:
+            clientes = self._clientes_assincronos.setdefault(laco, {})
+            cliente = clientes.get(chave)
+            if cliente is None:
+                cliente = AsyncOpenAI(
+                    api_key=chave_api,
+                    base_url=base_url,
+                    timeout=tempo_espera,
+                    max_retries=self.max_tentativas,
+                    http_client=DefaultAsyncHttpxClient(limits=self._limites(),
+                                                        timeout=tempo_espera))
+                clientes[chave] = cliente
+                self._criados += 1
+            else:
+                self._reutilizados += 1
+            return cliente
+
+    async def fechar_assincronos(self) -> None:
+        """Fecha os clientes assíncronos do laço de eventos atual"""
+        laco = asyncio.get_running_loop()
+        with self._trava:
+            clientes = list(self._clientes_assincronos.pop(laco, {}).values())
+        for cliente in clientes:
+            await cliente.close()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas de uso do pool
+
+        Returns:
+            Dicionário com clientes ativos, criados e reutilizados
+        """
+        return {
+            'clientes_ativos': len(self._clientes),
+            'clientes_assincronos_ativos': sum(
+                len(clientes) for clientes in list(self._clientes_assincronos.values())),
+            'clientes_criados': self._criados,
+            'clientes_reutilizados': self._reutilizados,
+            'max_conexoes': self.max_conexoes,
+            'max_conexoes_ociosas': self.max_conexoes_ociosas,
+        }
+
+    def fechar(self) -> None:
+        """
+        Fecha os clientes síncronos e suas conexões (novos clientes podem ser criados depois)
+
+        Clientes assíncronos devem ser fechados dentro do seu laço de eventos,
+        com fechar_assincronos.
+        """
+        with self._trava:
+            clientes = list(self._clientes.values())
+            self._clientes.clear()
+        for cliente in clientes:
+            cliente.close()
+
+    def __len__(self) -> int:
+        return len(self._clientes)
+
+
+# Instância global para uso em toda a aplicação
+pool_clientes = PoolClientes()
+
+
+def obter_pool_clientes() -> PoolClientes:
+    """Função de conveniência para obter o pool global de clientes"""
+    return pool_clientes
+
+
+def fechar_pool_clientes() -> None:
+    """Fecha as conexões do pool global (registrada para o encerramento do processo)"""
+    pool_clientes.fechar()
+
+
+atexit.register(fechar_pool_clientes)
@@ -0,0 +1,436 @@
+"""
+Resumos de Uso Pré-agregados - BIANCA
+Biblioteca de Inteligência Artificial para Novos Componentes e Aplicações
+
+Este módulo mantém totais por hora, dia e mês, por modelo, projeto, usuário
+e tipo, a partir do HistoricoUso:
+- Relatórios leem os resumos (poucas linhas) em vez dos registros brutos
+- Atualização incremental: só os registros novos desde a última posição
+  processada são somados, na mesma transação que avança a posição
+- Atualização automática em segundo plano quando novos registros chegam
+- Reconstrução completa a partir dos registros brutos
+- Exportação em CSV linha a linha, sem montar o relatório em memória
+
+Os custos somados são os dos registros do histórico, calculados por
+CalculadoraTokens.calcular_custo. Os resumos ficam em SQLite no modo WAL,
+então painéis em outros processos podem consultá-los e atualizá-los.
+"""
+
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from .historico_uso import (
+    NUMPY_AVAILABLE, HistoricoUso, TotaisUso, _para_microssegundos, _periodo_puro,
+    _rotulo_periodo, obter_historico_uso)
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+ARQUIVO_RESUMOS = 'resumos.sqlite'
+
+# Granularidades mantidas e dimensões aceitas em consultar
+GRANULARIDADES = ('hora', 'dia', 'mes')
+DIMENSOES_RESUMO = ('periodo', 'modelo', 'projeto', 'usuario', 'tipo')
+COLUNAS_TOTAIS = ('requisicoes', 'tokens_entrada', 'tokens_saida', 'custo')
+
+
+class ResumosUso:
+    """Totais por período, modelo, projeto e usuário, mantidos em SQLite"""
+
+    def __init__(self, historico: Optional[HistoricoUso] = None,
+                 caminho_arquivo: Optional[str] = None, intervalo: float = 1.0,
+                 automatico: bool = True, tempo_espera: float = 30.0):
+        """
+        Args:
+            historico: Histórico de uso de origem (se None, usa obter_historico_uso)
+            caminho_arquivo: Arquivo SQLite dos resumos
+                (se None, resumos.sqlite no diretório do histórico)
+            intervalo: Segundos entre a chegada de um registro e a atualização
+                automática (registros que chegam nesse intervalo vão juntos)
+            automatico: Se True, atualiza em segundo plano quando o histórico
+                recebe registros; se False, só em atualizar() e nas consultas
+            tempo_espera: Tempo máximo (segundos) de espera por bloqueios de
+                outros processos
+        """
+        self.historico = historico if historico is not None else obter_historico_uso()
+        self.caminho_arquivo = caminho_arquivo or os.path.join(
+            self.historico.diretorio, ARQUIVO_RESUMOS)
+        self.intervalo = intervalo
+        self.tempo_espera = tempo_espera
+
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._pendente = threading.Event()
+        self._parada = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._automatico = automatico
+
+        self._criar_tabelas()
+        if automatico:
+            self.historico.adicionar_ouvinte(self._notificar)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual (reabrindo após um fork)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho_arquivo, timeout=self.tempo_espera,
+                                      isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _criar_tabelas(self) -> None:
+        """Cria a tabela de resumos e a posição processada, se necessário"""
+        conexao = self._conexao()
+        # Nomes ausentes são gravados como '' para fazer parte da chave primária
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS resumos ("
+            " granularidade TEXT NOT NULL,"
+            " periodo TEXT NOT NULL,"
+            " modelo TEXT NOT NULL,"
+            " projeto TEXT NOT NULL,"
+            " usuario TEXT NOT NULL,"
+            " tipo INTEGER NOT NULL,"
+            " requisicoes INTEGER NOT NULL,"
+            " tokens_entrada INTEGER NOT NULL,"
+            " tokens_saida INTEGER NOT NULL,"
+            " custo REAL NOT NULL,"
+            " PRIMARY KEY (granularidade, periodo, modelo, projeto, usuario, tipo)"
+            ") WITHOUT ROWID")
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS posicao ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " segmento INTEGER NOT NULL,"
+            " indice INTEGER NOT NULL)")
+        conexao.execute("INSERT OR IGNORE INTO posicao VALUES (0, 0, 0)")
+
+    # Atualização
+
+    def _notificar(self) -> None:
+        """Ouvinte do histórico: agenda uma atualização em segundo plano"""
+        if self._thread is None:
+            with self._trava:
+                if self._thread is None and not self._parada.is_set():
+                    self._thread = threading.Thread(
+                        target=self._atualizar_em_segundo_plano,
+                        name='bianca-resumos-uso', daemon=True)
+                    self._thread.start()
+        self._pendente.set()
+
+    def _atualizar_em_segundo_plano(self) -> None:
+        while not self._parada.is_set():
+            self._pendente.wait()
+            # Espera o intervalo para juntar os registros que chegarem nele
+            if self._parada.wait(self.intervalo):
+                break
+            self._pendente.clear()
+            try:
+                self.atualizar()
+            except Exception as e:
+                print(f"AVISO: Falha ao atualizar os resumos de uso: {e}")
+
+    def atualizar(self) -> int:
+        """
+        Soma aos resumos os registros gravados desde a última atualização
+
+        Returns:
+            Quantidade de registros incorporados
+        """
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            quantidade = self._incorporar(conexao)
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        return quantidade
+
+    def reconstruir(self) -> int:
+        """
+        Refaz os resumos a partir de todos os registros do histórico
+
+        Returns:
+            Quantidade de registros incorporados
+        """
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            conexao.execute("DELETE FROM resumos")
+            conexao.execute("UPDATE posicao SET segmento = 0, indice = 0")
+            quantidade = self._incorporar(conexao)
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        return quantidade
+
+    def _incorporar(self, conexao: sqlite3.Connection) -> int:
+        """Soma os registros novos e avança a posição (dentro de uma transação)"""
+        posicao = tuple(conexao.execute("SELECT segmento, indice FROM posicao").fetchone())
+        if NUMPY_AVAILABLE:
+            grupos, posicao_final, quantidade = self._agregar_numpy(posicao)
+        else:
+            grupos, posicao_final, quantidade = self._agregar_puro(posicao)
+        if not quantidade:
+            return 0
+
+        # Nomes e rótulos decodificados uma vez por valor
+        obter_nome = self.historico.obter_nome
+        nomes: Dict[Tuple[str, int], str] = {}
+        rotulos: Dict[Tuple[str, int], str] = {}
+
+        def linhas() -> Iterator[Tuple]:
+            for granularidade, periodo, modelo, projeto, usuario, tipo, *totais in grupos:
+                chave_periodo = (granularidade, periodo)
+                if chave_periodo not in rotulos:
+                    rotulos[chave_periodo] = _rotulo_periodo(granularidade, periodo)
+                chave_nomes = []
+                for dimensao, identificador in (('modelo', modelo), ('projeto', projeto),
+                                                ('usuario', usuario)):
+                    if (dimensao, identificador) not in nomes:
+                        nomes[dimensao, identificador] = obter_nome(dimensao, identificador) or ''
+                    chave_nomes.append(nomes[dimensao, identificador])
+                yield (granularidade, rotulos[chave_periodo], *chave_nomes, tipo, *totais)
+
+        conexao.executemany(
+            "INSERT INTO resumos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (granularidade, periodo, modelo, projeto, usuario, tipo) DO UPDATE SET"
+            " requisicoes = requisicoes + excluded.requisicoes,"
+            " tokens_entrada = tokens_entrada + excluded.tokens_entrada,"
+            " tokens_saida = tokens_saida + excluded.tokens_saida,"
+            " custo = custo + excluded.custo",
+            linhas())
+        conexao.execute("UPDATE posicao SET segmento = ?, indice = ?", posicao_final)
+        return quantidade
+
+    def _agregar_numpy(self, posicao: Tuple[int, int]
+                       ) -> Tuple[Iterator[Tuple], Tuple[int, int], int]:
+        """
+        Totais dos registros novos por granularidade, lidos por coluna
+
+        Returns:
+            (linhas (granularidade, período, ids, tipo, totais), posição final,
+            quantidade de registros)
+        """
+        acumulados: Dict[str, Tuple[List[Any], List[Any]]] = {}
+        quantidade = 0
+        for posicao, registros in self.historico.colunas_desde(posicao):
+            quantidade += len(registros)
+            valores = [np.ones(len(registros), dtype=np.float64), registros['tokens_entrada'],
+                       registros['tokens_saida'], registros['custo']]
+            dimensoes = [registros[campo].astype(np.int64)
+                         for campo in ('modelo', 'projeto', 'usuario', 'tipo')]
+            for granularidade in GRANULARIDADES:
+                chaves = [HistoricoUso._coluna_numpy(registros, granularidade)] + dimensoes
+                valores_granularidade = valores
+                if granularidade in acumulados:
+                    # Junta com os grupos dos segmentos anteriores
+                    anteriores = acumulados[granularidade]
+                    chaves = [np.concatenate(par) for par in zip(anteriores[0], chaves)]
+                    valores_granularidade = [np.concatenate(par)
+                                             for par in zip(anteriores[1], valores)]
+                acumulados[granularidade] = HistoricoUso._reduzir_grupos(
+                    chaves, valores_granularidade)
+
+        def linhas() -> Iterator[Tuple]:
+            for granularidade, (chaves, somas) in acumulados.items():
+                requisicoes, tokens_entrada, tokens_saida = (
+                    np.rint(soma).astype(np.int64).tolist() for soma in somas[:3])
+                for chave, *totais in zip(zip(*(coluna.tolist() for coluna in chaves)),
+                                          requisicoes, tokens_entrada, tokens_saida,
+                                          somas[3].tolist()):
+                    yield (granularidade, *chave, *totais)
+
+        return linhas(), posicao, quantidade
+
+    def _agregar_puro(self, posicao: Tuple[int, int]
+                      ) -> Tuple[Iterator[Tuple], Tuple[int, int], int]:
+        """Totais dos registros novos por granularidade, registro a registro (ver _agregar_numpy)"""
+        grupos: Dict[Tuple, TotaisUso] = {}
+        quantidade = 0
+        for posicao, registros in self.historico.registros_desde(posicao):
+            for registro in registros:
+                quantidade += 1
+                dimensoes = (registro[1], registro[4], registro[5], registro[2])
+                for granularidade in GRANULARIDADES:
+                    chave = (granularidade, _periodo_puro(granularidade, registro[0])) + dimensoes
+                    totais = grupos.get(chave)
+                    if totais is None:
+                        totais = grupos[chave] = TotaisUso()
+                    totais.requisicoes += 1
+                    totais.tokens_entrada += registro[6]
+                    totais.tokens_saida += registro[7]
+                    totais.custo += registro[8]
+        linhas = ((*chave, totais.requisicoes, totais.tokens_entrada, totais.tokens_saida,
+                   totais.custo) for chave, totais in grupos.items())
+        return linhas, posicao, quantidade
+
+    # Consulta
+
+    def _montar_consulta(self, granularidade: str, por: Sequence[str],
+                         inicio: Union[None, float, datetime], fim: Union[None, float, datetime],
+                         modelo: Optional[str], projeto: Optional[str],
+                         usuario: Optional[str], tipo: Optional[int]) -> Tuple[str, List[Any]]:
+        """SQL agrupado pelas dimensões pedidas, com os filtros"""
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(
+                f"Granularidade '{granularidade}' desconhecida. Use: {GRANULARIDADES}")
+        for dimensao in por:
+            if dimensao not in DIMENSOES_RESUMO:
+                raise ValueError(f"Dimensão '{dimensao}' desconhecida. Use: {DIMENSOES_RESUMO}")
+
+        condicoes = ["granularidade = ?"]
+        argumentos: List[Any] = [granularidade]
+        # Os rótulos ISO dos períodos se comparam como texto
+        for limite, operador in ((inicio, '>='), (fim, '<')):
+            microssegundos = _para_microssegundos(limite)
+            if microssegundos is not None:
+                condicoes.append(f"periodo {operador} ?")
+                argumentos.append(_rotulo_periodo(
+                    granularidade, _periodo_puro(granularidade, microssegundos)))
+        for coluna, valor in (('modelo', modelo), ('projeto', projeto),
+                              ('usuario', usuario), ('tipo', tipo)):
+            if valor is not None:
+                condicoes.append(f"{coluna} = ?")
+                argumentos.append(valor)
+
+        somas = ", ".join(f"SUM({coluna})" for coluna in COLUNAS_TOTAIS)
+        sql = f"SELECT {', '.join(list(por) + [somas])} FROM resumos WHERE {' AND '.join(condicoes)}"
+        if por:
+            sql += f" GROUP BY {', '.join(por)} ORDER BY {', '.join(por)}"
+        return sql, argumentos
+
+    def _percorrer(self, granularidade: str, por: Sequence[str], atualizar: bool,
+                   **filtros: Any) -> Iterator[Tuple]:
+        """Linhas agrupadas (dimensões + totais), lidas do cursor uma a uma"""
+        if atualizar:
+            self.atualizar()
+        sql, argumentos = self._montar_consulta(granularidade, por, **filtros)
+        indices_nomes = [indice for indice, dimensao in enumerate(por)
+                         if dimensao in ('modelo', 'projeto', 'usuario')]
+        for linha in self._conexao().execute(sql, argumentos):
+            if linha[len(por)] is None:
+                # SUM sem linhas (consulta sem agrupamento)
+                continue
+            if indices_nomes:
+                linha = list(linha)
+                for indice in indices_nomes:
+                    linha[indice] = linha[indice] or None
+            yield tuple(linha)
+
+    def consultar(self, granularidade: str = 'dia',
+                  por: Sequence[str] = ('periodo', 'modelo'),
+                  inicio: Union[None, float, datetime] = None,
+                  fim: Union[None, float, datetime] = None,
+                  modelo: Optional[str] = None, projeto: Optional[str] = None,
+                  usuario: Optional[str] = None, tipo: Optional[int] = None,
+                  atualizar: bool = True) -> Dict[Tuple, TotaisUso]:
+        """
+        Soma os resumos de uma granularidade agrupados por dimensões
+
+        Args:
+            granularidade: 'hora', 'dia' ou 'mes' (UTC)
+            por: Dimensões do grupo: 'periodo', 'modelo', 'projeto', 'usuario' ou 'tipo'
+            inicio: Considera os períodos a partir do que contém este instante
+            fim: Considera os períodos anteriores ao que contém este instante
+            modelo: Considera apenas este modelo
+            projeto: Considera apenas este projeto
+            usuario: Considera apenas este usuário
+            tipo: Considera apenas TIPO_CHAMADA ou TIPO_ESTIMATIVA
+            atualizar: Se True, incorpora antes os registros ainda não resumidos
+
+        Returns:
+            Dicionário {chave: TotaisUso}, em ordem de chave; a chave tem um
+            valor por dimensão (períodos como rótulo ISO do início)
+
+        Raises:
+            ValueError: Se a granularidade ou alguma dimensão for desconhecida
+        """
+        por = tuple(por)
+        return {
+            linha[:len(por)]: TotaisUso(*linha[len(por):])
+            for linha in self._percorrer(granularidade, por, atualizar, inicio=inicio, fim=fim,
+                                         modelo=modelo, projeto=projeto, usuario=usuario,
+                                         tipo=tipo)}
+
+    def exportar_csv(self, destino: Union[str, TextIO], granularidade: str = 'dia',
+                     por: Sequence[str] = DIMENSOES_RESUMO,
+                     inicio: Union[None, float, datetime] = None,
+                     fim: Union[None, float, datetime] = None,
+                     modelo: Optional[str] = None, projeto: Optional[str] = None,
+                     usuario: Optional[str] = None, tipo: Optional[int] = None,
+                     atualizar: bool = True) -> int:
+        """
+        Exporta os resumos em CSV, escrevendo uma linha por vez
+
+        Args:
+            destino: Caminho do arquivo ou arquivo de texto já aberto
+            granularidade: 'hora', 'dia' ou 'mes' (UTC)
+            por: Colunas de dimensão do relatório (ver consultar)
+            inicio, fim, modelo, projeto, usuario, tipo, atualizar: Ver consultar
+
+        Returns:
+            Quantidade de linhas escritas (sem o cabeçalho)
+
+        Raises:
+            ValueError: Se a granularidade ou alguma dimensão for desconhecida
+        """
+        por = tuple(por)
+        linhas = self._percorrer(granularidade, por, atualizar, inicio=inicio, fim=fim,
+                                 modelo=modelo, projeto=projeto, usuario=usuario, tipo=tipo)
+        if isinstance(destino, str):
+            with open(destino, 'w', encoding='utf-8', newline='') as arquivo:
+                return self._escrever_csv(arquivo, por, linhas)
+        return self._escrever_csv(destino, por, linhas)
+
+    @staticmethod
+    def _escrever_csv(arquivo: TextIO, por: Tuple[str, ...], linhas: Iterator[Tuple]) -> int:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(por + COLUNAS_TOTAIS)
+        quantidade = 0
+        for linha in linhas:
+            escritor.writerow(linha)
+            quantidade += 1
+        return quantidade
+
+    def fechar(self) -> None:
+        """Para a atualização automática, incorpora os registros pendentes e fecha"""
+        if self._automatico:
+            self.historico.remover_ouvinte(self._notificar)
+        self._parada.set()
+        self._pendente.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.atualizar()
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def __enter__(self) -> 'ResumosUso':
+        return self
+
+    def __exit__(self, *excecao: Any) -> None:
+        self.fechar()
+
+
+# Instância global, criada no primeiro uso
+_resumos_uso: Optional[ResumosUso] = None
+_trava_resumos = threading.Lock()
+
+
+def obter_resumos_uso() -> ResumosUso:
+    """Retorna os resumos do histórico de uso global (obter_historico_uso)"""
+    global _resumos_uso
+    if _resumos_uso is None:
+        with _trava_resumos:
+            if _resumos_uso is None:
+                _resumos_uso = ResumosUso()
+    return _resumos_uso
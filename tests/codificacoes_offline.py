@@ -0,0 +1,45 @@
+"""
+Codificações offline para os testes - BIANCA
+
+Registra no tiktoken versões reduzidas de cl100k_base e o200k_base (bytes
+isolados e alguns pares frequentes), com os mesmos padrões de divisão das
+codificações reais. Assim os testes não dependem do download dos arquivos BPE.
+"""
+
+from typing import Dict
+
+import tiktoken
+import tiktoken.registry
+
+# Padrões de divisão das codificações reais do tiktoken
+PADRAO_CL100K = (r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+|"""
+                 r""" ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s""")
+PADRAO_O200K = "|".join([
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+    r"""\p{N}{1,3}""",
+    r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+    r"""\s*[\r\n]+""",
+    r"""\s+(?!\S)""",
+    r"""\s+""",
+])
+
+# Pares acrescentados aos 256 bytes isolados
+PARES = [b"th", b"he", b"in", b"er", b"an", b" t", b" a", b"de", b"os", b"ar",
+         b" the", b"ing", "ão".encode(), b"\n\n", b"  "]
+
+
+def _ranks() -> Dict[bytes, int]:
+    ranks = {bytes([i]): i for i in range(256)}
+    for par in PARES:
+        ranks.setdefault(par, len(ranks))
+    return ranks
+
+
+def instalar_codificacoes_offline() -> None:
+    """Registra cl100k_base e o200k_base offline no registro do tiktoken"""
+    for nome, padrao in (("cl100k_base", PADRAO_CL100K), ("o200k_base", PADRAO_O200K)):
+        ranks = _ranks()
+        tiktoken.registry.ENCODINGS[nome] = tiktoken.Encoding(
+            name=nome, pat_str=padrao, mergeable_ranks=ranks,
+            special_tokens={"<|endoftext|>": len(ranks)})
@@ -0,0 +1,29 @@
+"""
+Configuração dos testes - BIANCA
+
+Os testes rodam sem rede: o tiktoken usa codificações offline, a chave da API
+é fictícia, o histórico global fica em um diretório temporário e as chamadas
+à API vão para um servidor local (fixture servidor_openai).
+"""
+
+import os
+import tempfile
+from typing import Iterator
+
+import pytest
+
+os.environ.setdefault('OPENAI_API_KEY', 'sk-teste')
+os.environ['BIANCA_DIRETORIO_HISTORICO'] = tempfile.mkdtemp(prefix='bianca-historico-')
+
+from codificacoes_offline import instalar_codificacoes_offline  # noqa: E402
+from servidor_openai import ServidorOpenAI  # noqa: E402
+
+instalar_codificacoes_offline()
+
+
+@pytest.fixture
+def servidor_openai() -> Iterator[ServidorOpenAI]:
+    """Servidor local compatível com a API da OpenAI"""
+    servidor = ServidorOpenAI()
+    yield servidor
+    servidor.fechar()
@@ -0,0 +1,175 @@
+"""
+Servidor local compatível com a API da OpenAI - BIANCA
+
+Atende, em uma thread, as rotas usadas pela biblioteca:
+- /chat/completions (com e sem streaming)
+- /embeddings e /moderations
+- /audio/transcriptions (multipart; devolve o nome do arquivo recebido)
+
+Controles usados pelos testes:
+- atraso: segundos de espera por requisição (número ou função sem argumentos)
+- falhas: quantidade de respostas 503 (com retry-after) antes de atender
+- pedacos: quantidade de pedaços do streaming
+- entradas contendo 'FALHA' recebem erro 400
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Union
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: '_Servidor'
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        tamanho = int(self.headers.get('content-length', 0))
+        bruto = self.rfile.read(tamanho)
+        if 'multipart' in self.headers.get('content-type', ''):
+            encontrado = re.search(rb'filename="([^"]+)"', bruto)
+            corpo: Dict[str, Any] = {'input': encontrado.group(1).decode() if encontrado else ''}
+        else:
+            corpo = json.loads(bruto or b'{}')
+
+        controle = self.server.controle
+        controle._entrar(self.path, corpo)
+        try:
+            atraso = controle.atraso
+            time.sleep(atraso() if callable(atraso) else atraso)
+        finally:
+            controle._sair()
+
+        if controle._consumir_falha():
+            self._responder(503, {'error': {'message': 'indisponível'}},
+                            {'retry-after': '0.05'})
+            return
+
+        entrada = json.dumps(corpo.get('messages') or corpo.get('input'))
+        if 'FALHA' in entrada:
+            self._responder(400, {'error': {'message': 'falha',
+                                            'type': 'invalid_request_error'}})
+            return
+
+        if self.path.endswith('/chat/completions'):
+            if corpo.get('stream'):
+                self._fluxo(corpo)
+                return
+            texto = 'resposta ' + str(corpo['messages'][-1]['content'])
+            resposta: Dict[str, Any] = {
+                'id': 'c', 'object': 'chat.completion', 'created': 0, 'model': corpo['model'],
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': texto}}],
+                'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}}
+        elif self.path.endswith('/embeddings'):
+            entradas = corpo['input'] if isinstance(corpo['input'], list) else [corpo['input']]
+            resposta = {'object': 'list', 'model': corpo['model'],
+                        'data': [{'object': 'embedding', 'index': i, 'embedding': [0.1, 0.2]}
+                                 for i in range(len(entradas))],
+                        'usage': {'prompt_tokens': 3, 'total_tokens': 3}}
+        elif self.path.endswith('/moderations'):
+            resposta = {'id': 'm', 'model': corpo.get('model', ''), 'results': []}
+        elif self.path.endswith('/audio/transcriptions'):
+            resposta = {'text': ' transcricao ' + corpo['input'] + ' '}
+        else:
+            self._responder(404, {'error': {'message': 'rota inexistente'}})
+            return
+        self._responder(200, resposta)
+
+    def _fluxo(self, corpo: Dict[str, Any]) -> None:
+        self.send_response(200)
+        self.send_header('content-type', 'text/event-stream')
+        self.send_header('transfer-encoding', 'chunked')
+        self.end_headers()
+
+        def enviar(dados: str) -> None:
+            bloco = ('data: ' + dados + '\n\n').encode()
+            self.wfile.write(b'%x\r\n' % len(bloco) + bloco + b'\r\n')
+            self.wfile.flush()
+
+        def pedaco(**campos: Any) -> str:
+            return json.dumps({'id': 's', 'object': 'chat.completion.chunk', 'created': 0,
+                               'model': corpo['model'], **campos})
+
+        try:
+            for _ in range(self.server.controle.pedacos):
+                enviar(pedaco(choices=[{'index': 0, 'delta': {'content': ' palavra'},
+                                        'finish_reason': None}]))
+                time.sleep(0.005)
+            enviar(pedaco(choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+            if corpo.get('stream_options', {}).get('include_usage'):
+                enviar(pedaco(choices=[], usage={'prompt_tokens': 10, 'completion_tokens': 20,
+                                                 'total_tokens': 30}))
+            enviar('[DONE]')
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+        except OSError:
+            # Cliente fechou o fluxo antes do fim
+            self.server.controle.fluxos_interrompidos += 1
+
+    def _responder(self, codigo: int, resposta: Dict[str, Any],
+                   cabecalhos: Dict[str, str] = {}) -> None:
+        corpo = json.dumps(resposta).encode()
+        self.send_response(codigo)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(corpo)))
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    controle: 'ServidorOpenAI'
+
+
+class ServidorOpenAI:
+    """Servidor HTTP local que imita as rotas da API da OpenAI"""
+
+    def __init__(self, atraso: Union[float, Callable[[], float]] = 0.0):
+        self.atraso = atraso
+        self.falhas = 0
+        self.pedacos = 20
+        self.fluxos_interrompidos = 0
+        self.pedidos: List[Dict[str, Any]] = []
+        self.ativos = 0
+        self.maximo_simultaneo = 0
+        self._trava = threading.Lock()
+
+        self._servidor = _Servidor(('127.0.0.1', 0), _Manipulador)
+        self._servidor.controle = self
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        """URL base a ser usada como base_url dos clientes"""
+        return 'http://127.0.0.1:%d/v1' % self._servidor.server_address[1]
+
+    def _entrar(self, caminho: str, corpo: Dict[str, Any]) -> None:
+        with self._trava:
+            self.pedidos.append({'caminho': caminho, 'corpo': corpo})
+            self.ativos += 1
+            self.maximo_simultaneo = max(self.maximo_simultaneo, self.ativos)
+
+    def _sair(self) -> None:
+        with self._trava:
+            self.ativos -= 1
+
+    def _consumir_falha(self) -> bool:
+        with self._trava:
+            if self.falhas > 0:
+                self.falhas -= 1
+                return True
+            return False
+
+    def fechar(self) -> None:
+        """Encerra o servidor"""
+        self._servidor.shutdown()
+        self._servidor.server_close()
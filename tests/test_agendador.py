@@ -0,0 +1,183 @@
+"""Testes do agendador de requisições por limites de taxa"""
+
+import asyncio
+import threading
+import time
+
+import openai
+import pytest
+
+from bianca.agendador import AgendadorRequisicoes, BaldeTokens, LimitesModelo
+from bianca.modelo import ModeloIA
+from bianca.modelo_assincrono import ModeloIAAssincrono
+from bianca.parametros import obter_parametros
+
+MODELO = "gpt-4o-mini"
+
+
+def _tokens_disponiveis(agendador: AgendadorRequisicoes) -> float:
+    return agendador.estatisticas()[MODELO]["tokens_disponiveis"]
+
+
+def test_balde_reabastece_com_o_tempo() -> None:
+    balde = BaldeTokens(600, segundos_rajada=1.0)
+    agora = time.monotonic()
+
+    assert balde.tempo_ate(10, agora) == 0.0
+    balde.consumir(10)
+    assert balde.tempo_ate(10, agora) == pytest.approx(1.0, abs=0.01)
+    assert balde.tempo_ate(10, agora + 1.0) == 0.0
+
+
+def test_modelo_sem_limites_nao_espera() -> None:
+    agendador = AgendadorRequisicoes({})
+
+    reserva = agendador.reservar(MODELO, 10_000)
+
+    assert reserva.espera == 0.0
+    assert agendador.estatisticas() == {}
+
+
+def test_limite_de_requisicoes_espaca_liberacoes() -> None:
+    # 10 requisições por segundo, sem rajada
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(requisicoes_por_minuto=600)},
+                                     segundos_rajada=0.1)
+    inicio = time.monotonic()
+
+    reservas = [agendador.reservar(MODELO, 1) for _ in range(3)]
+
+    assert time.monotonic() - inicio >= 0.18
+    assert reservas[0].espera < reservas[2].espera
+
+
+def test_tempo_maximo_esgotado_sai_da_fila() -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=60)})
+    agendador.reservar(MODELO, 10)
+
+    with pytest.raises(TimeoutError):
+        agendador.reservar(MODELO, 10, tempo_maximo=0.05)
+    assert agendador.estatisticas()[MODELO]["na_fila"] == 0
+
+
+def test_conciliacao_devolve_a_diferenca() -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=60)})
+
+    reserva = agendador.reservar(MODELO, 8)
+    agendador.conciliar(reserva, 3)
+
+    assert _tokens_disponiveis(agendador) == pytest.approx(7, abs=0.1)
+
+
+def test_devolucao_preserva_o_reabastecimento() -> None:
+    balde = BaldeTokens(600, segundos_rajada=1.0)
+    balde.consumir(10)
+    time.sleep(0.2)
+
+    # O reabastecimento acumulado até a devolução não pode ser perdido
+    balde.devolver(-5)
+    assert balde.nivel == pytest.approx(-5 + 2, abs=0.3)
+
+
+def test_agendar_cancela_reserva_quando_a_requisicao_nao_saiu() -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(requisicoes_por_minuto=60,
+                                                            tokens_por_minuto=60)})
+
+    with pytest.raises(openai.APIConnectionError):
+        with agendador.agendar(MODELO, "texto", max_tokens_resposta=5):
+            raise openai.APIConnectionError(request=None)
+
+    assert _tokens_disponiveis(agendador) == pytest.approx(10, abs=0.1)
+    assert agendador.estatisticas()[MODELO]["requisicoes_disponiveis"] == pytest.approx(
+        10, abs=0.1)
+
+
+@pytest.mark.parametrize("erro", [openai.APITimeoutError(request=None),
+                                  RuntimeError("falha na requisição")],
+                         ids=["tempo_esgotado", "outro_erro"])
+def test_agendar_mantem_a_entrada_quando_a_requisicao_pode_ter_saido(erro) -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(requisicoes_por_minuto=60,
+                                                            tokens_por_minuto=60)})
+    tokens_entrada = agendador.contar_entrada(MODELO, "texto")
+
+    with pytest.raises(type(erro)):
+        with agendador.agendar(MODELO, "texto", max_tokens_resposta=5):
+            raise erro
+
+    assert _tokens_disponiveis(agendador) == pytest.approx(10 - tokens_entrada, abs=0.1)
+    assert agendador.estatisticas()[MODELO]["requisicoes_disponiveis"] == pytest.approx(
+        9, abs=0.1)
+
+
+def test_agendar_assincrono_encerra_reserva_quando_o_bloco_falha() -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=60)})
+
+    async def executar(erro: Exception) -> None:
+        async with agendador.agendar_assincrono(MODELO, "texto", max_tokens_resposta=5):
+            raise erro
+
+    with pytest.raises(openai.APIConnectionError):
+        asyncio.run(executar(openai.APIConnectionError(request=None)))
+    assert _tokens_disponiveis(agendador) == pytest.approx(10, abs=0.1)
+    with pytest.raises(RuntimeError):
+        asyncio.run(executar(RuntimeError("falha na requisição")))
+    assert _tokens_disponiveis(agendador) == pytest.approx(
+        10 - agendador.contar_entrada(MODELO, "texto"), abs=0.1)
+
+
+def test_espera_assincrona_acorda_com_cancelamento() -> None:
+    # 1 token por segundo: sem aviso, a segunda reserva esperaria ~10s
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=60)})
+    primeira = agendador.reservar(MODELO, 10)
+
+    async def executar() -> float:
+        threading.Timer(0.05, agendador.cancelar, (primeira,)).start()
+        inicio = time.monotonic()
+        await agendador.reservar_assincrono(MODELO, 10, tempo_maximo=5)
+        return time.monotonic() - inicio
+
+    assert asyncio.run(executar()) < 0.2
+
+
+def test_fila_assincrona_respeita_ordem_de_chegada() -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(requisicoes_por_minuto=1200)},
+                                     segundos_rajada=0.05)
+    ordem = []
+
+    async def reservar(indice: int) -> None:
+        await agendador.reservar_assincrono(MODELO, 1)
+        ordem.append(indice)
+
+    async def executar() -> None:
+        await asyncio.gather(*(reservar(indice) for indice in range(5)))
+
+    asyncio.run(executar())
+    assert ordem == list(range(5))
+
+
+def test_modelo_cobra_a_entrada_de_requisicao_com_erro_de_status(servidor_openai) -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=600)})
+    modelo = ModeloIA(MODELO, obter_parametros(), base_url=servidor_openai.url,
+                      agendador=agendador)
+    tokens_entrada = agendador.contar_entrada(MODELO, [{"role": "user", "content": "FALHA"}])
+
+    with pytest.raises(openai.BadRequestError):
+        modelo.completar("FALHA", max_tokens=50)
+
+    # A API recebeu a requisição: só a parte da resposta volta ao balde
+    assert _tokens_disponiveis(agendador) == pytest.approx(100 - tokens_entrada, abs=2)
+
+
+def test_modelo_assincrono_cobra_a_entrada_de_requisicao_com_erro(servidor_openai) -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=600)})
+    modelo = ModeloIAAssincrono(MODELO, base_url=servidor_openai.url, agendador=agendador)
+    tokens_entrada = agendador.contar_entrada(MODELO, [{"role": "user", "content": "FALHA"}])
+
+    async def executar() -> None:
+        with pytest.raises(openai.BadRequestError):
+            await modelo.completar("FALHA", max_tokens=50)
+        await modelo.completar("ok", max_tokens=50)
+        await modelo.pool.fechar_assincronos()
+
+    asyncio.run(executar())
+    # A segunda requisição foi conciliada com o uso informado (15 tokens)
+    assert _tokens_disponiveis(agendador) == pytest.approx(100 - tokens_entrada - 15, abs=3)
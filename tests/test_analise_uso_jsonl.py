@@ -0,0 +1,131 @@
+"""Testes da análise de uso em arquivos JSONL"""
+
+import json
+import sys
+
+import pytest
+
+from bianca import analise_uso_jsonl
+from bianca.analise_uso_jsonl import AnalisadorUsoJsonl, _ler_bloco, analisar_uso_jsonl
+from bianca.calcular_tokens import CalculadoraTokens
+
+MENSAGENS = [{"role": "user", "content": "Quanto custa?"}]
+
+LINHAS = [
+    # Resposta de chat com nome datado (entra em gpt-4o)
+    {"object": "chat.completion", "model": "gpt-4o-2024-08-06",
+     "choices": [{"message": {"role": "assistant", "content": "Depende do modelo."}}],
+     "usage": {"prompt_tokens": 12, "completion_tokens": 6,
+               "prompt_tokens_details": {"cached_tokens": 4}}},
+    # Responses API com raciocínio
+    {"object": "response", "model": "gpt-4o-mini",
+     "output": [{"content": [{"type": "output_text", "text": "Ok."}]}],
+     "usage": {"input_tokens": 20, "output_tokens": 30,
+               "output_tokens_details": {"reasoning_tokens": 25}}},
+    # Saídas do Batch: com sucesso e com erro
+    {"custom_id": "1", "error": None,
+     "response": {"status_code": 200, "body": {"model": "gpt-4o-mini",
+                                               "usage": {"prompt_tokens": 7,
+                                                         "completion_tokens": 3}}}},
+    {"custom_id": "2", "error": {"message": "falhou"}, "response": None},
+    # Entrada do Batch: só estimativa
+    {"custom_id": "3", "body": {"model": "gpt-4o", "messages": MENSAGENS}},
+    # Log com pedido e resposta na mesma linha
+    {"request": {"model": "gpt-4o", "messages": MENSAGENS},
+     "response": {"model": "gpt-4o", "usage": {"prompt_tokens": 15, "completion_tokens": 2},
+                  "choices": [{"message": {"content": "Pouco."}}]}},
+    # Modelo sem preço configurado e linha sem uso
+    {"model": "modelo-desconhecido", "usage": {"prompt_tokens": 1, "completion_tokens": 1}},
+    {"object": "list", "data": []},
+]
+
+
+@pytest.fixture
+def arquivo_jsonl(tmp_path):
+    caminho = tmp_path / "uso.jsonl"
+    texto = "\n".join(json.dumps(linha) for linha in LINHAS)
+    # Linha inválida, linha em branco e última linha sem quebra
+    caminho.write_text(texto + '\n{"usage": quebrada\n\n' + json.dumps(LINHAS[0]),
+                       encoding="utf-8")
+    return str(caminho)
+
+
+def test_blocos_cobrem_cada_linha_uma_vez(arquivo_jsonl) -> None:
+    with open(arquivo_jsonl, "rb") as arquivo:
+        esperadas = arquivo.read().splitlines(keepends=True)
+
+    for tamanho_bloco in (1, 7, 64, 333, 10 ** 6):
+        analisador = AnalisadorUsoJsonl(processos=1, tamanho_bloco=tamanho_bloco)
+        linhas = [linha for bloco in analisador._blocos([arquivo_jsonl])
+                  for linha in _ler_bloco(*bloco)]
+        assert linhas == esperadas, tamanho_bloco
+
+
+def test_totais_por_modelo(arquivo_jsonl) -> None:
+    resultado = analisar_uso_jsonl(arquivo_jsonl, processos=1)
+
+    assert list(resultado.por_modelo) == ["gpt-4o", "gpt-4o-mini", "modelo-desconhecido"]
+    gpt_4o = resultado.por_modelo["gpt-4o"]
+    assert (gpt_4o.requisicoes, gpt_4o.tokens_entrada, gpt_4o.tokens_saida) == (3, 39, 14)
+    assert gpt_4o.tokens_entrada_cache == 8
+    mini = resultado.por_modelo["gpt-4o-mini"]
+    assert (mini.requisicoes, mini.tokens_entrada, mini.tokens_saida) == (2, 27, 33)
+    assert mini.tokens_raciocinio == 25
+    assert mini.custo == pytest.approx(CalculadoraTokens().calcular_custo("gpt-4o-mini", 27, 33))
+    assert resultado.modelos_sem_preco == ["modelo-desconhecido"]
+    assert resultado.por_modelo["modelo-desconhecido"].custo == 0.0
+    assert (resultado.linhas, resultado.linhas_ignoradas, resultado.linhas_invalidas,
+            resultado.erros) == (10, 1, 1, 1)
+
+
+def test_estimativas_de_entrada_e_saida(arquivo_jsonl) -> None:
+    calculadora = CalculadoraTokens()
+    estimada = calculadora.contar_tokens_mensagens(MENSAGENS, "gpt-4o")
+
+    gpt_4o = analisar_uso_jsonl(arquivo_jsonl, processos=1).por_modelo["gpt-4o"]
+
+    # Entrada do Batch e log com pedido; só o log tem o uso real na mesma linha
+    assert (gpt_4o.estimativas_entrada, gpt_4o.tokens_entrada_estimados) == (2, 2 * estimada)
+    assert gpt_4o.pares_entrada == 1
+    assert gpt_4o.desvio_entrada == pytest.approx(15 / estimada - 1)
+    assert gpt_4o.pares_saida == 3
+    assert gpt_4o.tokens_saida_estimados == (
+        2 * calculadora.contar_tokens("Depende do modelo.", "gpt-4o")
+        + calculadora.contar_tokens("Pouco.", "gpt-4o"))
+
+
+def test_blocos_pequenos_e_pool_somam_o_mesmo(arquivo_jsonl) -> None:
+    esperado = analisar_uso_jsonl(arquivo_jsonl, processos=1)
+
+    for processos in (1, 2):
+        resultado = AnalisadorUsoJsonl(processos=processos, tamanho_bloco=100).analisar(
+            [arquivo_jsonl, arquivo_jsonl])
+        assert resultado.linhas == 2 * esperado.linhas
+        for modelo, uso in esperado.por_modelo.items():
+            assert resultado.por_modelo[modelo].tokens_entrada == 2 * uso.tokens_entrada
+            assert resultado.por_modelo[modelo].tokens_saida_estimados == (
+                2 * uso.tokens_saida_estimados)
+
+
+def test_leitura_direta_do_usage_sem_estimativas(arquivo_jsonl, monkeypatch) -> None:
+    monkeypatch.setattr(analise_uso_jsonl, "ORJSON_AVAILABLE", False)
+    direto = analisar_uso_jsonl(arquivo_jsonl, processos=1, estimar=False)
+    completo = analisar_uso_jsonl(arquivo_jsonl, processos=1)
+
+    for modelo, uso in completo.por_modelo.items():
+        assert (direto.por_modelo[modelo].requisicoes, direto.por_modelo[modelo].tokens_entrada,
+                direto.por_modelo[modelo].tokens_saida) == (
+            uso.requisicoes, uso.tokens_entrada, uso.tokens_saida)
+    assert direto.por_modelo["gpt-4o"].estimativas_entrada == 0
+    assert direto.erros == completo.erros
+
+
+def test_linha_de_comando(arquivo_jsonl, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(sys, "argv", ["bianca-analise-uso", arquivo_jsonl, "--processos", "1"])
+
+    analise_uso_jsonl.main()
+
+    saida = capsys.readouterr().out
+    assert "gpt-4o-mini" in saida
+    assert "10 linhas, 1 ignoradas, 1 inválidas, 1 com erro" in saida
+    assert "AVISO: Modelos sem preço configurado: modelo-desconhecido" in saida
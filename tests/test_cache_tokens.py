@@ -0,0 +1,54 @@
+"""Testes do cache persistente de contagens de tokens"""
+
+import time
+
+from bianca.cache_tokens import CacheTokens
+from bianca.calcular_tokens import CalculadoraTokens
+
+
+def test_guardar_e_obter_por_codificacao(tmp_path) -> None:
+    cache = CacheTokens(str(tmp_path / "cache.db"))
+
+    cache.guardar_varios({"a": 1, "b": 2}, "cl100k_base")
+
+    assert cache.obter_varios(["b", "x", "a"], "cl100k_base") == [2, None, 1]
+    assert cache.obter("a", "o200k_base") is None
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['acertos'], estatisticas['falhas'], estatisticas['entradas']) == (2, 2, 2)
+    cache.fechar()
+
+
+def test_cache_compartilhado_entre_instancias(tmp_path) -> None:
+    caminho = str(tmp_path / "cache.db")
+    CacheTokens(caminho).guardar("texto", "cl100k_base", 7)
+
+    assert CacheTokens(caminho).obter("texto", "cl100k_base") == 7
+
+
+def test_limite_remove_os_menos_usados(tmp_path) -> None:
+    cache = CacheTokens(str(tmp_path / "cache.db"), max_entradas=10, fracao_remocao=0.2,
+                        verificar_limite_a_cada=10 ** 6, resolucao_acesso=0.0)
+    cache.guardar_varios({f"antigo {i}": i for i in range(6)}, "cl100k_base")
+    time.sleep(0.01)
+    cache.guardar_varios({f"novo {i}": i for i in range(6)}, "cl100k_base")
+    time.sleep(0.01)
+    # Acesso recente protege a entrada antiga
+    cache.obter("antigo 0", "cl100k_base")
+
+    assert cache.aplicar_limite() == 4
+    assert cache.obter("antigo 0", "cl100k_base") == 0
+    assert cache.obter_varios([f"antigo {i}" for i in range(1, 4)], "cl100k_base") == [None] * 3
+    assert cache.estatisticas()['entradas'] == 8
+
+
+def test_calculadora_consulta_o_cache(tmp_path) -> None:
+    cache = CacheTokens(str(tmp_path / "cache.db"))
+    calculadora = CalculadoraTokens(cache=cache)
+
+    tokens = calculadora.contar_tokens("Olá, mundo!", "gpt-4o")
+    assert CalculadoraTokens(cache=cache).contar_tokens("Olá, mundo!", "gpt-4o") == tokens
+    assert calculadora.contar_tokens_lote(["Olá, mundo!", "outro"], "gpt-4o")[0] == tokens
+
+    estatisticas = cache.estatisticas()
+    assert estatisticas['acertos'] == 2
+    assert estatisticas['entradas'] == 2
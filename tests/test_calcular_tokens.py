@@ -0,0 +1,56 @@
+"""Testes da calculadora de tokens e das comparações de custo"""
+
+from bianca.calcular_tokens import CalculadoraTokens
+from bianca.parametros import obter_parametros
+
+MODELOS_AUDIO = {"whisper-1", "gpt-4o-transcribe", "gpt-4o-mini-transcribe"}
+
+
+def test_listagens_separam_modelos_de_texto_e_de_audio() -> None:
+    parametros = obter_parametros()
+
+    assert set(parametros.listar_modelos_audio()) == MODELOS_AUDIO
+    assert not MODELOS_AUDIO & set(parametros.listar_modelos_texto())
+    assert (set(parametros.listar_modelos_texto()) | MODELOS_AUDIO
+            == set(parametros.listar_modelos_disponiveis()))
+
+
+def test_comparacao_ignora_modelos_de_transcricao(capsys) -> None:
+    calculadora = CalculadoraTokens()
+
+    comparacao = calculadora.comparar("Texto de exemplo", ["gpt-4o-mini", "whisper-1"])
+
+    assert list(comparacao.resultados) == ["gpt-4o-mini"]
+    assert "whisper-1" in capsys.readouterr().out
+
+
+def test_comparacao_detalhada_sem_modelos_de_audio(capsys) -> None:
+    CalculadoraTokens().mostrar_comparacao_detalhada("Texto de exemplo")
+    saida = capsys.readouterr().out
+
+    linha_economico = next(linha for linha in saida.splitlines()
+                           if linha.startswith("MODELO MAIS ECONOMICO"))
+    assert not any(modelo in linha_economico for modelo in MODELOS_AUDIO)
+    assert "% mais caro" in saida
+
+
+def test_aquecer_codificadores_usa_apenas_modelos_de_texto() -> None:
+    codificacoes = CalculadoraTokens().aquecer_codificadores()
+
+    assert set(codificacoes) == set(obter_parametros().listar_modelos_texto())
+
+
+def test_custo_audio_por_minuto() -> None:
+    assert CalculadoraTokens().calcular_custo_audio("whisper-1", 90) == 0.006 * 1.5
+
+
+def test_varredura_usa_uma_contagem_por_codificacao() -> None:
+    calculadora = CalculadoraTokens()
+
+    varredura = calculadora.varrer_custos(["um texto", "outro texto maior"],
+                                          ["gpt-4o", "gpt-4o-mini", "whisper-1"], [10, 100])
+
+    assert varredura.modelos == ["gpt-4o", "gpt-4o-mini"]
+    assert varredura.tokens_entrada["gpt-4o"] == varredura.tokens_entrada["gpt-4o-mini"]
+    modelo, _ = varredura.modelo_mais_economico(1, 1)
+    assert modelo == "gpt-4o-mini"
@@ -0,0 +1,75 @@
+"""Testes do registro de codificadores de tokens"""
+
+import threading
+
+import tiktoken
+
+from bianca.calcular_tokens import CalculadoraTokens
+from bianca.codificadores import CODIFICACAO_PADRAO, RegistroCodificadores
+
+
+def test_resolve_codificacao_do_modelo() -> None:
+    registro = RegistroCodificadores()
+
+    assert registro.obter_nome_codificacao("gpt-4o") == "o200k_base"
+    assert registro.obter_nome_codificacao("gpt-4") == "cl100k_base"
+
+
+def test_modelo_desconhecido_usa_codificacao_padrao() -> None:
+    registro = RegistroCodificadores()
+
+    assert registro.obter_nome_codificacao("modelo-inexistente") == CODIFICACAO_PADRAO
+
+
+def test_codificador_compartilhado_entre_modelos_da_mesma_codificacao() -> None:
+    registro = RegistroCodificadores()
+
+    assert registro.obter_codificador("gpt-4o") is registro.obter_codificador("gpt-4o-mini")
+    assert registro.estatisticas()["codificacoes_carregadas"] == ["o200k_base"]
+
+
+def test_estatisticas_contam_acertos_e_falhas() -> None:
+    registro = RegistroCodificadores()
+
+    for _ in range(3):
+        registro.obter_codificador("gpt-4")
+    estatisticas = registro.estatisticas()
+
+    assert estatisticas["falhas"] == 1
+    assert estatisticas["acertos"] == 2
+    assert estatisticas["taxa_acerto"] == 2 / 3
+
+    registro.limpar()
+    assert registro.estatisticas()["modelos_resolvidos"] == 0
+
+
+def test_carregamento_concorrente_cria_um_codificador() -> None:
+    registro = RegistroCodificadores()
+    obtidos = []
+
+    def obter() -> None:
+        obtidos.append(registro.obter_codificador("gpt-4o"))
+
+    threads = [threading.Thread(target=obter) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(codificador) for codificador in obtidos}) == 1
+
+
+def test_aquecer_retorna_codificacoes() -> None:
+    registro = RegistroCodificadores()
+
+    codificacoes = registro.aquecer(["gpt-4o", "gpt-4"])
+
+    assert codificacoes == {"gpt-4o": "o200k_base", "gpt-4": "cl100k_base"}
+    assert registro.estatisticas()["codificacoes_carregadas"] == ["cl100k_base", "o200k_base"]
+
+
+def test_contagem_igual_a_do_tiktoken() -> None:
+    texto = "A contagem de tokens não deve mudar com o registro."
+
+    assert (CalculadoraTokens().contar_tokens(texto, "gpt-4o")
+            == len(tiktoken.get_encoding("o200k_base").encode(texto)))
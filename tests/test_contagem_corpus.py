@@ -0,0 +1,80 @@
+"""Testes da contagem de tokens de corpus com múltiplos processos"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bianca import contagem_corpus
+from bianca.calcular_tokens import CalculadoraTokens
+from bianca.contagem_corpus import ContadorCorpus
+
+TEXTOS = [f"texto numero {i} " * (i % 7 + 1) for i in range(50)]
+
+
+def test_modelo_desconhecido() -> None:
+    with pytest.raises(ValueError):
+        ContadorCorpus(["modelo-inexistente"])
+
+
+def test_um_processo_conta_e_calcula_custos() -> None:
+    calculadora = CalculadoraTokens()
+    contador = ContadorCorpus(["gpt-4o", "gpt-4o-mini"], tokens_resposta=10,
+                              processos=1, tamanho_fragmento=8)
+
+    resultado = contador.processar(iter(TEXTOS), manter_contagens=True)
+
+    esperadas = [calculadora.contar_tokens(texto, "gpt-4o") for texto in TEXTOS]
+    assert resultado.total_itens == len(TEXTOS)
+    assert list(resultado.contagens_por_modelo["gpt-4o"]) == esperadas
+    # Mesma codificação: os dois modelos compartilham a contagem
+    assert resultado.contagens_por_modelo["gpt-4o-mini"] is resultado.contagens_por_modelo["gpt-4o"]
+    totais = resultado.totais_por_modelo["gpt-4o-mini"]
+    assert totais["tokens_entrada"] == sum(esperadas)
+    assert totais["tokens_saida"] == 10 * len(TEXTOS)
+    assert resultado.custo_total()["gpt-4o-mini"] == pytest.approx(
+        calculadora.calcular_custo("gpt-4o-mini", sum(esperadas), 10 * len(TEXTOS)))
+
+
+def test_pool_mantem_a_ordem_dos_itens() -> None:
+    sequencial = ContadorCorpus(["gpt-4o"], processos=1, tamanho_fragmento=4)
+    paralelo = ContadorCorpus(["gpt-4o"], processos=2, tamanho_fragmento=4)
+
+    esperado = sequencial.processar(TEXTOS, manter_contagens=True)
+    resultado = paralelo.processar(TEXTOS, manter_contagens=True)
+
+    assert resultado.contagens_por_modelo == esperado.contagens_por_modelo
+    assert resultado.totais_por_modelo == esperado.totais_por_modelo
+
+
+def test_fragmento_lento_limita_os_fragmentos_lidos(monkeypatch) -> None:
+    liberado = threading.Event()
+    original = contagem_corpus._processar_fragmento
+
+    def processar(textos, modelos, manter_contagens):
+        if textos == ["lento"]:
+            time.sleep(0.3)
+            liberado.set()
+        return original(textos, modelos, manter_contagens)
+
+    lidos_antes = []
+
+    def textos():
+        yield "lento"
+        for i in range(40):
+            if not liberado.is_set():
+                lidos_antes.append(i)
+            yield f"texto {i}"
+
+    # Threads no lugar de processos para observar a leitura do corpus
+    monkeypatch.setattr(contagem_corpus, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(contagem_corpus, "_processar_fragmento", processar)
+    contador = ContadorCorpus(["gpt-4o"], processos=2, tamanho_fragmento=1)
+
+    resultado = contador.processar(textos(), manter_contagens=True)
+
+    assert resultado.total_itens == 41
+    # Enquanto o primeiro fragmento não termina, no máximo 2 * processos
+    # fragmentos ficam em memória
+    assert len(lidos_antes) <= 2 * contador.processos
@@ -0,0 +1,57 @@
+"""Testes da contagem de tokens em blocos, com memória limitada"""
+
+import io
+
+import pytest
+
+from bianca.calcular_tokens import CalculadoraTokens
+from bianca.contagem_fluxo import abrir_blocos, dividir_em_limites_seguros
+
+TEXTO = ("Relatório de atendimento.\nO cliente pediu a segunda via; ação tomada: reenvio.\n"
+         "  Linha recuada com números 12345 e símbolos ./-\r\n") * 40
+
+
+@pytest.mark.parametrize("modelo", ["gpt-4o", "gpt-4"])
+@pytest.mark.parametrize("tamanho_bloco", [1, 17, 256])
+def test_fluxo_conta_o_mesmo_que_o_texto_completo(modelo, tamanho_bloco) -> None:
+    calculadora = CalculadoraTokens()
+    # open(..., "r") traduz \r\n; a contagem direta usa o texto já traduzido
+    esperado = calculadora.contar_tokens(TEXTO.replace("\r\n", "\n"), modelo)
+    binario = io.BytesIO(TEXTO.encode("utf-8"))
+
+    assert calculadora.contar_tokens_fluxo(binario, modelo,
+                                           tamanho_bloco=tamanho_bloco) == esperado
+
+
+def test_arquivo_cortado_no_meio_de_caracteres(tmp_path) -> None:
+    calculadora = CalculadoraTokens()
+    caminho = tmp_path / "texto.txt"
+    caminho.write_bytes(TEXTO.encode("utf-8"))
+
+    total = calculadora.contar_tokens_arquivo(str(caminho), "gpt-4o", tamanho_bloco=3)
+
+    assert total == calculadora.contar_tokens(TEXTO.replace("\r\n", "\n"), "gpt-4o")
+
+
+def test_trechos_reconstroem_o_texto() -> None:
+    blocos = [TEXTO[inicio:inicio + 10] for inicio in range(0, len(TEXTO), 10)]
+
+    trechos = list(dividir_em_limites_seguros(blocos))
+
+    assert "".join(trechos) == TEXTO
+    assert len(trechos) > 1
+    assert "".join(abrir_blocos(io.StringIO(TEXTO), tamanho_bloco=7)) == TEXTO
+
+
+def test_arquivo_vazio_e_inexistente(tmp_path) -> None:
+    calculadora = CalculadoraTokens()
+    vazio = tmp_path / "vazio.txt"
+    vazio.write_bytes(b"")
+
+    assert calculadora.contar_tokens_arquivo(str(vazio), "gpt-4o") == 0
+    with pytest.raises(FileNotFoundError, match="ausente.txt"):
+        calculadora.contar_tokens_arquivo(str(tmp_path / "ausente.txt"), "gpt-4o")
+    invalido = tmp_path / "invalido.txt"
+    invalido.write_bytes(b"texto \xff")
+    with pytest.raises(UnicodeDecodeError, match="invalido.txt"):
+        calculadora.contar_tokens_arquivo(str(invalido), "gpt-4o")
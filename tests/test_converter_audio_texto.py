@@ -0,0 +1,104 @@
+"""Testes da conversão de áudio para texto em trechos paralelos"""
+
+import math
+import struct
+import time
+import wave
+
+import pytest
+
+from bianca import converter_audio_texto
+from bianca.converter_audio_texto import (ConversorAudioTexto, calcular_energias,
+                                          dividir_wav, encontrar_silencios)
+
+TAXA = 8000
+
+
+def _gravar_wav(caminho, partes) -> None:
+    """Grava um WAV mono de 16 bits; partes = [(segundos, amplitude)]"""
+    amostras = []
+    for segundos, amplitude in partes:
+        for i in range(int(segundos * TAXA)):
+            amostras.append(int(amplitude * 32767 * math.sin(2 * math.pi * 440 * i / TAXA)))
+    with wave.open(str(caminho), 'wb') as arquivo:
+        arquivo.setnchannels(1)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(TAXA)
+        arquivo.writeframes(struct.pack(f'<{len(amostras)}h', *amostras))
+
+
+@pytest.fixture
+def audio_com_pausas(tmp_path):
+    """7 segundos: três falas de 2 s separadas por silêncios de 0,5 s"""
+    caminho = tmp_path / "audio.wav"
+    _gravar_wav(caminho, [(2, 0.5), (0.5, 0), (2, 0.5), (0.5, 0), (2, 0.5)])
+    return str(caminho)
+
+
+def test_encontrar_silencios() -> None:
+    energias = [0.5, 0.0, 0.0, 0.0, 0.5, 0.0, 0.5]
+
+    assert encontrar_silencios(energias, 0.1, janelas_minimas=2) == [2]
+
+
+def test_energias_sem_numpy_aproximam_as_com_numpy(audio_com_pausas, monkeypatch) -> None:
+    if not converter_audio_texto.NUMPY_AVAILABLE:
+        pytest.skip("NumPy não instalado")
+    com_numpy, quadros = calcular_energias(audio_com_pausas)
+    monkeypatch.setattr(converter_audio_texto, "NUMPY_AVAILABLE", False)
+    sem_numpy, _ = calcular_energias(audio_com_pausas)
+
+    assert quadros == TAXA // 20
+    assert sem_numpy == pytest.approx(com_numpy, abs=0.02)
+
+
+def test_dividir_wav_corta_nos_silencios(audio_com_pausas) -> None:
+    trechos = dividir_wav(audio_com_pausas, duracao_maxima=3.0)
+
+    assert [(round(t.inicio, 2), round(t.fim, 2)) for t in trechos] == [
+        (0.0, 2.25), (2.25, 4.75), (4.75, 7.0)]
+    assert sum(trecho.total_quadros for trecho in trechos) == 7 * TAXA
+
+
+def test_dividir_wav_sem_silencio_corta_no_limite(tmp_path) -> None:
+    caminho = tmp_path / "continuo.wav"
+    _gravar_wav(caminho, [(5, 0.5)])
+
+    trechos = dividir_wav(str(caminho), duracao_maxima=2.0)
+
+    assert [trecho.total_quadros for trecho in trechos] == [2 * TAXA, 2 * TAXA, TAXA]
+
+
+def test_transcrever_trechos_em_paralelo(audio_com_pausas, servidor_openai) -> None:
+    servidor_openai.atraso = 0.1
+    conversor = ConversorAudioTexto(base_url=servidor_openai.url, max_paralelo=2,
+                                    duracao_maxima_trecho=3.0)
+
+    resultado = conversor.transcrever(audio_com_pausas)
+
+    assert resultado.texto == ("transcricao audio_0000.wav transcricao audio_0001.wav "
+                               "transcricao audio_0002.wav")
+    assert resultado.trechos == 3
+    assert resultado.duracao == pytest.approx(7.0)
+    assert [segmento.indice for segmento in resultado.segmentos] == [0, 1, 2]
+    assert servidor_openai.maximo_simultaneo == 2
+
+
+def test_interromper_fluxo_cancela_trechos_pendentes(audio_com_pausas,
+                                                     servidor_openai) -> None:
+    servidor_openai.atraso = 0.1
+    conversor = ConversorAudioTexto(base_url=servidor_openai.url, max_paralelo=1,
+                                    duracao_maxima_trecho=3.0)
+
+    for _ in conversor.transcrever_fluxo(audio_com_pausas):
+        break
+    time.sleep(0.3)
+
+    # O segundo trecho pode ter começado antes da interrupção; o terceiro não
+    assert len(servidor_openai.pedidos) <= 2
+
+
+def test_estimar_custo_pela_duracao(audio_com_pausas) -> None:
+    conversor = ConversorAudioTexto()
+
+    assert conversor.estimar_custo(audio_com_pausas) == pytest.approx(7 / 60 * 0.006)
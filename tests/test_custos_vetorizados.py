@@ -0,0 +1,61 @@
+"""Testes do cálculo vetorizado de custos"""
+
+import pytest
+
+from bianca import custos_vetorizados
+from bianca.calcular_tokens import CalculadoraTokens
+from bianca.custos_vetorizados import TabelaPrecos, converter_preco_inteiro
+
+MODELOS = ["gpt-4o", "gpt-4o-mini", "gpt-4o", "gpt-4o-2024-08-06"]
+ENTRADA = [1200, 800, 10, 1_000_000]
+SAIDA = [300, 150, 0, 2000]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "puro"])
+def tabela(request, monkeypatch):
+    if request.param and not custos_vetorizados.NUMPY_AVAILABLE:
+        pytest.skip("NumPy não instalado")
+    monkeypatch.setattr(custos_vetorizados, "NUMPY_AVAILABLE", request.param)
+    return TabelaPrecos()
+
+
+def test_converter_preco_inteiro() -> None:
+    assert converter_preco_inteiro(0.0025) == 2_500_000
+    assert converter_preco_inteiro(0.00015) == 150_000
+    with pytest.raises(ValueError):
+        converter_preco_inteiro(1e-12)
+
+
+def test_custos_por_linha_iguais_aos_da_calculadora(tabela) -> None:
+    calculadora = CalculadoraTokens()
+    esperados = [calculadora.calcular_custo(modelo, entrada, saida)
+                 for modelo, entrada, saida in zip(MODELOS, ENTRADA, SAIDA)]
+
+    custos = tabela.calcular_custos(MODELOS, ENTRADA, SAIDA)
+    indices = [tabela.indice(modelo) for modelo in MODELOS]
+
+    assert list(custos) == pytest.approx(esperados)
+    assert list(tabela.calcular_custos(indices, ENTRADA, SAIDA)) == pytest.approx(esperados)
+    assert [int(custo) for custo in tabela.calcular_custos_microdolares(
+        MODELOS, ENTRADA, SAIDA)] == [round(custo * 1e6) for custo in esperados]
+
+
+def test_totais_por_modelo_exatos(tabela) -> None:
+    totais = tabela.totalizar(MODELOS, ENTRADA, SAIDA)
+
+    assert set(totais) == {"gpt-4o", "gpt-4o-mini"}
+    gpt_4o = totais["gpt-4o"]
+    assert (gpt_4o["linhas"], gpt_4o["tokens_entrada"], gpt_4o["tokens_saida"]) == (
+        3, 1_001_210, 2300)
+    precos = tabela.precos_entrada[tabela.indice("gpt-4o")], tabela.precos_saida[
+        tabela.indice("gpt-4o")]
+    assert gpt_4o["custo_microdolares"] == round(
+        (1_001_210 * precos[0] + 2300 * precos[1]) / 10 ** 6)
+
+
+def test_modelo_desconhecido(tabela) -> None:
+    with pytest.raises(ValueError):
+        tabela.calcular_custos(["modelo-inexistente"], [1], [1])
+    if custos_vetorizados.NUMPY_AVAILABLE:
+        with pytest.raises(ValueError):
+            tabela.calcular_custos([len(tabela.nomes)], [1], [1])
@@ -0,0 +1,69 @@
+"""Testes da distribuição de pedidos entre vários modelos"""
+
+import asyncio
+
+import openai
+import pytest
+
+from bianca.distribuicao_modelos import DistribuidorModelos
+
+MODELOS = ["gpt-4o-mini", "gpt-4o"]
+
+
+def test_modelo_desconhecido() -> None:
+    with pytest.raises(ValueError):
+        DistribuidorModelos(["modelo-inexistente"])
+
+
+def test_todas_respostas_na_ordem_com_custo(servidor_openai) -> None:
+    with DistribuidorModelos(MODELOS, base_url=servidor_openai.url) as distribuidor:
+        respostas = distribuidor.todas_respostas("oi")
+
+    assert [resposta.modelo for resposta in respostas] == MODELOS
+    for resposta in respostas:
+        assert resposta.sucesso
+        assert resposta.texto == "resposta oi"
+        assert (resposta.tokens_entrada, resposta.tokens_saida) == (10, 5)
+        assert resposta.custo == distribuidor.calculadora.calcular_custo(resposta.modelo, 10, 5)
+    assert distribuidor._executor is None
+
+
+def test_primeira_resposta_aceitavel(servidor_openai) -> None:
+    with DistribuidorModelos(MODELOS, base_url=servidor_openai.url) as distribuidor:
+        vencedora = distribuidor.primeira_resposta("oi")
+
+    assert vencedora.sucesso
+    assert vencedora.modelo in MODELOS
+
+
+def test_nenhuma_resposta_aceitavel_encadeia_o_erro(servidor_openai) -> None:
+    with DistribuidorModelos(MODELOS, base_url=servidor_openai.url) as distribuidor:
+        with pytest.raises(RuntimeError) as excinfo:
+            distribuidor.primeira_resposta("FALHA")
+
+    assert isinstance(excinfo.value.__cause__, openai.BadRequestError)
+
+
+def test_criterio_de_aceitacao_rejeita_todas(servidor_openai) -> None:
+    with DistribuidorModelos(MODELOS, base_url=servidor_openai.url) as distribuidor:
+        with pytest.raises(RuntimeError) as excinfo:
+            distribuidor.primeira_resposta("oi", aceitar=lambda resposta: False)
+
+    assert excinfo.value.__cause__ is None
+
+
+def test_versoes_assincronas(servidor_openai) -> None:
+    distribuidor = DistribuidorModelos(MODELOS, base_url=servidor_openai.url)
+
+    async def executar() -> None:
+        respostas = await distribuidor.todas_respostas_assincronas("oi")
+        assert [resposta.modelo for resposta in respostas] == MODELOS
+
+        vencedora = await distribuidor.primeira_resposta_assincrona("oi")
+        assert vencedora.sucesso
+
+        with pytest.raises(RuntimeError):
+            await distribuidor.primeira_resposta_assincrona("FALHA")
+        await distribuidor.modelo_assincrono.pool.fechar_assincronos()
+
+    asyncio.run(executar())
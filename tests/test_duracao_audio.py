@@ -0,0 +1,154 @@
+"""Testes da medição de duração de áudio pelos cabeçalhos"""
+
+import struct
+import wave
+
+import pytest
+
+from bianca.calcular_tokens import CalculadoraTokens
+from bianca.duracao_audio import (METODO_CABECALHO, METODO_VARREDURA, identificar_formato,
+                                  medir_duracao, sondar_audio, sondar_diretorio_audio)
+
+# MPEG-1 camada III, 44,1 kHz, estéreo: 128 kbps (quadro de 417 bytes) e 160 kbps (522)
+QUADRO_128 = b'\xff\xfb\x90\x00' + bytes(413)
+QUADRO_160 = b'\xff\xfb\xa0\x00' + bytes(518)
+
+
+def _gravar(caminho, dados: bytes) -> str:
+    caminho.write_bytes(dados)
+    return str(caminho)
+
+
+def _gravar_wav(caminho, segundos: float, taxa: int = 8000) -> str:
+    with wave.open(str(caminho), 'wb') as arquivo:
+        arquivo.setnchannels(1)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(taxa)
+        arquivo.writeframes(bytes(int(segundos * taxa) * 2))
+    return str(caminho)
+
+
+def _caixa(tipo: bytes, conteudo: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(conteudo), tipo) + conteudo
+
+
+def _pagina_ogg(granulo: int, pacote: bytes, serie: int = 7) -> bytes:
+    return (b'OggS' + bytes(2) + struct.pack('<qIII', granulo, serie, 0, 0)
+            + bytes([1, len(pacote)]) + pacote)
+
+
+def test_wav_pelos_blocos(tmp_path) -> None:
+    info = sondar_audio(_gravar_wav(tmp_path / "a.wav", 2.5))
+
+    assert (info.formato, info.duracao, info.metodo) == ('wav', 2.5, METODO_CABECALHO)
+
+
+def test_wav_interrompido_usa_o_tamanho_do_arquivo(tmp_path) -> None:
+    caminho = _gravar_wav(tmp_path / "a.wav", 2.0)
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read()
+
+    info = sondar_audio(_gravar(tmp_path / "b.wav", dados[:44 + 8000]))
+
+    assert (info.duracao, info.metodo) == (0.5, METODO_VARREDURA)
+
+
+def test_mp3_cbr_com_id3(tmp_path) -> None:
+    id3 = b'ID3\x03\x00\x00' + bytes([0, 0, 0, 20]) + bytes(20)
+    info = sondar_audio(_gravar(tmp_path / "a.mp3", id3 + QUADRO_128 * 100))
+
+    assert info.formato == 'mp3'
+    assert info.duracao == pytest.approx(100 * 417 * 8 / 128000)
+    assert info.metodo == METODO_CABECALHO
+
+
+def test_mp3_xing_informa_os_quadros(tmp_path) -> None:
+    xing = bytearray(QUADRO_128)
+    xing[36:48] = b'Xing' + struct.pack('>II', 1, 1000)
+
+    info = sondar_audio(_gravar(tmp_path / "a.mp3", bytes(xing) + QUADRO_128 * 3))
+
+    assert info.duracao == pytest.approx(1000 * 1152 / 44100)
+    assert info.metodo == METODO_CABECALHO
+
+
+def test_mp3_vbr_sem_indice_percorre_os_quadros(tmp_path) -> None:
+    caminho = _gravar(tmp_path / "a.mp3", (QUADRO_128 + QUADRO_160) * 10)
+
+    varrido = sondar_audio(caminho)
+    estimado = sondar_audio(caminho, varredura=False)
+
+    assert varrido.duracao == pytest.approx(20 * 1152 / 44100)
+    assert varrido.metodo == METODO_VARREDURA
+    assert estimado.metodo == METODO_CABECALHO
+
+
+def test_m4a_pela_caixa_mvhd(tmp_path) -> None:
+    mvhd = _caixa(b'mvhd', bytes(4) + struct.pack('>IIII', 0, 0, 1000, 3500))
+    dados = _caixa(b'ftyp', b'M4A \x00\x00\x00\x00') + _caixa(b'moov', mvhd)
+
+    info = sondar_audio(_gravar(tmp_path / "a.m4a", dados))
+
+    assert (info.formato, info.duracao, info.metodo) == ('m4a', 3.5, METODO_CABECALHO)
+
+
+def test_m4a_sem_duracao_no_mvhd_usa_as_faixas(tmp_path) -> None:
+    mvhd = _caixa(b'mvhd', bytes(4) + struct.pack('>IIII', 0, 0, 1000, 0))
+    faixas = b''.join(
+        _caixa(b'trak', _caixa(b'mdia', _caixa(b'mdhd', bytes(4) + struct.pack(
+            '>IIII', 0, 0, 44100, duracao))))
+        for duracao in (44100, 88200))
+    dados = _caixa(b'ftyp', b'M4A \x00\x00\x00\x00') + _caixa(b'moov', mvhd + faixas)
+
+    info = sondar_audio(_gravar(tmp_path / "a.m4a", dados))
+
+    assert (info.duracao, info.metodo) == (2.0, METODO_VARREDURA)
+
+
+def test_ogg_opus_desconta_o_pre_salto(tmp_path) -> None:
+    cabecalho = b'OpusHead' + bytes([1, 2]) + struct.pack('<HIhB', 312, 48000, 0, 0)
+    dados = (_pagina_ogg(0, cabecalho) + _pagina_ogg(48000, bytes(10))
+             + _pagina_ogg(5 * 48000 + 312, bytes(10)) + _pagina_ogg(9 * 48000, bytes(10), serie=8))
+
+    info = sondar_audio(_gravar(tmp_path / "a.opus", dados))
+
+    assert (info.formato, info.duracao) == ('ogg', 5.0)
+
+
+def test_ogg_vorbis(tmp_path) -> None:
+    cabecalho = b'\x01vorbis' + struct.pack('<IBI', 0, 2, 44100) + bytes(15)
+    dados = _pagina_ogg(0, cabecalho) + _pagina_ogg(2 * 44100, bytes(10))
+
+    assert medir_duracao(_gravar(tmp_path / "a.ogg", dados)) == 2.0
+
+
+def test_formato_desconhecido_fica_no_erro(tmp_path) -> None:
+    caminho = _gravar(tmp_path / "a.txt", b'texto qualquer')
+
+    info = sondar_audio(caminho)
+
+    assert not info.sucesso and info.erro
+    with pytest.raises(ValueError):
+        medir_duracao(caminho)
+
+
+def test_identificar_formato_pela_extensao() -> None:
+    assert identificar_formato(bytes(12), 'gravacao.OGA') == 'ogg'
+    assert identificar_formato(bytes(12), 'gravacao.flac') is None
+
+
+def test_sondar_diretorio_soma_duracoes_e_custos(tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+    _gravar_wav(tmp_path / "a.wav", 30.0)
+    _gravar_wav(tmp_path / "sub" / "b.wav", 90.0)
+    _gravar(tmp_path / "quebrado.mp3", bytes(100))
+    _gravar(tmp_path / "notas.txt", b'ignorado')
+
+    resultado = sondar_diretorio_audio(str(tmp_path), modelo='whisper-1', max_threads=2)
+
+    assert [info.caminho for info in resultado.arquivos] == [
+        str(tmp_path / "a.wav"), str(tmp_path / "quebrado.mp3"), str(tmp_path / "sub" / "b.wav")]
+    assert resultado.duracao_total == 120.0
+    assert resultado.custo_total == pytest.approx(
+        CalculadoraTokens().calcular_custo_audio('whisper-1', 120.0))
+    assert [info.caminho for info in resultado.falhas] == [str(tmp_path / "quebrado.mp3")]
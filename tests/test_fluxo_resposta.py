@@ -0,0 +1,118 @@
+"""Testes das respostas em fluxo com contabilidade de tokens e custos"""
+
+import asyncio
+
+import openai
+import pytest
+
+from bianca.agendador import AgendadorRequisicoes, LimitesModelo
+from bianca.fluxo_resposta import MOTIVO_CUSTO, MOTIVO_TOKENS
+from bianca.modelo import ModeloIA
+from bianca.modelo_assincrono import ModeloIAAssincrono
+from bianca.parametros import obter_parametros
+
+MODELO = "gpt-4o-mini"
+
+
+def _modelo(servidor_openai, **opcoes) -> ModeloIA:
+    return ModeloIA(MODELO, obter_parametros(), base_url=servidor_openai.url, **opcoes)
+
+
+def test_fluxo_completo_usa_o_uso_informado(servidor_openai) -> None:
+    servidor_openai.pedacos = 5
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=600)})
+
+    fluxo = _modelo(servidor_openai, agendador=agendador).completar_fluxo("oi", max_tokens=50)
+    texto = fluxo.consumir()
+
+    assert texto == " palavra" * 5
+    estatisticas = fluxo.estatisticas
+    assert estatisticas.uso_informado
+    assert (estatisticas.tokens_entrada, estatisticas.tokens_saida) == (10, 20)
+    assert not estatisticas.interrompido
+    assert estatisticas.tempo_primeiro_token is not None
+    # A reserva foi conciliada com o total informado (30 tokens)
+    assert agendador.estatisticas()[MODELO]["tokens_disponiveis"] == pytest.approx(70, abs=3)
+
+
+def test_teto_fecha_o_fluxo_antes_de_entregar_o_pedaco(servidor_openai) -> None:
+    fluxo = _modelo(servidor_openai).completar_fluxo("oi", tokens_maximos=1)
+
+    iterador = iter(fluxo)
+    primeiro = next(iterador)
+
+    # O chamador ainda não pediu o próximo pedaço, mas a conexão já foi fechada
+    assert primeiro == " palavra"
+    assert fluxo.estatisticas.interrompido
+    assert fluxo.estatisticas.motivo_interrupcao == MOTIVO_TOKENS
+    assert fluxo.resposta.response.is_closed
+    assert list(iterador) == []
+
+
+def test_fluxo_interrompido_sem_uso_concilia_a_estimativa(servidor_openai) -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=600)})
+
+    fluxo = _modelo(servidor_openai, agendador=agendador).completar_fluxo(
+        "oi", max_tokens=50, tokens_maximos=1)
+    fluxo.consumir()
+
+    estatisticas = fluxo.estatisticas
+    assert estatisticas.motivo_interrupcao == MOTIVO_TOKENS
+    assert not estatisticas.uso_informado
+    # A reserva (entrada + 50) foi trocada pelos tokens contados no fluxo
+    assert agendador.estatisticas()[MODELO]["tokens_disponiveis"] == pytest.approx(
+        100 - estatisticas.tokens_entrada - estatisticas.tokens_saida, abs=2)
+
+
+def test_teto_de_custo_interrompe(servidor_openai) -> None:
+    fluxo = _modelo(servidor_openai).completar_fluxo("oi", custo_maximo=1e-9)
+
+    assert fluxo.consumir() == " palavra"
+    assert fluxo.estatisticas.motivo_interrupcao == MOTIVO_CUSTO
+
+
+def test_abandonar_a_iteracao_fecha_a_conexao(servidor_openai) -> None:
+    fluxo = _modelo(servidor_openai).completar_fluxo("oi")
+
+    for _ in fluxo:
+        break
+
+    assert fluxo.resposta.response.is_closed
+    assert fluxo.finalizado
+
+
+def test_falha_ao_abrir_fluxo_cobra_so_a_entrada(servidor_openai) -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=600)})
+    tokens_entrada = agendador.contar_entrada(MODELO, [{"role": "user", "content": "FALHA"}])
+
+    with pytest.raises(openai.BadRequestError):
+        _modelo(servidor_openai, agendador=agendador).completar_fluxo("FALHA", max_tokens=50)
+
+    assert agendador.estatisticas()[MODELO]["tokens_disponiveis"] == pytest.approx(
+        100 - tokens_entrada, abs=2)
+
+
+def test_fluxo_assincrono_teto_e_falha(servidor_openai) -> None:
+    agendador = AgendadorRequisicoes({MODELO: LimitesModelo(tokens_por_minuto=600)})
+    modelo = ModeloIAAssincrono(MODELO, base_url=servidor_openai.url, agendador=agendador)
+    tokens_entrada = agendador.contar_entrada(MODELO, [{"role": "user", "content": "FALHA"}])
+
+    async def executar() -> None:
+        with pytest.raises(openai.BadRequestError):
+            await modelo.completar_fluxo("FALHA", max_tokens=50)
+        assert agendador.estatisticas()[MODELO]["tokens_disponiveis"] == pytest.approx(
+            100 - tokens_entrada, abs=2)
+
+        fluxo = await modelo.completar_fluxo("oi", max_tokens=50, tokens_maximos=1)
+        iterador = fluxo.__aiter__()
+        assert await iterador.__anext__() == " palavra"
+        assert fluxo.estatisticas.motivo_interrupcao == MOTIVO_TOKENS
+        assert fluxo.resposta.response.is_closed
+        await iterador.aclose()
+        estatisticas = fluxo.estatisticas
+        assert agendador.estatisticas()[MODELO]["tokens_disponiveis"] == pytest.approx(
+            100 - tokens_entrada - estatisticas.tokens_entrada - estatisticas.tokens_saida,
+            abs=3)
+        await modelo.pool.fechar_assincronos()
+
+    asyncio.run(executar())
@@ -0,0 +1,119 @@
+"""Testes do histórico de uso em segmentos binários"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from bianca import historico_uso
+from bianca.historico_uso import TIPO_ESTIMATIVA, HistoricoUso, contexto_uso
+
+DIA = datetime(2024, 3, 4, 12, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def historico(tmp_path):
+    with HistoricoUso(str(tmp_path), registros_por_segmento=4) as historico:
+        yield historico
+
+
+def _preencher(historico: HistoricoUso) -> None:
+    historico.registrar("gpt-4o-mini", 100, 10, 0.5, projeto="a", instante=DIA)
+    historico.registrar("gpt-4o-mini", 200, 20, 1.0, projeto="b", instante=DIA + 86400)
+    historico.registrar("gpt-4o", 300, 30, 2.0, projeto="a", instante=DIA)
+    with contexto_uso(projeto="b", usuario="ana"):
+        historico.registrar_estimativa("gpt-4o", 50, 5, 0.25, instante=DIA)
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_agregar_por_modelo_e_dia(historico, monkeypatch, numpy) -> None:
+    if numpy and not historico_uso.NUMPY_AVAILABLE:
+        pytest.skip("NumPy não instalado")
+    monkeypatch.setattr(historico_uso, "NUMPY_AVAILABLE", numpy)
+    _preencher(historico)
+
+    grupos = historico.agregar(por=("modelo", "dia"))
+
+    assert {chave: (t.requisicoes, t.tokens_entrada, t.tokens_saida, t.custo)
+            for chave, t in grupos.items()} == {
+        ("gpt-4o-mini", "2024-03-04"): (1, 100, 10, 0.5),
+        ("gpt-4o-mini", "2024-03-05"): (1, 200, 20, 1.0),
+        ("gpt-4o", "2024-03-04"): (2, 350, 35, 2.25)}
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_agregar_sem_dimensoes_soma_tudo(historico, monkeypatch, numpy) -> None:
+    if numpy and not historico_uso.NUMPY_AVAILABLE:
+        pytest.skip("NumPy não instalado")
+    monkeypatch.setattr(historico_uso, "NUMPY_AVAILABLE", numpy)
+    _preencher(historico)
+    # Quinto registro: os totais juntam dois segmentos
+    historico.registrar("gpt-4o", 1, 1, 0.25, instante=DIA)
+
+    grupos = historico.agregar(por=())
+
+    assert list(grupos) == [()]
+    totais = grupos[()]
+    assert (totais.requisicoes, totais.tokens_entrada, totais.tokens_saida) == (5, 651, 66)
+    assert totais.custo == pytest.approx(4.0)
+    assert historico.agregar(por=(), modelo="inexistente") == {}
+
+
+def test_filtros_e_contexto(historico) -> None:
+    _preencher(historico)
+
+    assert list(historico.agregar(por=("usuario",), projeto="b", tipo=TIPO_ESTIMATIVA)) == [
+        ("ana",)]
+    assert historico.agregar(por=("projeto",), fim=DIA + 1)[("a",)].requisicoes == 2
+    assert historico.agregar(modelo="inexistente") == {}
+    with pytest.raises(ValueError):
+        historico.agregar(por=("cor",))
+
+
+def test_segmentos_trocados_quando_enchem(historico) -> None:
+    for _ in range(10):
+        historico.registrar("gpt-4o-mini", 1, 1, 0.1)
+
+    assert len(historico.listar_segmentos()) == 3
+    assert len(historico) == 10
+    assert historico.agregar()[("gpt-4o-mini",)].requisicoes == 10
+
+
+def test_segundo_escritor_recusado(historico) -> None:
+    if not historico_uso.FCNTL_AVAILABLE:
+        pytest.skip("Trava entre processos indisponível")
+    with pytest.raises(ValueError, match="somente_leitura"):
+        HistoricoUso(historico.diretorio)
+
+    historico.fechar()
+    HistoricoUso(historico.diretorio).fechar()
+
+
+def test_leitor_ve_registros_e_nomes_do_escritor(historico) -> None:
+    historico.registrar("gpt-4o-mini", 1, 1, 0.1)
+    leitor = HistoricoUso(historico.diretorio, somente_leitura=True)
+
+    # O quinto registro já vai para um segmento novo
+    for _ in range(4):
+        historico.registrar("gpt-4o", 2, 2, 0.2, projeto="novo")
+
+    # "novo" e "gpt-4o" não existiam quando o leitor carregou nomes.json
+    totais = leitor.agregar(projeto="novo")[("gpt-4o",)]
+    assert (totais.requisicoes, totais.tokens_entrada, totais.custo) == (4, 8, pytest.approx(0.8))
+    assert len(leitor) == 5
+    with pytest.raises(ValueError, match="leitura"):
+        leitor.registrar("gpt-4o", 1, 1, 0.1)
+    leitor.fechar()
+
+
+def test_leitor_nao_cria_nem_troca_segmentos(tmp_path) -> None:
+    with HistoricoUso(str(tmp_path), registros_por_segmento=2) as escritor:
+        escritor.registrar("gpt-4o-mini", 1, 1, 0.1)
+        escritor.registrar("gpt-4o-mini", 1, 1, 0.1)
+        # Segmento cheio: só o escritor abre o próximo
+        leitor = HistoricoUso(str(tmp_path), somente_leitura=True)
+        assert len(escritor.listar_segmentos()) == 1
+        assert len(leitor) == 2
+
+    ausente = HistoricoUso(str(tmp_path / "ausente"), somente_leitura=True)
+    assert ausente.agregar() == {}
+    assert not (tmp_path / "ausente").exists()
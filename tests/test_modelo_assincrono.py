@@ -0,0 +1,47 @@
+"""Testes do modelo de IA assíncrono"""
+
+import asyncio
+
+from bianca.modelo_assincrono import ModeloIAAssincrono
+
+MODELO = "gpt-4o-mini"
+
+
+def test_concorrencia_limitada_por_modelo(servidor_openai) -> None:
+    servidor_openai.atraso = 0.05
+    modelo = ModeloIAAssincrono(MODELO, base_url=servidor_openai.url, max_concorrencia=2)
+
+    async def executar() -> None:
+        resultados = await modelo.completar_lote([f"pedido {i}" for i in range(6)])
+        assert [item.resultado.choices[0].message.content for item in resultados] == [
+            f"resposta pedido {i}" for i in range(6)]
+        await modelo.pool.fechar_assincronos()
+
+    asyncio.run(executar())
+    assert servidor_openai.maximo_simultaneo == 2
+
+
+def test_mesma_instancia_em_dois_lacos(servidor_openai) -> None:
+    modelo = ModeloIAAssincrono(MODELO, base_url=servidor_openai.url, max_concorrencia=1)
+
+    async def executar() -> None:
+        respostas = await asyncio.gather(*(modelo.completar("oi") for _ in range(3)))
+        assert all(resposta.choices[0].message.content == "resposta oi" for resposta in respostas)
+        await modelo.pool.fechar_assincronos()
+
+    # O semáforo do primeiro laço não pode ser reutilizado no segundo
+    asyncio.run(executar())
+    asyncio.run(executar())
+    assert len(servidor_openai.pedidos) == 6
+
+
+def test_erros_ficam_no_item(servidor_openai) -> None:
+    modelo = ModeloIAAssincrono(MODELO, base_url=servidor_openai.url)
+
+    async def executar() -> None:
+        resultados = await modelo.completar_lote(["oi", "FALHA"])
+        assert [item.sucesso for item in resultados] == [True, False]
+        assert [item.indice for item in resultados] == [0, 1]
+        await modelo.pool.fechar_assincronos()
+
+    asyncio.run(executar())
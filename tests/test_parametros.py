@@ -0,0 +1,138 @@
+"""Testes dos parâmetros, do registro de modelos e da recarga do arquivo de modelos"""
+
+import json
+import os
+
+import pytest
+
+from bianca.parametros import (ModeloConfig, ParametrosContexto, ParametrosIA,
+                               RegistroModelos, interpretar_tabela_modelos)
+
+CAMPOS_MODELO = {
+    "preco_entrada_por_1k_tokens": 0.001,
+    "preco_saida_por_1k_tokens": 0.002,
+    "limite_tokens": 8000,
+    "temperatura_padrao": 0.7,
+    "max_tokens_resposta": 1000,
+    "descricao": "Modelo de teste",
+}
+
+
+def _tabela(**alteracoes) -> dict:
+    return {"modelos": {"modelo-teste": dict(CAMPOS_MODELO, **alteracoes)}}
+
+
+def _gravar(caminho, dados: dict, deslocamento_mtime: int = 0) -> None:
+    caminho.write_text(json.dumps(dados))
+    if deslocamento_mtime:
+        estado = os.stat(caminho)
+        os.utime(caminho, ns=(estado.st_atime_ns,
+                              estado.st_mtime_ns + deslocamento_mtime * 1_000_000_000))
+
+
+def test_registro_resolve_aliases_com_data() -> None:
+    config = ModeloConfig("gpt-teste", 0.001, 0.002, 8000, 0.7, 1000, "teste")
+    registro = RegistroModelos({"gpt-teste": config}, {"apelido": "gpt-teste"})
+
+    assert registro.obter("gpt-teste-2024-08-06") is config
+    assert registro.resolver("apelido") == "gpt-teste"
+    assert "gpt-teste-0613" in registro
+    assert registro.obter("outro") is None
+
+
+def test_registro_e_imutavel() -> None:
+    registro = RegistroModelos({})
+
+    with pytest.raises(AttributeError):
+        registro.novo = 1  # type: ignore[attr-defined]
+
+
+def test_interpretar_tabela_valida() -> None:
+    registro = interpretar_tabela_modelos(_tabela())
+
+    assert registro.obter("modelo-teste").limite_tokens == 8000
+
+
+@pytest.mark.parametrize("dados", [
+    {"modelos": {"gpt-4o": 5}},
+    {"modelos": {"gpt-4o": ["lista"]}},
+    {"modelos": {}},
+    [],
+    _tabela(preco_entrada_por_1k_tokens="0.001"),
+    _tabela(preco_saida_por_1k_tokens=-1),
+    _tabela(preco_por_minuto=float("nan")),
+    _tabela(limite_tokens=-1),
+    _tabela(limite_tokens=8000.5),
+    _tabela(limite_tokens=True),
+    _tabela(temperatura_padrao=3),
+    _tabela(descricao=5),
+    _tabela(campo_desconhecido=1),
+    dict(_tabela(), aliases={"apelido": "inexistente"}),
+    dict(_tabela(), aliases={"apelido": ["modelo-teste"]}),
+    dict(_tabela(), aliases=["apelido"]),
+])
+def test_interpretar_tabela_invalida_gera_value_error(dados) -> None:
+    with pytest.raises(ValueError):
+        interpretar_tabela_modelos(dados)
+
+
+def test_arquivo_alterado_e_recarregado(tmp_path) -> None:
+    caminho = tmp_path / "modelos.json"
+    _gravar(caminho, _tabela())
+    parametros = ParametrosIA(arquivo_modelos=str(caminho), intervalo_verificacao=0)
+
+    _gravar(caminho, _tabela(limite_tokens=16000), deslocamento_mtime=1)
+
+    assert parametros.obter_modelo("modelo-teste").limite_tokens == 16000
+
+
+@pytest.mark.parametrize("invalido", [
+    {"modelos": {"modelo-teste": 5}},
+    _tabela(preco_entrada_por_1k_tokens="caro"),
+])
+def test_arquivo_invalido_mantem_tabela_atual(tmp_path, capsys, invalido) -> None:
+    caminho = tmp_path / "modelos.json"
+    _gravar(caminho, _tabela())
+    parametros = ParametrosIA(arquivo_modelos=str(caminho), intervalo_verificacao=0)
+
+    _gravar(caminho, invalido, deslocamento_mtime=1)
+
+    assert parametros.obter_modelo("modelo-teste").preco_entrada_por_1k_tokens == 0.001
+    assert "AVISO" in capsys.readouterr().out
+
+
+def test_arquivo_invalido_na_inicializacao_gera_erro(tmp_path) -> None:
+    caminho = tmp_path / "modelos.json"
+    _gravar(caminho, {"modelos": {"gpt-4o": 5}})
+
+    with pytest.raises(ValueError):
+        ParametrosIA(arquivo_modelos=str(caminho))
+
+
+def test_exportar_e_carregar_tabela(tmp_path) -> None:
+    caminho = tmp_path / "exportada.json"
+    ParametrosIA().exportar_tabela_modelos(str(caminho))
+
+    parametros = ParametrosIA(arquivo_modelos=str(caminho))
+
+    assert set(parametros.listar_modelos_disponiveis()) == set(
+        ParametrosIA().listar_modelos_disponiveis())
+
+
+def test_contexto_sobrepoe_valores_e_compartilha_os_modelos() -> None:
+    base = ParametrosIA()
+    contexto = ParametrosContexto(base, temperatura_padrao=0.2)
+
+    assert isinstance(contexto, ParametrosIA)
+    contexto.definir_max_tokens_padrao(50)
+    assert (contexto.obter_temperatura_padrao(), contexto.obter_max_tokens_padrao()) == (0.2, 50)
+    assert (base.obter_temperatura_padrao(), base.obter_max_tokens_padrao()) == (0.7, 1000)
+    assert contexto.obter_configuracao_completa("gpt-4o")["tempo_espera_padrao"] == 30
+    with pytest.raises(ValueError):
+        contexto.definir_temperatura_padrao(3)
+    with pytest.raises(AttributeError):
+        contexto.arquivo_modelos = "outro.json"
+
+    # Mutadores da tabela de modelos alteram os parâmetros base
+    contexto.registrar_modelo(ModeloConfig("modelo-contexto", 0.001, 0.002, 8000, 0.7, 100, ""))
+    assert base.obter_modelo("modelo-contexto") is not None
@@ -0,0 +1,149 @@
+"""Testes da política de novas tentativas com prazo e requisições duplicadas"""
+
+import asyncio
+import itertools
+import threading
+import time
+
+import openai
+import pytest
+
+from bianca.modelo import ModeloIA
+from bianca.parametros import obter_parametros
+from bianca.politica_tentativas import JanelaLatencias, PoliticaTentativas
+
+
+class FuncaoFalsa:
+    """Chamada falsa: falha com os erros informados e depois retorna 'ok'"""
+
+    def __init__(self, *erros: BaseException, atrasos=()):
+        self.erros = list(erros)
+        self.atrasos = list(atrasos)
+        self.limites = []
+        self._trava = threading.Lock()
+
+    def __call__(self, limite: float) -> str:
+        with self._trava:
+            self.limites.append(limite)
+            atraso = self.atrasos.pop(0) if self.atrasos else 0.0
+            erro = self.erros.pop(0) if self.erros else None
+        time.sleep(atraso)
+        if erro is not None:
+            raise erro
+        return "ok"
+
+
+def test_max_tentativas_invalido() -> None:
+    with pytest.raises(ValueError):
+        PoliticaTentativas(max_tentativas=0)
+
+
+def test_repete_erros_transitorios() -> None:
+    politica = PoliticaTentativas(espera_inicial=0.01)
+    funcao = FuncaoFalsa(ConnectionError(), TimeoutError())
+
+    assert politica.executar(funcao, prazo_padrao=5) == "ok"
+    assert len(funcao.limites) == 3
+    # Cada tentativa recebe o que resta do prazo
+    assert funcao.limites == sorted(funcao.limites, reverse=True)
+
+
+def test_erro_nao_transitorio_nao_e_repetido() -> None:
+    politica = PoliticaTentativas(espera_inicial=0.01)
+    funcao = FuncaoFalsa(KeyError("x"))
+
+    with pytest.raises(KeyError):
+        politica.executar(funcao, prazo_padrao=5)
+    assert len(funcao.limites) == 1
+
+
+def test_ultima_tentativa_propaga_o_erro() -> None:
+    politica = PoliticaTentativas(max_tentativas=2, espera_inicial=0.01)
+    funcao = FuncaoFalsa(ConnectionError("1"), ConnectionError("2"))
+
+    with pytest.raises(ConnectionError, match="2"):
+        politica.executar(funcao, prazo_padrao=5)
+
+
+def test_prazo_esgotado_encadeia_o_ultimo_erro() -> None:
+    politica = PoliticaTentativas(max_tentativas=100, espera_inicial=0.05,
+                                  espera_maxima=0.05, prazo=0.2)
+    funcao = FuncaoFalsa(*(ConnectionError() for _ in range(100)))
+
+    with pytest.raises(TimeoutError) as excinfo:
+        politica.executar(funcao)
+    assert isinstance(excinfo.value.__cause__, ConnectionError)
+
+
+def test_hedge_usa_a_primeira_resposta_e_fecha_executor() -> None:
+    with PoliticaTentativas(hedge=True, atraso_hedge=0.05) as politica:
+        funcao = FuncaoFalsa(atrasos=[0.5, 0.0])
+        inicio = time.monotonic()
+
+        assert politica.executar(funcao, prazo_padrao=5) == "ok"
+        assert time.monotonic() - inicio < 0.4
+        assert len(funcao.limites) == 2
+        assert politica._executor is not None
+    assert politica._executor is None
+
+
+def test_percentil_da_janela() -> None:
+    janela = JanelaLatencias()
+    for latencia in range(1, 101):
+        janela.registrar(latencia / 100)
+
+    assert janela.percentil(0.95) == pytest.approx(0.96)
+    assert JanelaLatencias().percentil(0.95) is None
+
+
+def test_hedge_usa_percentil_depois_de_amostras_suficientes() -> None:
+    politica = PoliticaTentativas(hedge=True, min_amostras_hedge=3)
+    funcao = FuncaoFalsa()
+
+    for _ in range(2):
+        politica.executar(funcao, prazo_padrao=5, chave="modelo")
+    assert politica.calcular_atraso_hedge("modelo") is None
+    politica.executar(funcao, prazo_padrao=5, chave="modelo")
+    assert politica.calcular_atraso_hedge("modelo") is not None
+    politica.fechar()
+
+
+def test_execucao_assincrona_repete_e_cancela_duplicada() -> None:
+    politica = PoliticaTentativas(espera_inicial=0.01, hedge=True, atraso_hedge=0.05)
+    contador = itertools.count()
+    canceladas = []
+
+    async def funcao(limite: float) -> str:
+        chamada = next(contador)
+        if chamada == 0:
+            raise ConnectionError()
+        try:
+            # A primeira tentativa repetida demora; a duplicada responde logo
+            await asyncio.sleep(0.5 if chamada == 1 else 0.0)
+        except asyncio.CancelledError:
+            canceladas.append(chamada)
+            raise
+        return f"ok {chamada}"
+
+    assert asyncio.run(politica.executar_assincrono(funcao, prazo_padrao=5)) == "ok 2"
+    assert canceladas == [1]
+
+
+def test_modelo_com_politica_repete_503(servidor_openai) -> None:
+    servidor_openai.falhas = 2
+    modelo = ModeloIA("gpt-4o-mini", obter_parametros(), base_url=servidor_openai.url,
+                      politica=PoliticaTentativas(espera_inicial=0.01))
+
+    resposta = modelo.completar("oi")
+
+    assert resposta.choices[0].message.content == "resposta oi"
+    assert len(servidor_openai.pedidos) == 3
+
+
+def test_modelo_com_politica_nao_repete_400(servidor_openai) -> None:
+    modelo = ModeloIA("gpt-4o-mini", obter_parametros(), base_url=servidor_openai.url,
+                      politica=PoliticaTentativas(espera_inicial=0.01))
+
+    with pytest.raises(openai.BadRequestError):
+        modelo.completar("FALHA")
+    assert len(servidor_openai.pedidos) == 1
@@ -0,0 +1,65 @@
+"""Testes do pool de clientes da OpenAI"""
+
+import asyncio
+
+from openai import DEFAULT_CONNECTION_LIMITS
+
+from bianca.pool_clientes import PoolClientes
+
+
+def test_limites_usam_a_classe_do_cliente_http_da_openai() -> None:
+    pool = PoolClientes(max_conexoes=3, max_conexoes_ociosas=2, tempo_ocioso=5.0)
+
+    limites = pool._limites()
+
+    assert type(limites) is type(DEFAULT_CONNECTION_LIMITS)
+    assert limites.max_connections == 3
+    assert limites.max_keepalive_connections == 2
+    assert limites.keepalive_expiry == 5.0
+
+
+def test_reutiliza_cliente_da_mesma_combinacao(servidor_openai) -> None:
+    pool = PoolClientes()
+    try:
+        cliente = pool.obter_cliente("sk-teste", servidor_openai.url, 10)
+
+        assert pool.obter_cliente("sk-teste", servidor_openai.url, 10) is cliente
+        assert pool.obter_cliente("sk-outra", servidor_openai.url, 10) is not cliente
+        estatisticas = pool.estatisticas()
+        assert estatisticas["clientes_criados"] == 2
+        assert estatisticas["clientes_reutilizados"] == 1
+    finally:
+        pool.fechar()
+    assert len(pool) == 0
+
+
+def test_cliente_do_pool_faz_requisicoes(servidor_openai) -> None:
+    pool = PoolClientes(max_conexoes=2)
+    try:
+        cliente = pool.obter_cliente("sk-teste", servidor_openai.url, 10)
+        for _ in range(3):
+            resposta = cliente.chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "oi"}])
+            assert resposta.choices[0].message.content == "resposta oi"
+    finally:
+        pool.fechar()
+    assert len(servidor_openai.pedidos) == 3
+
+
+def test_clientes_assincronos_por_laco(servidor_openai) -> None:
+    pool = PoolClientes()
+
+    async def obter() -> object:
+        cliente = pool.obter_cliente_assincrono("sk-teste", servidor_openai.url, 10)
+        assert pool.obter_cliente_assincrono("sk-teste", servidor_openai.url, 10) is cliente
+        resposta = await cliente.embeddings.create(model="text-embedding-3-small",
+                                                   input="texto")
+        assert len(resposta.data) == 1
+        await pool.fechar_assincronos()
+        return cliente
+
+    primeiro = asyncio.run(obter())
+    segundo = asyncio.run(obter())
+
+    assert primeiro is not segundo
+    assert pool.estatisticas()["clientes_assincronos_ativos"] == 0
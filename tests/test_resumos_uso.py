@@ -0,0 +1,133 @@
+"""Testes dos resumos de uso pré-agregados em SQLite"""
+
+import io
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from bianca import historico_uso, resumos_uso
+from bianca.historico_uso import TIPO_CHAMADA, TIPO_ESTIMATIVA, HistoricoUso
+from bianca.resumos_uso import ResumosUso
+
+DIA = datetime(2024, 3, 31, 23, 30, tzinfo=timezone.utc).timestamp()
+DIMENSOES = ('periodo', 'modelo', 'projeto', 'usuario', 'tipo')
+
+
+@pytest.fixture
+def historico(tmp_path):
+    with HistoricoUso(str(tmp_path), registros_por_segmento=4) as historico:
+        yield historico
+
+
+def _preencher(historico: HistoricoUso, deslocamento: float = 0.0) -> None:
+    historico.registrar("gpt-4o-mini", 100, 10, 0.5, projeto="a", instante=DIA + deslocamento)
+    historico.registrar("gpt-4o-mini", 200, 20, 1.0, projeto="b",
+                        instante=DIA + 3600 + deslocamento)
+    historico.registrar("gpt-4o", 300, 30, 2.0, instante=DIA + deslocamento)
+    historico.registrar_estimativa("gpt-4o", 50, 5, 0.25, usuario="ana",
+                                   instante=DIA + deslocamento)
+
+
+def _totais(grupos):
+    return {chave: (t.requisicoes, t.tokens_entrada, t.tokens_saida, pytest.approx(t.custo))
+            for chave, t in grupos.items()}
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_atualizacao_incremental(historico, monkeypatch, numpy) -> None:
+    if numpy and not resumos_uso.NUMPY_AVAILABLE:
+        pytest.skip("NumPy não instalado")
+    monkeypatch.setattr(resumos_uso, "NUMPY_AVAILABLE", numpy)
+    monkeypatch.setattr(historico_uso, "NUMPY_AVAILABLE", numpy)
+    resumos = ResumosUso(historico, automatico=False)
+
+    _preencher(historico)
+    assert resumos.atualizar() == 4
+    _preencher(historico, deslocamento=86400 * 2)
+    assert resumos.atualizar() == 4
+    assert resumos.atualizar() == 0
+
+    assert _totais(resumos.consultar('mes', por=('periodo', 'modelo'))) == {
+        ("2024-03", "gpt-4o"): (2, 350, 35, 2.25),
+        ("2024-03", "gpt-4o-mini"): (1, 100, 10, 0.5),
+        ("2024-04", "gpt-4o"): (2, 350, 35, 2.25),
+        ("2024-04", "gpt-4o-mini"): (3, 500, 50, 2.5)}
+    assert _totais(resumos.consultar('dia', por=('periodo', 'modelo'))) == _totais(
+        historico.agregar(por=('dia', 'modelo')))
+    resumos.fechar()
+
+
+def test_reconstruir_reproduz_os_resumos(historico) -> None:
+    resumos = ResumosUso(historico, automatico=False)
+    _preencher(historico)
+    resumos.atualizar()
+    _preencher(historico, deslocamento=60)
+    esperado = _totais(resumos.consultar('hora', por=DIMENSOES))
+
+    assert resumos.reconstruir() == 8
+    assert _totais(resumos.consultar('hora', por=DIMENSOES, atualizar=False)) == esperado
+    resumos.fechar()
+
+
+def test_filtros_e_nomes_ausentes(historico) -> None:
+    resumos = ResumosUso(historico, automatico=False)
+    _preencher(historico)
+
+    assert list(resumos.consultar('dia', por=('projeto',), tipo=TIPO_CHAMADA)) == [
+        (None,), ("a",), ("b",)]
+    assert list(resumos.consultar('dia', por=('usuario',), tipo=TIPO_ESTIMATIVA)) == [("ana",)]
+    # O intervalo considera períodos inteiros: só o dia 1º de abril
+    abril = resumos.consultar('dia', por=('periodo',), inicio=DIA + 3600)
+    assert _totais(abril) == {("2024-04-01",): (1, 200, 20, 1.0)}
+    assert _totais(resumos.consultar('mes', por=(), projeto="a")) == {(): (1, 100, 10, 0.5)}
+    assert resumos.consultar('mes', por=(), projeto="inexistente") == {}
+    with pytest.raises(ValueError):
+        resumos.consultar('semana')
+    with pytest.raises(ValueError):
+        resumos.consultar(por=('cor',))
+    resumos.fechar()
+
+
+def test_exportar_csv(historico, tmp_path) -> None:
+    resumos = ResumosUso(historico, automatico=False)
+    _preencher(historico)
+    saida = io.StringIO()
+
+    quantidade = resumos.exportar_csv(saida, 'mes', por=('periodo', 'modelo'))
+
+    assert quantidade == 3
+    assert saida.getvalue().splitlines() == [
+        "periodo,modelo,requisicoes,tokens_entrada,tokens_saida,custo",
+        "2024-03,gpt-4o,2,350,35,2.25",
+        "2024-03,gpt-4o-mini,1,100,10,0.5",
+        "2024-04,gpt-4o-mini,1,200,20,1.0"]
+    caminho = str(tmp_path / "uso.csv")
+    assert resumos.exportar_csv(caminho, 'dia') == 4
+    resumos.fechar()
+
+
+def test_atualizacao_automatica_em_segundo_plano(historico) -> None:
+    def requisicoes(resumos: ResumosUso) -> int:
+        return sum(t.requisicoes for t in resumos.consultar('mes', atualizar=False).values())
+
+    with ResumosUso(historico, intervalo=0.05) as resumos:
+        _preencher(historico)
+        limite = time.monotonic() + 5
+        while requisicoes(resumos) < 4 and time.monotonic() < limite:
+            time.sleep(0.02)
+
+        assert requisicoes(resumos) == 4
+    assert historico._ouvintes == []
+
+
+def test_resumos_de_um_leitor(historico) -> None:
+    _preencher(historico)
+    leitor = HistoricoUso(historico.diretorio, somente_leitura=True)
+
+    with ResumosUso(leitor, automatico=False) as resumos:
+        assert resumos.atualizar() == 4
+        _preencher(historico)
+        total = resumos.consultar('mes', por=())[()]
+
+    assert total.requisicoes == 8